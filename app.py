@@ -2,18 +2,53 @@
 # nowy plik z danymi (większa grupa), uporządkowanie wieku w sidebarze, 
 # dodano wizualizacje, 
 
+import time
+RUN_STARTED = time.perf_counter()
+
 import streamlit as st
+
+# warianty strony do testów A/B (app1.py–app3.py) przydziela serwer, raz na
+# sesję: ?variant=1..3 (0 – ta strona) albo losowo spośród
+# FIND_FRIENDS_AB_VARIANTS (np. "0,1,2,3"). Nie są stronami w nawigacji,
+# więc użytkownik nie przełączy się sam na inny wariant.
+VARIANTS = {"1": "app1.py", "2": "app2.py", "3": "app3.py"}
+
+def assigned_variant():
+    import os
+    import random
+
+    requested = st.query_params.get("variant")
+    if requested == "0" or requested in VARIANTS:
+        st.session_state.variant = requested
+    elif "variant" not in st.session_state:
+        arms = [arm for arm in os.environ.get('FIND_FRIENDS_AB_VARIANTS', '').split(',') if arm == "0" or arm in VARIANTS]
+        st.session_state.variant = random.choice(arms) if arms else "0"
+    return VARIANTS.get(st.session_state.variant)
+
+variant_script = assigned_variant()
+if variant_script is not None:
+    import os
+    import runpy
+
+    # wariant sam ustawia stronę (set_page_config) – przed czymkolwiek z app.py
+    runpy.run_path(os.path.join(os.path.dirname(os.path.abspath(__file__)), variant_script), run_name="__main__")
+    st.stop()
+
 st.set_page_config(page_title="Wyszukaj znajomych", layout="wide")
 
 # ustawienie dark mode
 if "dark_mode" not in st.session_state:
     st.session_state.dark_mode = True  # domyślnie dark
 
-import pandas as pd  # type: ignore
-from pycaret.clustering import load_model, predict_model  # type: ignore
-import plotly.express as px  # type: ignore
-import base64
+# tu tylko lekkie importy – PyCaret, Plotly i moduły oparte na pandas są
+# ładowane dopiero wtedy, gdy są potrzebne (python import_profile.py --check)
 import json
+import os
+import threading
+from assets import logo_html, theme_html
+from metrics import RERUN_SECONDS, cached, serve_metrics
+from profiler import RunProfile, requested_mode
+from survey import COLUMNS, LABELS, MULTI_OPTIONS, NO_CHOICE, OPTIONS, choices_answer, choices_label
 
 MODEL_NAME = 'welcome_survey_clustering_pipeline_v2'
 
@@ -21,38 +56,233 @@ DATA = 'welcome_survey_simple_v2.csv'
 
 CLUSTER_NAMES_AND_DESCRIPTIONS = 'welcome_survey_cluster_names_and_descriptions_v2.json'
 
+# uczenie online (FIND_FRIENDS_ONLINE_LEARNING=1): nowe odpowiedzi z NEW_RESPONSES
+# są dokładane do centroidów w tle, a nowa wersja modelu trafia do ONLINE_MODEL_NAME
+ONLINE_LEARNING = os.environ.get('FIND_FRIENDS_ONLINE_LEARNING') == '1'
+
+ONLINE_MODEL_NAME = f'{MODEL_NAME}_online'
+
+NEW_RESPONSES = 'welcome_survey_new_responses.csv'
+
+# macierz odległości do centroidów (dla dużych zbiorów – plik mmap); osobny
+# plik dla każdej wersji centroidów, więc nowa wersja nie nadpisuje pliku,
+# który czytają starsze mmapy i inne procesy; pliki starszych wersji są usuwane
+# (otwarte mmapy czytają dalej usunięty plik)
+DISTANCES = f'{MODEL_NAME}_distances_{{fingerprint}}.npy'
+
+# ile wersji modelu trzymają cache zależne od wersji (w trybie online każda
+# opublikowana wersja to nowy klucz – bez limitu zostawałyby na zawsze)
+MODEL_VERSION_CACHE_ENTRIES = 2
+
+# ile wgranych list uczestników (podział na stoliki, dopasowania) trzyma cache
+UPLOAD_CACHE_ENTRIES = 16
+
+# przybliżone statystyki grup ze szkiców zamiast pełnych value_counts/groupby
+# (FIND_FRIENDS_APPROX_STATS=1, zob. sketches.py)
+APPROX_STATS = os.environ.get('FIND_FRIENDS_APPROX_STATS') == '1'
+
+SKETCHES = 'welcome_survey_sketches_{version}.npz'
+
+# źródło dokładnych statystyk grupy: "pandas" (członkowie grupy w pamięci) albo
+# "sql" (agregacje w bazie SQLite obok modelu, zob. group_stats.py)
+STATS_BACKEND = os.environ.get('FIND_FRIENDS_STATS_BACKEND', 'pandas')
+
+# profil "lite" (?view=lite albo sam, gdy obciążenie na rdzeń przekracza próg;
+# ?view=full wymusza pełny): bez logo i CSS, formularz w sidebarze zamiast
+# przebiegu skryptu po każdej zmianie, ciężkie sekcje liczone dopiero na żądanie
+LITE_LOAD_THRESHOLD = float(os.environ.get('FIND_FRIENDS_LITE_LOAD', '0.9'))
+
+# metryki w formacie Prometheusa (FIND_FRIENDS_METRICS_PORT=9464 → :9464/metrics,
+# zob. metrics.py); bez zmiennej listener nie jest uruchamiany; przy kilku
+# workerach na jednym hoście każdy potrzebuje własnego portu
+METRICS_PORT = os.environ.get('FIND_FRIENDS_METRICS_PORT')
+
+# profil przebiegów skryptu (zob. profiler.py): ?profiler=1 (albo =cprofile)
+# z ?profiler_token=<FIND_FRIENDS_PROFILER_TOKEN> dla jednej sesji,
+# FIND_FRIENDS_PROFILER=1 dla wszystkich; pliki trafiają do profiles/
+PROFILER = os.environ.get('FIND_FRIENDS_PROFILER')
+
+
+def current_load():
+    # średnie obciążenie z ostatniej minuty na rdzeń (0, gdy system go nie podaje)
+    if not hasattr(os, "getloadavg"):
+        return 0.0
+    return os.getloadavg()[0] / (os.cpu_count() or 1)
+
+
+# profil ustalany raz na sesję (i od nowa tylko przy zmianie ?view=) – strona
+# nie przeskakuje między lite a pełnym, gdy obciążenie waha się wokół progu
+view = st.query_params.get("view")
+if st.session_state.get("view_param", "") != view or "lite_view" not in st.session_state:
+    st.session_state.view_param = view
+    st.session_state.lite_view = view == "lite" or (view != "full" and current_load() > LITE_LOAD_THRESHOLD)
+LITE_VIEW = st.session_state.lite_view
+
+# odpowiedzi z sidebaru pod stałymi kluczami; widżet w formularzu (lite) i poza
+# nim ma dla Streamlita inne ID, więc przepisujemy wartości do session_state –
+# widżet o nowym ID dostaje je zamiast wartości domyślnych
+ANSWER_KEYS = {col: f"answer_{col}" for col in COLUMNS}
+for key in ANSWER_KEYS.values():
+    if key in st.session_state:
+        st.session_state[key] = st.session_state[key]
+
 
-@st.cache_data
+def deferred(title):
+    # w profilu lite sekcja jest liczona i rysowana dopiero po włączeniu
+    return not LITE_VIEW or st.toggle(title, key=f"deferred_{title}")
+
+
+# przebieg przerwany nową interakcją nie doszedł do końca skryptu – jego profil
+# zamyka następny przebieg
+if "run_profile" in st.session_state:
+    st.session_state.pop("run_profile").stop(interrupted=True)
+
+run_profile = None
+profile_mode = requested_mode(st.query_params.get("profiler"), st.query_params.get("profiler_token"), PROFILER)
+if profile_mode is not None:
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    st.session_state.profile_runs = st.session_state.get("profile_runs", 0) + 1
+    if "profile_session" not in st.session_state:
+        st.session_state.profile_session = os.urandom(4).hex()
+    run_profile = RunProfile(
+        f"{time.strftime('%Y%m%d-%H%M%S')}_{st.session_state.profile_session}_{st.session_state.profile_runs:04d}",
+        profile_mode,
+        # próbkowane są też zadania pul zlecone przez tę sesję (resources.SessionThreadPool)
+        session=get_script_run_ctx().session_id,
+    ).start()
+    st.session_state.run_profile = run_profile
+
+
+@cached(st.cache_data(show_spinner="Ładowanie modelu…"))
 def get_model():
+    from pycaret.clustering import load_model  # type: ignore
+
+    if ONLINE_LEARNING and os.path.exists(f'{ONLINE_MODEL_NAME}.pkl'):
+        return load_model(ONLINE_MODEL_NAME)
     return load_model(MODEL_NAME)
 
-@st.cache_data
+@st.cache_resource
+def get_online_updater():
+    from online_model import OnlineClusterUpdater
+    from sketches import ClusterSketches
+
+    model = get_model()
+    updater = OnlineClusterUpdater(
+        model,
+        f'{ONLINE_MODEL_NAME}.pkl',
+        NEW_RESPONSES,
+        training_df=pd.read_csv(DATA, sep=';'),
+        sketches=ClusterSketches(cluster_labels(model)) if APPROX_STATS else None,
+    )
+    updater.start()
+    return updater
+
+@cached(st.cache_data)
 def get_cluster_names_and_descriptions():
     with open(CLUSTER_NAMES_AND_DESCRIPTIONS, "r", encoding='utf-8') as f:
         return json.loads(f.read())
 
-@st.cache_data
-def get_all_participants():
+@cached(st.cache_data(max_entries=MODEL_VERSION_CACHE_ENTRIES, show_spinner="Ocenianie uczestników ankiety…"))
+def get_all_participants(_model, model_version=0):
+    from pycaret.clustering import predict_model  # type: ignore
+    from multiselect import legacy_frame
+
     all_df = pd.read_csv(DATA, sep=';')
-    df_with_clusters = predict_model(model, data=all_df)
+    # model widzi odpowiedzi łączone, w wyniku zostają pełne zbiory wyborów
+    df_with_clusters = predict_model(_model, data=legacy_frame(all_df))
+    df_with_clusters[list(MULTI_OPTIONS)] = all_df[list(MULTI_OPTIONS)]
 
     return df_with_clusters
 
+@cached(st.cache_resource(max_entries=MODEL_VERSION_CACHE_ENTRIES, show_spinner="Liczenie odległości od środków grup…"))
+def get_all_distances(_model, model_version=0):
+    # cache_resource – macierz (lub mmap) nie jest kopiowana przy każdym odczycie
+    import glob
+
+    all_df = pd.read_csv(DATA, sep=';')
+    path = DISTANCES.format(fingerprint=centers_fingerprint(_model))
+    distances = compute_distances(_model, all_df, path=path)
+    for old_path in glob.glob(DISTANCES.format(fingerprint='*')):
+        if old_path != path:
+            try:
+                os.remove(old_path)
+            except FileNotFoundError:
+                # usunięty w międzyczasie przez inny proces
+                pass
+    return distances
+
+@cached(st.cache_resource(show_spinner="Budowanie szkiców statystyk…"))
+def get_sketches(_context, survey_version, model_version=0):
+    from sketches import ClusterSketches, sketches_from_context
+
+    path = SKETCHES.format(version=survey_version)
+    if os.path.exists(path):
+        sketches = ClusterSketches.load(path)
+        # szkice z innej wersji modelu albo bez odległości są liczone od nowa
+        if sketches.model_version == str(model_version) and sketches.has_distances:
+            return sketches
+    return sketches_from_context(_context)
+
+@st.cache_resource(show_spinner="Budowanie bazy statystyk grup…")
+def get_sql_stats(_context, survey_version, model_version=0):
+    from group_stats import ensure_database
+
+    return ensure_database(get_model_registry().versions[survey_version].database, _context)
+
+@st.cache_resource
+def get_drift_monitors():
+    # jeden monitor na wersję ankiety: nowa wersja modelu (np. online) zastępuje
+    # monitor swojej wersji ankiety, monitory innych wersji zostają
+    return {}, threading.Lock()
+
+def get_drift_monitor(context, survey_version, model_version=0):
+    from drift import DriftMonitor, reference_counts
+
+    monitors, lock = get_drift_monitors()
+    with lock:
+        current = monitors.get(survey_version)
+        if current is None or current[0] != model_version:
+            if context.aggregates is not None:
+                # rozkład treningowy z agregatów paczki/manifestu – bez czytania całego zbioru
+                reference = {col: context.aggregates.value_counts(col) for col in COLUMNS + ["Cluster"]}
+            else:
+                reference = reference_counts(context.all_df)
+            current = monitors[survey_version] = (model_version, DriftMonitor(reference, context.labels))
+    return current[1]
+
+@cached(st.cache_data(max_entries=UPLOAD_CACHE_ENTRIES, show_spinner="Dzielenie uczestników na stoliki…"))
+def get_seating(_context, attendees_bytes, table_size, survey_version, model_version=0):
+    # klucz: zawartość pliku i wielkość stolika – kolejne przebiegi skryptu
+    # (np. zmiana numeru uczestnika) nie liczą podziału od nowa
+    import io
+    from seating import partition_attendees
+
+    attendees_df = pd.read_csv(io.BytesIO(attendees_bytes), sep=';')
+    return partition_attendees(_context, attendees_df, table_size)
+
+@cached(st.cache_data(max_entries=UPLOAD_CACHE_ENTRIES, show_spinner="Szukanie dopasowań w kohorcie…"))
+def get_top_k(_context, attendees_bytes, survey_version, model_version=0):
+    import io
+    from compatibility import TOP_K, build_top_k
+
+    # (kohorta w kolejności pliku, TOP-k dopasowań każdej osoby)
+    cohort_df = pd.read_csv(io.BytesIO(attendees_bytes), sep=';')[COLUMNS].reset_index(drop=True)
+    return cohort_df, build_top_k(_context.encode(cohort_df), k=TOP_K)
+
+@st.cache_resource
+def get_metrics_server(port):
+    # jeden listener na proces, niezależnie od liczby sesji; przy zajętym
+    # porcie None – zapamiętane, więc kolejne przebiegi nie próbują od nowa
+    return serve_metrics(port, host=os.environ.get('FIND_FRIENDS_METRICS_HOST', '127.0.0.1'))
+
+if METRICS_PORT:
+    get_metrics_server(int(METRICS_PORT))
+
 with st.sidebar:
     st.sidebar.header("Ustawienie trybu wyświetlania")
     st.session_state.dark_mode = st.sidebar.checkbox("Dark Mode", st.session_state.dark_mode)
-    if st.session_state.dark_mode:
-        bg_color = "#1E1E2F"
-        secondary_bg = "#2C2C3E"
-        text_color = "#E5E5E5"
-        sidebar_text = "#E5E5E5"
-        metric_text_color = "#E5E5E5"
-    else:
-        bg_color = "#FFFFFF"
-        secondary_bg = "#F0F0F0"   # lekko szary sidebar
-        text_color = "#111111"
-        sidebar_text = "#111111"
-        metric_text_color = "#111111"
+    # kolory obu motywów są w static/theme.css (zob. assets.py)
 
 #     # --- CSS ---
 #     st.markdown(
@@ -112,287 +342,446 @@ with st.sidebar:
     # )
 
 
-# opcje w sidebarze
+# opcje w sidebarze (w profilu lite jako formularz – jedno wysłanie zamiast
+# przebiegu skryptu po każdej zmianie)
     st.header("Powiedz nam coś o sobie")
     st.markdown("Pomożemy Ci znaleźć osoby, które mają podobne zainteresowania")
-    age = st.selectbox("Wiek", ['<18', '18-24', '25-34', '35-44', '45-54', '55-64', '>=65', 'unknown'])
-    edu_level = st.selectbox("Wykształcenie", ['Podstawowe', 'Średnie', 'Wyższe'])
-    fav_animals = st.selectbox("Ulubione zwierzęta", ['Brak ulubionych', 'Psy', 'Koty', 'Koty i Psy','Inne'])
-    fav_place = st.selectbox("Ulubione miejsce", ['Nad wodą', 'W lesie', 'W górach', 'Inne'])
-    gender = st.radio("Płeć", ['Kobieta','Mężczyzna'])
-
-    person_df = pd.DataFrame([
-        {
-            'age': age,
-            'edu_level': edu_level,
-            'fav_animals': fav_animals,
-            'fav_place': fav_place,
-            'gender': gender,
-        }
-    ])
-
-model = get_model()
-all_df = get_all_participants()
-cluster_names_and_descriptions = get_cluster_names_and_descriptions()
-
-predicted_cluster_id = predict_model(model, data=person_df)["Cluster"].values[0]
-predicted_cluster_data = cluster_names_and_descriptions[predicted_cluster_id]
-
-
-def img_to_base64(path):
-    with open(path, "rb") as f:
-        return base64.b64encode(f.read()).decode()
-
-logo_base64 = img_to_base64("logo.png")  # ← ścieżka do pliku PNG
-
-st.markdown(
-    f"""
-    <style>
-    .app-logo {{
-        position: fixed;
-        top: 60px;
-        right: 20px;
-        display: flex;
-        align-items: center;
-        gap: 10px;
-        z-index: 99999;
-        background: white;
-        padding: 6px 10px;
-        border-radius: 8px;
-        box-shadow: 0 2px 6px rgba(0,0,0,0.15);
-        font-family: "Segoe UI", sans-serif;
-    }}
-
-    .app-logo img {{
-        height: 28px;
-        width: auto;
-    }}
-
-    .app-logo span {{
-        font-size: 18px;
-        font-weight: 700;
-        color: #111;
-        white-space: nowrap;
-    }}
-    </style>
-
-    <div class="app-logo">
-        <img src="data:image/png;base64,{logo_base64}">
-        <span>by: Bart</span>
-    </div>
-    """,
-    unsafe_allow_html=True
-)
+    with st.form("profile_form") if LITE_VIEW else st.container():
+        age = st.selectbox("Wiek", OPTIONS['age'], key=ANSWER_KEYS['age'])
+        edu_level = st.selectbox("Wykształcenie", OPTIONS['edu_level'], key=ANSWER_KEYS['edu_level'])
+        # wybór wielokrotny ("Psy|Inne", jak w CSV); model dostaje odpowiedź
+        # łączoną z OPTIONS (multiselect.legacy_frame przy predykcji)
+        animal_choices = st.multiselect(
+            "Ulubione zwierzęta", MULTI_OPTIONS['fav_animals'], key=ANSWER_KEYS['fav_animals']
+        )
+        fav_animals = choices_answer('fav_animals', animal_choices)
+        fav_place = st.selectbox("Ulubione miejsce", OPTIONS['fav_place'], key=ANSWER_KEYS['fav_place'])
+        gender = st.radio("Płeć", OPTIONS['gender'], key=ANSWER_KEYS['gender'])
+        if LITE_VIEW:
+            st.form_submit_button("Pokaż wyniki")
+
+    person = {
+        'age': age,
+        'edu_level': edu_level,
+        'fav_animals': fav_animals,
+        'fav_place': fav_place,
+        'gender': gender,
+    }
+
+# szkielet strony trafia do przeglądarki od razu – przed ciężkimi importami
+# i ładowaniem modelu; nagłówek grupy i stan ładowania to miejsca wypełniane,
+# gdy tylko dane są gotowe
+if not LITE_VIEW:
+    # arkusz motywów (ten sam przy każdym przebiegu) i logo z adresu w static/ –
+    # przełączenie motywu zmienia tylko klasę znacznika
+    st.markdown(theme_html(st.session_state.dark_mode) + logo_html("by: Bart"), unsafe_allow_html=True)
+
 st.title("🤝 Wyszukaj znajomych – analiza danych")
-st.markdown(
-        f"""
-        <style>
-        .stApp {{
-            background-color: {bg_color};
-            color: {text_color};
-        }}
-
-        .stSidebar {{
-            background-color: {secondary_bg};
-            color: {sidebar_text};
-        }}
-
-        .stSidebar h1,
-        .stSidebar h2,
-        .stSidebar h3,
-        .stSidebar label {{
-            color: {sidebar_text} !important;
-        }}
-
-        /* ===== METRIC FINAL FIX ===== */
-        div[data-testid="stMetric"] {{
-            --metric-value-color: {metric_text_color} !important;
-            --metric-label-color: {metric_text_color} !important;
-        }}
-        </style>
-        """,
-        unsafe_allow_html=True
-    )
-st.header(f"Najbliżej Ci do grupy: {predicted_cluster_data['name']}")
-st.markdown(predicted_cluster_data['description'])
-same_cluster_df = all_df[all_df["Cluster"] == predicted_cluster_id]
-st.metric("Liczba twoich znajomych", len(same_cluster_df))
+if LITE_VIEW:
+    st.caption("Wersja lekka strony – pełna wersja: ?view=full")
+header_slot = st.empty()
+progress_slot = st.empty()
 
-st.header("Osoby z grupy")
-fig = px.histogram(same_cluster_df.sort_values("age"), x="age")
-fig.update_layout(
-    title="Rozkład wieku w grupie",
-    xaxis_title="Wiek",
-    yaxis_title="Liczba osób",
-)
-st.plotly_chart(fig)
-
-fig = px.histogram(same_cluster_df, x="edu_level")
-fig.update_layout(
-    title="Rozkład wykształcenia w grupie",
-    xaxis_title="Wykształcenie",
-    yaxis_title="Liczba osób",
-)
-st.plotly_chart(fig)
-
-fig = px.histogram(same_cluster_df, x="fav_animals")
-fig.update_layout(
-    title="Rozkład ulubionych zwierząt w grupie",
-    xaxis_title="Ulubione zwierzęta",
-    yaxis_title="Liczba osób",
-)
-st.plotly_chart(fig)
-
-fig = px.histogram(same_cluster_df, x="fav_place")
-fig.update_layout(
-    title="Rozkład ulubionych miejsc w grupie",
-    xaxis_title="Ulubione miejsce",
-    yaxis_title="Liczba osób",
-)
-st.plotly_chart(fig)
-
-fig = px.histogram(same_cluster_df, x="gender")
-fig.update_layout(
-    title="Rozkład płci w grupie",
-    xaxis_title="Płeć",
-    yaxis_title="Liczba osób",
-)
-st.plotly_chart(fig)
+# sidebar i szkielet są już na stronie – dopiero teraz cięższe importy
+from concurrent.futures import wait
+import pandas as pd  # type: ignore
+from distances import centers_fingerprint, cluster_labels, compute_distances
+from model_registry import DEFAULT_VERSION
+from results import complete_profile_result, context_from_model, group_result, predict_profile
+from seating import GROUP_SIZE
+from charts import HISTOGRAMS, figure_tasks
+from member_browser import PAGE_SIZE, estimate_rows, page_members
+# rejestr modeli, pula wątków i cache wyników wspólne z wariantami i stronami w pages/
+# i wariantami strony (resources.py)
+from resources import draw_figures, get_load_pool, get_model_registry, get_profile_cache, profile_key, selected_version
+
+person_df = pd.DataFrame([person])
+
+# co tyle sekund odświeżany jest stan ładowania w tle
+PROGRESS_INTERVAL = 0.2
+
+
+def in_background(label, fn, *args):
+    # fn liczy się w puli ładowania (nie w puli wykresów), a skrypt w tym czasie pokazuje stan z czasem
+    # ładowania; gdy wynik jest od razu (ciepły cache), na stronie nic nie mignie.
+    # Przerwany przebieg skryptu nie przerywa zadania – jego wynik zostaje
+    # w rejestrze modeli / cache wyników dla następnego przebiegu
+    future = get_load_pool().submit(fn, *args)
+    started = time.perf_counter()
+    status = None
+    while not wait([future], timeout=PROGRESS_INTERVAL).done:
+        if status is None:
+            status = progress_slot.status(label)
+        status.update(label=f"{label} ({time.perf_counter() - started:.1f} s)")
+    progress_slot.empty()
+    return future.result()
+
+
+def show_group_header(cluster, group_size=None):
+    # nagłówek grupy – najpierw z samej predykcji, liczność grupy dochodzi później
+    with header_slot.container():
+        st.header(f"Najbliżej Ci do grupy: {cluster['name']}")
+        st.markdown(cluster['description'])
+        if group_size is not None:
+            st.metric("Liczba twoich znajomych", group_size)
+
+
+registry = get_model_registry()
+survey_version = selected_version(registry)
+use_online_model = ONLINE_LEARNING and survey_version == DEFAULT_VERSION
+
+if use_online_model:
+    updater = get_online_updater()
+    model = updater.model
+    # wersja z treści centroidów – licznik updater.version jest osobny w każdym
+    # procesie, a ten sam stan modelu ma w każdym ten sam skrót
+    model_version = centers_fingerprint(model)
+    context = context_from_model(
+        model,
+        get_all_participants(model, model_version),
+        get_all_distances(model, model_version),
+        get_cluster_names_and_descriptions(),
+        model_version=model_version,
+    )
+else:
+    # wersja ładowana leniwie z paczki (bundle.py) albo z pliku modelu PyCaret
+    context = in_background(f"Ładowanie modelu ({survey_version})…", registry.get, survey_version)
 
-# Sekcja: Ty vs Twoja grupa (porównanie)
-st.header("👤 Ty na tle swojej grupy")
+sketches = None
+if APPROX_STATS:
+    if use_online_model:
+        sketches = updater.sketches
+    else:
+        sketches = get_sketches(context, survey_version, context.model_version)
+
+group_stats = sketches
+# model online zmienia się co kilka minut, a jego przypisania i tak są w pamięci –
+# wspólna baza SQLite zostaje przy wersji z rejestru
+if group_stats is None and STATS_BACKEND == "sql" and not use_online_model:
+    group_stats = get_sql_stats(context, survey_version, context.model_version)
+
+profile = tuple(person[col] for col in COLUMNS)
+profile_cache = get_profile_cache()
+# ten sam klucz co w wariantach strony (app1.py–app3.py) – wspólne wyniki
+result_key = profile_key(person, survey_version, context.model_version, sketches)
+result = profile_cache.get(result_key)
+if result is None:
+    # przewidziana grupa jest na stronie, zanim policzą się statystyki grupy
+    prediction = in_background("Szukanie Twojej grupy…", predict_profile, context, person_df)
+    show_group_header(prediction["cluster"])
+
+    def compute_result():
+        result = complete_profile_result(context, person_df, prediction, group_stats)
+        profile_cache.put(result_key, result)
+        return result
+
+    result = in_background("Liczenie statystyk grupy…", compute_result)
+
+predicted_cluster_id = result["cluster_id"]
+predicted_cluster_data = result["cluster"]
+user_membership = result["membership"]
+
+# monitor dryfu: każdy nowy profil w sesji trafia do liczników (powtórne
+# przebiegi skryptu dla tego samego profilu się nie liczą)
+drift_monitor = get_drift_monitor(context, survey_version, context.model_version)
+if st.session_state.get("observed_profile") != (profile, survey_version):
+    drift_monitor.observe(person, predicted_cluster_id)
+    st.session_state.observed_profile = (profile, survey_version)
+
+if st.query_params.get("admin") == "1":
+    with st.sidebar.expander("Cache wyników profili"):
+        st.json(profile_cache.stats())
+    with st.sidebar.expander("Rejestr modeli"):
+        st.json(registry.stats())
+    if use_online_model:
+        with st.sidebar.expander("Model online"):
+            st.json({"model_version": context.model_version, **updater.stats()})
+    if context.partitions is not None:
+        with st.sidebar.expander("Segmenty zbioru"):
+            st.json({**context.partitions.stats(), "full_loaded": context.full_loaded})
+    with st.sidebar.expander("Dryf odpowiedzi"):
+        from drift import report_frame
+
+        drift_report = drift_monitor.report()
+        for row in drift_report:
+            if row["status"] == "alarm":
+                st.warning(f"Dryf: {LABELS.get(row['column'], 'Grupa')} – {row['largest_shift']}, PSI {row['psi']}")
+        st.dataframe(report_frame(drift_report), hide_index=True)
+    if sketches is not None:
+        with st.sidebar.expander("Statystyki przybliżone"):
+            st.metric("Różne profile w grupie (HyperLogLog)", result["distinct_profiles"])
+            if st.checkbox("Porównaj z dokładnymi liczbami"):
+                from sketches import compare_with_exact
+
+                exact = group_result(context.group_members(predicted_cluster_id)[0])
+                st.dataframe(compare_with_exact(result, exact), hide_index=True)
+
+show_group_header(predicted_cluster_data, result["group_size"])
+
+# Sekcja: jak mocno należysz do grupy
+st.header("🎯 Jak mocno należysz do grupy")
+
+second_cluster_data = result["second_cluster"]
 
 col1, col2 = st.columns(2)
 
 with col1:
-    st.subheader("Twoje dane")
-    st.dataframe(person_df, use_container_width=True)
+    st.metric(
+        "Siła przynależności",
+        f"{user_membership['strength']:.0%}",
+        help="Odsetek osób z twojej grupy, które są dalej od jej środka niż Ty",
+    )
 
 with col2:
-    st.subheader("Najczęstsze cechy w grupie")
-    summary = same_cluster_df.drop(columns=["Cluster"]).mode().iloc[0]
-    st.dataframe(summary.to_frame("Najczęściej"), use_container_width=True)
+    st.metric("Druga najbliższa grupa", second_cluster_data['name'])
 
-# Wykres kołowy – struktura grupy (%)
-st.header("📊 Struktura grupy (udziały %)")
+if user_membership["own_distance"] > 0:
+    ratio = user_membership["second_distance"] / user_membership["own_distance"]
+    st.markdown(f"Do grupy **{second_cluster_data['name']}** masz {ratio:.1f}× dalej niż do swojej.")
+else:
+    st.markdown(f"Jesteś dokładnie w środku swojej grupy – kolejna najbliższa to **{second_cluster_data['name']}**.")
+
+# Sekcja: podgrupy wewnątrz grupy (subclusters.py)
+subcluster = result["subcluster"]
+if subcluster is not None and deferred("🔎 Twoja podgrupa"):
+    st.header("🔎 Twoja podgrupa")
+    sizes = subcluster["sizes"]
+    st.markdown(
+        f"Twoja grupa dzieli się na {len(sizes)} podgrup(y). Najbliżej Ci do "
+        f"**podgrupy {subcluster['index'] + 1}** ({sizes[subcluster['index']]} z {sum(sizes)} osób)."
+    )
+    st.dataframe(
+        pd.DataFrame([
+            {
+                "Podgrupa": f"{j + 1}" + (" (Ty)" if j == subcluster["index"] else ""),
+                "Liczba osób": size,
+                **{LABELS[col]: value for col, value in typical.items()},
+            }
+            for j, (size, typical) in enumerate(zip(sizes, subcluster["summaries"]))
+        ]),
+        use_container_width=True,
+        hide_index=True,
+    )
 
-col1, col2 = st.columns(2)
+# Sekcja: co by było, gdyby – jedna zmieniona odpowiedź
+if deferred("🔀 Co by było, gdyby…"):
+    st.header("🔀 Co by było, gdyby…")
+    if result["what_if"]:
+        st.markdown("Te pojedyncze zmiany odpowiedzi przeniosłyby Cię do innej grupy:")
+        st.dataframe(
+            pd.DataFrame([
+                {
+                    "Pytanie": LABELS[change["column"]],
+                    "Odpowiedź": change["value"],
+                    "Nowa grupa": change["name"],
+                }
+                for change in result["what_if"]
+            ]),
+            use_container_width=True,
+            hide_index=True,
+        )
+    else:
+        st.markdown("Żadna pojedyncza zmiana odpowiedzi nie przeniesie Cię do innej grupy.")
 
-with col1:
-    fig = px.pie(
-        same_cluster_df,
-        names="gender",
-        title="Płeć w grupie",
-        hole=0.4
-    )
-    st.plotly_chart(fig, use_container_width=True)
+# wykresy: najpierw puste miejsca w układzie strony, potem równoległe budowanie
+# w puli wątków – każdy wykres trafia na stronę, gdy tylko jest gotowy
+placeholders = {}
 
-with col2:
-    fig = px.pie(
-        same_cluster_df,
-        names="edu_level",
-        title="Wykształcenie w grupie",
-        hole=0.4
-    )
-    st.plotly_chart(fig, use_container_width=True)
+st.header("Osoby z grupy")
+if deferred("Pokaż rozkłady odpowiedzi w grupie"):
+    for col, _, _ in HISTOGRAMS:
+        placeholders[f"hist_{col}"] = (st.empty(), False)
+
+# przeglądarka osób: na stronę trafia tylko PAGE_SIZE wierszy naraz
+if deferred("🗂️ Przeglądaj osoby z grupy"):
+    with st.container() if LITE_VIEW else st.expander("🗂️ Przeglądaj osoby z grupy"):
+        col1, col2 = st.columns(2)
+        with col1:
+            sort_by = st.selectbox(
+                "Sortuj według",
+                [None] + COLUMNS,
+                format_func=lambda col: "kolejność zapisu" if col is None else LABELS[col],
+            )
+        with col2:
+            descending = st.checkbox("Malejąco")
+        filter_cols = st.columns(len(COLUMNS))
+        filters = {}
+        for filter_col, col in zip(filter_cols, COLUMNS):
+            with filter_col:
+                choices = MULTI_OPTIONS[col] + [NO_CHOICE[col]] if col in MULTI_OPTIONS else OPTIONS[col]
+                filters[col] = st.multiselect(LABELS[col], choices, key=f"filter_{col}")
+        # podgrupa każdego członka jest policzona przy trenowaniu podgrup (subclusters.py)
+        member_subclusters = context.member_subclusters(predicted_cluster_id) if subcluster is not None else None
+        only_subcluster = member_subclusters is not None and st.checkbox(
+            f"Tylko moja podgrupa ({subcluster['index'] + 1})"
+        )
+
+        # kursory poprzednich stron; zmiana grupy, sortowania lub filtrów zaczyna od początku
+        browser_query = (
+            predicted_cluster_id, survey_version, sort_by, descending, tuple(map(tuple, filters.values())), only_subcluster
+        )
+        if st.session_state.get("browser_query") != browser_query:
+            st.session_state.browser_query = browser_query
+            st.session_state.browser_cursors = [None]
+        cursors = st.session_state.browser_cursors
+
+        members_df, _ = context.group_members(predicted_cluster_id)
+        group_size = len(members_df)
+        if only_subcluster:
+            members_df = members_df[member_subclusters == subcluster["index"]]
+        page_df, next_cursor, matching = page_members(members_df, sort_by, descending, filters, cursors[-1])
+        if context.aggregates is not None:
+            estimate = estimate_rows(group_size, context.aggregates.counts(predicted_cluster_id), filters)
+            if only_subcluster:
+                estimate = round(estimate * len(members_df) / max(group_size, 1))
+            st.caption(f"Pasujących osób: {matching} (szacunek z agregatów: ~{estimate}) · strona {len(cursors)} z {max(1, -(-matching // PAGE_SIZE))}")
+        else:
+            st.caption(f"Pasujących osób: {matching} · strona {len(cursors)} z {max(1, -(-matching // PAGE_SIZE))}")
+        st.dataframe(page_df.rename(columns=LABELS), use_container_width=True, hide_index=True)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.button("◀ Poprzednia", disabled=len(cursors) == 1, on_click=cursors.pop)
+        with col2:
+            st.button("Następna ▶", disabled=next_cursor is None, on_click=cursors.append, args=(next_cursor,))
 
-# Heatmapa preferencji (🔥)
-st.header("🔥 Heatmapa zależności (wybierz osie)")
+# Sekcja: Ty vs Twoja grupa (porównanie)
+st.header("👤 Ty na tle swojej grupy")
 
 col1, col2 = st.columns(2)
 
-categorical_columns = {
-    "Ulubione zwierzęta": "fav_animals",
-    "Ulubione miejsce": "fav_place",
-    "Wykształcenie": "edu_level",
-    "Płeć": "gender",
-    "Wiek": "age",
-}
-
 with col1:
-    x_label = st.selectbox(
-        "Oś X",
-        list(categorical_columns.keys()),
-        index=0
+    st.subheader("Twoje dane")
+    # wszystkie zaznaczone opcje, nie odpowiedź łączona widziana przez model
+    st.dataframe(
+        person_df.assign(**{col: choices_label(col, person[col]) for col in MULTI_OPTIONS}),
+        use_container_width=True,
     )
 
 with col2:
-    y_label = st.selectbox(
-        "Oś Y",
-        list(categorical_columns.keys()),
-        index=1
-    )
+    st.subheader("Najczęstsze cechy w grupie")
+    summary = pd.Series(result["summary"])
+    st.dataframe(summary.to_frame("Najczęściej"), use_container_width=True)
 
-x_col = categorical_columns[x_label]
-y_col = categorical_columns[y_label]
+# Wykres kołowy – struktura grupy (%)
+st.header("📊 Struktura grupy (udziały %)")
 
-if x_col == y_col:
-    st.warning("⚠️ Wybierz różne zmienne na osie X i Y")
-else:
-    heatmap_df = (
-        same_cluster_df
-        .groupby([x_col, y_col])
-        .size()
-        .reset_index(name="count")
-    )
+if deferred("Pokaż strukturę grupy"):
+    col1, col2 = st.columns(2)
 
-    fig = px.density_heatmap(
-        heatmap_df,
-        x=x_col,
-        y=y_col,
-        z="count",
-        color_continuous_scale="Blues",
-        title=f"{x_label} vs {y_label}"
-    )
+    with col1:
+        placeholders["pie_gender"] = (st.empty(), True)
 
-    fig.update_layout(
-        xaxis_title=x_label,
-        yaxis_title=y_label
-    )
+    with col2:
+        placeholders["pie_edu_level"] = (st.empty(), True)
 
-    st.plotly_chart(fig, use_container_width=True)
+# Heatmapa preferencji (🔥)
+st.header("🔥 Heatmapa zależności (wybierz osie)")
 
+heatmap_axes = None
+
+if deferred("Pokaż heatmapę"):
+    col1, col2 = st.columns(2)
+
+    categorical_columns = {
+        "Ulubione zwierzęta": "fav_animals",
+        "Ulubione miejsce": "fav_place",
+        "Wykształcenie": "edu_level",
+        "Płeć": "gender",
+        "Wiek": "age",
+    }
+
+    with col1:
+        x_label = st.selectbox(
+            "Oś X",
+            list(categorical_columns.keys()),
+            index=0
+        )
+
+    with col2:
+        y_label = st.selectbox(
+            "Oś Y",
+            list(categorical_columns.keys()),
+            index=1
+        )
+
+    x_col = categorical_columns[x_label]
+    y_col = categorical_columns[y_label]
+
+    if x_col == y_col:
+        st.warning("⚠️ Wybierz różne zmienne na osie X i Y")
+    else:
+        placeholders["heatmap"] = (st.empty(), True)
+        heatmap_axes = (x_col, y_col, x_label, y_label)
 
 # Radar – „profil typowej osoby w grupie”
 st.header("🧭 Profil typowej osoby z grupy")
+if deferred("Pokaż profil typowej osoby"):
+    placeholders["radar"] = (st.empty(), True)
 
-profile_counts = {
-    "Nad wodą": (same_cluster_df["fav_place"] == "Nad wodą").mean(),
-    "Las": (same_cluster_df["fav_place"] == "W lesie").mean(),
-    "Góry": (same_cluster_df["fav_place"] == "W górach").mean(),
-    "Psy": same_cluster_df["fav_animals"].isin(["Psy", "Koty i Psy"]).mean(),
-    "Koty": same_cluster_df["fav_animals"].isin(["Koty", "Koty i Psy"]).mean(),
-}
-
-radar_df = pd.DataFrame(
-    dict(
-        r=list(profile_counts.values()),
-        theta=list(profile_counts.keys())
-    )
-)
-
-fig = px.line_polar(
-    radar_df,
-    r="r",
-    theta="theta",
-    line_close=True,
-    title="Profil zainteresowań grupy"
-)
-
-fig.update_traces(fill="toself")
-st.plotly_chart(fig, use_container_width=True)
-
-# Ranking TOP 5 cech w grupie
+# Ranking TOP 5 cech w grupie – w profilu lite jedyny wykres od razu na stronie,
+# prosty wykres słupkowy z gotowego agregatu (bez Plotly)
 st.header("🏆 TOP cechy w Twojej grupie")
-
-fav_place_top = same_cluster_df["fav_place"].value_counts().head(5)
-fig = px.bar(
-    fav_place_top,
-    x=fav_place_top.values,
-    y=fav_place_top.index,
-    orientation="h",
-    title="Najpopularniejsze miejsca",
-    labels={"x": "Liczba osób", "y": "Miejsce"}
-)
-
-st.plotly_chart(fig, use_container_width=True)
\ No newline at end of file
+if LITE_VIEW:
+    st.bar_chart(pd.Series(result["top_places"], name="Liczba osób"))
+else:
+    placeholders["top_places"] = (st.empty(), True)
+
+draw_figures(placeholders, figure_tasks(result, heatmap_axes))
+
+# Podział uczestników wydarzenia na stoliki
+st.header("🪑 Podział uczestników na stoliki")
+if deferred("Pokaż podział na stoliki"):
+    st.markdown("Wgraj plik CSV (separator `;`) z odpowiedziami uczestników w formacie ankiety – posadzimy przy stolikach podobne osoby.")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        attendees_file = st.file_uploader("Lista uczestników", type="csv")
+
+    with col2:
+        table_size = st.number_input("Liczba osób przy stoliku", min_value=2, max_value=50, value=GROUP_SIZE)
+
+    if attendees_file is not None:
+        attendees_bytes = attendees_file.getvalue()
+        try:
+            assignments, table_summary = get_seating(
+                context, attendees_bytes, int(table_size), survey_version, context.model_version
+            )
+        except ValueError as e:
+            st.error(str(e))
+        else:
+            st.subheader("Podsumowanie stolików")
+            st.dataframe(table_summary, use_container_width=True, hide_index=True)
+
+            st.subheader("Przydział do stolików")
+            st.dataframe(assignments, use_container_width=True, hide_index=True)
+            st.download_button(
+                "Pobierz przydział (CSV)",
+                assignments.to_csv(sep=';', index=False).encode('utf-8'),
+                file_name="stoliki.csv",
+                mime="text/csv",
+            )
+
+            # kto pasuje do kogo – TOP-k z blokowej macierzy zgodności
+            st.subheader("🤝 Najlepsze dopasowania w kohorcie")
+            cohort_df, compatibility = get_top_k(context, attendees_bytes, survey_version, context.model_version)
+            person_idx = st.number_input(
+                "Numer uczestnika (wiersz w pliku, od 0)",
+                min_value=0,
+                max_value=len(cohort_df) - 1,
+                value=0,
+            )
+            matches, match_scores = compatibility.top_matches(int(person_idx))
+            st.dataframe(cohort_df.iloc[[int(person_idx)]], use_container_width=True)
+            st.dataframe(
+                cohort_df.iloc[matches].assign(**{"Zgodność": match_scores.round(3)}),
+                use_container_width=True,
+            )
+
+# czas całego przebiegu skryptu (każda interakcja to nowy przebieg)
+RERUN_SECONDS.labels("lite" if LITE_VIEW else "full").observe(time.perf_counter() - RUN_STARTED)
+
+if run_profile is not None:
+    del st.session_state.run_profile
+    st.sidebar.caption("Profil przebiegu: " + ", ".join(run_profile.stop()))
@@ -6,34 +6,26 @@ import streamlit as st
 st.set_page_config(page_title="Wyszukaj znajomych", layout="wide")
 
 import pandas as pd  # type: ignore
-from pycaret.clustering import load_model, predict_model  # type: ignore
-import plotly.express as px  # type: ignore
-import base64
-import json
+
+from assets import logo_html, theme_html
+from charts import histogram, pie
+# model, ocena zbioru i agregaty grupy są wspólne z app.py i pozostałymi
+# wariantami (resources.py) – tu jest tylko prezentacja
+from resources import draw_figures, profile_result
+from survey import MULTI_OPTIONS, OPTIONS, choices_answer, choices_label
 
 # ------------------ SESSION STATE ------------------
 if "dark_mode" not in st.session_state:
     st.session_state.dark_mode = True
 
-# ------------------ CONSTANTS ------------------
-MODEL_NAME = "welcome_survey_clustering_pipeline_v2"
-DATA = "welcome_survey_simple_v2.csv"
-CLUSTER_NAMES_AND_DESCRIPTIONS = "welcome_survey_cluster_names_and_descriptions_v2.json"
-
-# ------------------ CACHE ------------------
-@st.cache_data
-def get_model():
-    return load_model(MODEL_NAME)
-
-@st.cache_data
-def get_cluster_names_and_descriptions():
-    with open(CLUSTER_NAMES_AND_DESCRIPTIONS, "r", encoding="utf-8") as f:
-        return json.loads(f.read())
-
-@st.cache_data
-def get_all_participants(model):
-    all_df = pd.read_csv(DATA, sep=";")
-    return predict_model(model, data=all_df)
+# ------------------ WYKRESY ------------------
+HISTOGRAMS = [
+    ("age", "Rozkład wieku", "Wiek"),
+    ("edu_level", "Rozkład wykształcenia", "Wykształcenie"),
+    ("fav_animals", "Ulubione zwierzęta", "Zwierzęta"),
+    ("fav_place", "Ulubione miejsca", "Miejsca"),
+    ("gender", "Płeć", "Płeć"),
+]
 
 # ================== SIDEBAR ==================
 with st.sidebar:
@@ -44,50 +36,28 @@ with st.sidebar:
         st.session_state.dark_mode
     )
 
-    if st.session_state.dark_mode:
-        bg_color = "#1E1E2F"
-        secondary_bg = "#2C2C3E"
-        text_color = "#E5E5E5"
-        sidebar_text = "#E5E5E5"
-        metric_text_color = "#E5E5E5"
-        plotly_template = "plotly_dark"
-        logo_bg = "rgba(255,255,255,0.9)"
-        logo_text = "#111"
-    else:
-        bg_color = "#FFFFFF"
-        secondary_bg = "#F0F0F0"
-        text_color = "#111111"
-        sidebar_text = "#111111"
-        metric_text_color = "#111111"
-        plotly_template = "plotly_white"
-        logo_bg = "#FFFFFF"
-        logo_text = "#111"
+    # kolory obu motywów są w static/theme.css (zob. assets.py)
+    plotly_template = "plotly_dark" if st.session_state.dark_mode else "plotly_white"
 
     st.divider()
     st.header("Powiedz nam coś o sobie")
 
-    age = st.selectbox(
-        "Wiek",
-        ['<18', '18-24', '25-34', '35-44', '45-54', '55-64', '>=65', 'unknown']
-    )
-    edu_level = st.selectbox("Wykształcenie", ['Podstawowe', 'Średnie', 'Wyższe'])
-    fav_animals = st.selectbox(
-        "Ulubione zwierzęta",
-        ['Brak ulubionych', 'Psy', 'Koty', 'Koty i Psy', 'Inne']
-    )
-    fav_place = st.selectbox(
-        "Ulubione miejsce",
-        ['Nad wodą', 'W lesie', 'W górach', 'Inne']
-    )
-    gender = st.radio("Płeć", ['Kobieta', 'Mężczyzna'])
+    age = st.selectbox("Wiek", OPTIONS["age"])
+    edu_level = st.selectbox("Wykształcenie", OPTIONS["edu_level"])
+    animal_choices = st.multiselect("Ulubione zwierzęta", MULTI_OPTIONS["fav_animals"])
+    fav_animals = choices_answer("fav_animals", animal_choices)
+    fav_place = st.selectbox("Ulubione miejsce", OPTIONS["fav_place"])
+    gender = st.radio("Płeć", OPTIONS["gender"])
 
-    person_df = pd.DataFrame([{
+    person = {
         "age": age,
         "edu_level": edu_level,
         "fav_animals": fav_animals,
         "fav_place": fav_place,
         "gender": gender
-    }])
+    }
+    # do wyświetlenia wszystkie zaznaczone opcje
+    person_df = pd.DataFrame([{**person, "fav_animals": choices_label("fav_animals", fav_animals)}])
 
 # ================== GLOBAL CSS (TU JEST KLUCZ) ==================
 # st.markdown(
@@ -114,89 +84,16 @@ with st.sidebar:
 #     """,
 #     unsafe_allow_html=True
 # )
-st.markdown(
-    f"""
-    <style>
-    .stApp {{
-        background-color: {bg_color};
-        color: {text_color};
-    }}
-
-    section[data-testid="stSidebar"] {{
-        background-color: {secondary_bg};
-    }}
-
-    section[data-testid="stSidebar"] * {{
-        color: {sidebar_text} !important;
-    }}
-
-    /* METRIC */
-    div[data-testid="stMetric"] {{
-        --metric-value-color: {metric_text_color} !important;
-        --metric-label-color: {metric_text_color} !important;
-    }}
-
-    /* ✅ CHECKBOX – TO JEST KLUCZ */
-    input[type="checkbox"] {{
-        accent-color: #4da3ff;
-    }}
-    </style>
-    """,
-    unsafe_allow_html=True
-)
+# arkusz motywów z static/ – ten sam przy każdym przebiegu, motyw wybiera klasa znacznika
+st.markdown(theme_html(st.session_state.dark_mode, variant="app2"), unsafe_allow_html=True)
 
 # ================== MODEL ==================
-model = get_model()
-all_df = get_all_participants(model)
-cluster_names = get_cluster_names_and_descriptions()
-
-predicted_cluster_id = predict_model(model, data=person_df)["Cluster"].values[0]
-predicted_cluster_data = cluster_names[predicted_cluster_id]
-same_cluster_df = all_df[all_df["Cluster"] == predicted_cluster_id]
+context, result = profile_result(person)
+predicted_cluster_data = result["cluster"]
 
 # ================== LOGO ==================
-def img_to_base64(path):
-    with open(path, "rb") as f:
-        return base64.b64encode(f.read()).decode()
-
-logo_base64 = img_to_base64("logo.png")
-
-st.markdown(
-    f"""
-    <style>
-    .app-logo {{
-        position: fixed;
-        top: 60px;
-        right: 20px;
-        display: flex;
-        align-items: center;
-        gap: 10px;
-        z-index: 99999;
-        background: {logo_bg};
-        padding: 6px 10px;
-        border-radius: 8px;
-        box-shadow: 0 2px 6px rgba(0,0,0,0.2);
-        font-family: "Segoe UI", sans-serif;
-    }}
-
-    .app-logo img {{
-        height: 28px;
-    }}
-
-    .app-logo span {{
-        font-size: 16px;
-        font-weight: 700;
-        color: {logo_text};
-    }}
-    </style>
-
-    <div class="app-logo">
-        <img src="data:image/png;base64,{logo_base64}">
-        <span>by Bart</span>
-    </div>
-    """,
-    unsafe_allow_html=True
-)
+# obraz z adresu w static/ (zapisywany w cache przeglądarki), nie base64
+st.markdown(logo_html("by Bart"), unsafe_allow_html=True)
 
 # ================== CONTENT ==================
 st.title("🤝 Wyszukaj znajomych – analiza danych")
@@ -204,19 +101,16 @@ st.title("🤝 Wyszukaj znajomych – analiza danych")
 st.header(f"Najbliżej Ci do grupy: {predicted_cluster_data['name']}")
 st.markdown(predicted_cluster_data["description"])
 
-st.metric("Liczba twoich znajomych", len(same_cluster_df))
+st.metric("Liczba twoich znajomych", result["group_size"])
 
 # ================== WYKRESY ==================
-def show_hist(df, x, title, xlabel):
-    fig = px.histogram(df, x=x, title=title, template=plotly_template)
-    fig.update_layout(xaxis_title=xlabel, yaxis_title="Liczba osób")
-    st.plotly_chart(fig, use_container_width=True)
+# miejsca na stronie; wykresy (charts.py) trafiają na nie, gdy są gotowe
+placeholders = {}
+tasks = {}
 
-show_hist(same_cluster_df.sort_values("age"), "age", "Rozkład wieku", "Wiek")
-show_hist(same_cluster_df, "edu_level", "Rozkład wykształcenia", "Wykształcenie")
-show_hist(same_cluster_df, "fav_animals", "Ulubione zwierzęta", "Zwierzęta")
-show_hist(same_cluster_df, "fav_place", "Ulubione miejsca", "Miejsca")
-show_hist(same_cluster_df, "gender", "Płeć", "Płeć")
+for col, title, xlabel in HISTOGRAMS:
+    placeholders[f"hist_{col}"] = (st.empty(), True)
+    tasks[f"hist_{col}"] = (histogram, (result["multi_counts"].get(col, result["counts"][col]), title, xlabel))
 
 # ================== PORÓWNANIE ==================
 st.header("👤 Ty na tle swojej grupy")
@@ -228,7 +122,7 @@ with c1:
 
 with c2:
     st.subheader("Najczęstsze cechy w grupie")
-    summary = same_cluster_df.drop(columns=["Cluster"]).mode().iloc[0]
+    summary = pd.Series(result["summary"])
     st.dataframe(summary.to_frame("Najczęściej"), use_container_width=True)
 
 # ================== PIE ==================
@@ -236,21 +130,11 @@ st.header("📊 Struktura grupy")
 
 c1, c2 = st.columns(2)
 with c1:
-    fig = px.pie(
-        same_cluster_df,
-        names="gender",
-        hole=0.4,
-        title="Płeć",
-        template=plotly_template
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    placeholders["pie_gender"] = (st.empty(), True)
+    tasks["pie_gender"] = (pie, (result["counts"]["gender"], "Płeć"))
 
 with c2:
-    fig = px.pie(
-        same_cluster_df,
-        names="edu_level",
-        hole=0.4,
-        title="Wykształcenie",
-        template=plotly_template
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    placeholders["pie_edu_level"] = (st.empty(), True)
+    tasks["pie_edu_level"] = (pie, (result["counts"]["edu_level"], "Wykształcenie"))
+
+draw_figures(placeholders, tasks, template=plotly_template)
@@ -0,0 +1,66 @@
+# Logo i motywy stron z katalogu static/ (serwowanego przez Streamlit,
+# server.enableStaticServing w .streamlit/config.toml).
+#
+# Logo idzie do przeglądarki jako adres z wersją (?v=<skrót treści>) – przy
+# takim adresie serwer odsyła nagłówek Cache-Control na 10 lat, więc obraz
+# jest pobierany raz, a nie wysyłany w base64 przy każdym przebiegu skryptu.
+# Arkusz static/theme.css zawiera oba motywy; Streamlit wysyła pliki inne niż
+# obrazy jako text/plain z nosniff, więc arkusz trafia na stronę jako <style>
+# przy każdym przebiegu skryptu – ten koszt zostaje: ok. 1,1 KB na przebieg
+# (app2.py z własnymi regułami ok. 1,5 KB). Żeby był mały, arkusz jest raz na
+# proces i stronę oczyszczany z komentarzy i zbędnych odstępów, a reguły innych
+# stron (.ff-app2 itp.) są pomijane. Treść nie zależy od motywu – motyw
+# wybiera klasa znacznika (ff-theme-dark / ff-theme-light).
+
+import functools
+import hashlib
+import os
+import re
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+
+LOGO = "logo.png"
+
+THEME_CSS = "theme.css"
+
+# klasy znacznika wspólne dla wszystkich stron; inne klasy ff-* należą do jednej strony
+PAGE_CLASS = re.compile(r"\.ff-(?!theme\b|theme-dark\b|theme-light\b)([\w-]+)")
+
+
+@functools.lru_cache(maxsize=None)
+def static_url(name):
+    with open(os.path.join(STATIC_DIR, name), "rb") as f:
+        version = hashlib.sha1(f.read()).hexdigest()[:12]
+    return f"app/static/{name}?v={version}"
+
+
+def minify_css(css, variant=None):
+    # bez komentarzy i zbędnych odstępów, tylko reguły wspólne i strony variant
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    rules = []
+    for selector, body in re.findall(r"([^{}]+)\{([^{}]*)\}", css):
+        if any(page != variant for page in PAGE_CLASS.findall(selector)):
+            continue
+        selector = re.sub(r"\s*,\s*", ",", " ".join(selector.split()))
+        declarations = [" ".join(d.split()).replace(": ", ":", 1) for d in body.split(";") if d.strip()]
+        rules.append(f"{selector}{{{';'.join(declarations)}}}")
+    return "".join(rules)
+
+
+@functools.lru_cache(maxsize=None)
+def theme_css(variant=None):
+    with open(os.path.join(STATIC_DIR, THEME_CSS), "r", encoding="utf-8") as f:
+        return f"<style>{minify_css(f.read(), variant)}</style>"
+
+
+def theme_html(dark, variant=None):
+    # arkusz (zawsze ten sam) + znacznik motywu; variant: dodatkowa klasa
+    # dla reguł jednej strony (np. "app2")
+    classes = ["ff-theme", "ff-theme-dark" if dark else "ff-theme-light"]
+    if variant is not None:
+        classes.append(f"ff-{variant}")
+    return f'{theme_css(variant)}<div class="{" ".join(classes)}"></div>'
+
+
+def logo_html(caption):
+    return f'<div class="app-logo"><img src="{static_url(LOGO)}"><span>{caption}</span></div>'
@@ -0,0 +1,210 @@
+# Paczka artefaktów w jednym pliku: zakodowany zbiór, przypisania do klastrów,
+# centroidy, odległości, agregaty per klaster i opisy klastrów.
+# Układ pliku: MAGIC | u64 długość nagłówka | nagłówek JSON | tablice wyrównane do 64 B.
+# Procesy aplikacji otwierają plik przez mmap (tylko do odczytu), więc strony
+# są współdzielone między workerami – start to otwarcie pliku, nie parsowanie CSV.
+#
+# Budowanie: python bundle.py [wersja]   (domyślnie v2, zob. model_registry.py)
+
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+import pandas as pd  # type: ignore
+
+from distances import cluster_labels, compute_distances, pairwise_distances
+from encoding import encode_frame, encoder_spec
+from multiselect import legacy_frame
+from survey import COLUMNS, MISSING
+
+MAGIC = b"FFBNDL01"
+ALIGN = 64
+
+
+def _align(n):
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def build_bundle(path, model, all_df, descriptions, model_version=0):
+    labels = cluster_labels(model)
+    categories = {col: sorted(all_df[col].dropna().unique().tolist()) for col in COLUMNS}
+
+    # kody kolumnami (n_kolumn, n_wierszy) – każda kolumna jest ciągła w pliku,
+    # więc Categorical.from_codes dostaje widok bez kopiowania
+    codes = np.stack([
+        pd.Categorical(all_df[col], categories=categories[col]).codes.astype(np.int8)
+        for col in COLUMNS
+    ])
+    clusters = all_df["Cluster"].map({label: i for i, label in enumerate(labels)}).to_numpy(np.int16)
+
+    count_offsets = {}
+    counts = []
+    start = 0
+    for j, col in enumerate(COLUMNS):
+        n = len(categories[col])
+        valid = codes[j] >= 0
+        flat = clusters[valid].astype(np.int64) * n + codes[j][valid]
+        counts.append(np.bincount(flat, minlength=len(labels) * n).reshape(len(labels), n))
+        count_offsets[col] = [start, start + n]
+        start += n
+    # braki odpowiedzi (kod -1) na klaster i kolumnę – w agregatach pod survey.MISSING
+    missing_counts = np.stack([
+        np.bincount(clusters[codes[j] < 0], minlength=len(labels)) for j in range(len(COLUMNS))
+    ], axis=1)
+
+    arrays = {
+        "codes": codes,
+        "clusters": clusters,
+        "centroids": model[-1].cluster_centers_.astype(np.float64),
+        "distances": np.asarray(compute_distances(model, all_df[COLUMNS]), dtype=np.float32),
+        "cluster_sizes": np.bincount(clusters, minlength=len(labels)).astype(np.int64),
+        "category_counts": np.concatenate(counts, axis=1).astype(np.int64),
+        "missing_counts": missing_counts.astype(np.int64),
+    }
+
+    meta = {}
+    offset = 0
+    for name, array in arrays.items():
+        meta[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset = _align(offset + array.nbytes)
+
+    header = json.dumps({
+        "model_version": model_version,
+        "labels": labels,
+        "categories": categories,
+        "count_offsets": count_offsets,
+        "encoder": encoder_spec(model, legacy_frame(all_df[COLUMNS])),
+        "descriptions": descriptions,
+        "arrays": meta,
+    }, ensure_ascii=False).encode("utf-8")
+
+    # zapis atomowy, żeby działające workery nie zobaczyły połowy pliku
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        data_start = _align(f.tell())
+        for name, array in arrays.items():
+            f.seek(data_start + meta[name]["offset"])
+            f.write(np.ascontiguousarray(array).tobytes())
+    os.replace(tmp_path, path)
+
+
+class Bundle:
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} nie jest paczką artefaktów")
+
+        (header_len,) = struct.unpack_from("<Q", self._mmap, len(MAGIC))
+        header_start = len(MAGIC) + 8
+        self.header = json.loads(self._mmap[header_start:header_start + header_len].decode("utf-8"))
+
+        data_start = _align(header_start + header_len)
+        self.arrays = {}
+        for name, meta in self.header["arrays"].items():
+            shape = tuple(meta["shape"])
+            self.arrays[name] = np.frombuffer(
+                self._mmap,
+                dtype=np.dtype(meta["dtype"]),
+                count=int(np.prod(shape)),
+                offset=data_start + meta["offset"],
+            ).reshape(shape)
+
+    @property
+    def labels(self):
+        return self.header["labels"]
+
+    @property
+    def descriptions(self):
+        return self.header["descriptions"]
+
+    @property
+    def model_version(self):
+        return self.header["model_version"]
+
+    @property
+    def distances(self):
+        return self.arrays["distances"]
+
+    def to_frame(self):
+        codes = self.arrays["codes"]
+        categories = self.header["categories"]
+        df = pd.DataFrame({
+            col: pd.Categorical.from_codes(codes[j], categories=categories[col])
+            for j, col in enumerate(COLUMNS)
+        })
+        df["Cluster"] = pd.Categorical.from_codes(self.arrays["clusters"], categories=self.labels)
+        return df
+
+    # agregaty policzone przy budowie – ten sam interfejs co PartitionedDataset
+    # (partitions.py), więc przegląd grup i monitor dryfu nie czytają osób
+
+    @property
+    def sizes(self):
+        return dict(zip(self.labels, self.arrays["cluster_sizes"].tolist()))
+
+    def counts(self, label):
+        idx = self.labels.index(label)
+        row = self.arrays["category_counts"][idx]
+        counts = {}
+        for j, col in enumerate(COLUMNS):
+            start, stop = self.header["count_offsets"][col]
+            counts[col] = {
+                value: int(n) for value, n in zip(self.header["categories"][col], row[start:stop].tolist()) if n
+            }
+            missing = int(self.arrays["missing_counts"][idx, j])
+            if missing:
+                counts[col][MISSING] = missing
+        return counts
+
+    def value_counts(self, col):
+        if col == "Cluster":
+            return self.sizes
+        start, stop = self.header["count_offsets"][col]
+        totals = self.arrays["category_counts"][:, start:stop].sum(axis=0).tolist()
+        counts = {value: int(n) for value, n in zip(self.header["categories"][col], totals) if n}
+        missing = int(self.arrays["missing_counts"][:, COLUMNS.index(col)].sum())
+        if missing:
+            counts[MISSING] = missing
+        return counts
+
+    def encode(self, df):
+        return encode_frame(self.header["encoder"], df)
+
+    def predict(self, df):
+        # to samo co predict_model, ale bez PyCaret: kodowanie + najbliższy centroid
+        X = self.encode(df).astype(np.float64)
+        distances = pairwise_distances(X, self.arrays["centroids"])
+        return [self.labels[i] for i in distances.argmin(axis=1)], distances.astype(np.float32)
+
+
+def open_bundle(path):
+    return Bundle(path)
+
+
+if __name__ == "__main__":
+    import sys
+
+    from pycaret.clustering import load_model, predict_model  # type: ignore
+
+    from model_registry import DEFAULT_VERSION, discover, model_hash
+
+    from multiselect import legacy_frame
+    from survey import MULTI_OPTIONS
+
+    entry = discover()[sys.argv[1] if len(sys.argv) > 1 else DEFAULT_VERSION]
+    model = load_model(entry.model_name)
+    raw_df = pd.read_csv(entry.data, sep=';')
+    # model widzi odpowiedzi łączone, w paczce zostają pełne zbiory wyborów
+    all_df = predict_model(model, data=legacy_frame(raw_df))
+    all_df[list(MULTI_OPTIONS)] = raw_df[list(MULTI_OPTIONS)]
+    with open(entry.descriptions, "r", encoding='utf-8') as f:
+        descriptions = json.loads(f.read())
+    build_bundle(entry.bundle, model, all_df, descriptions, model_hash(entry))
+    print(f"Zapisano {entry.bundle}")
@@ -0,0 +1,161 @@
+# Wykresy budowane z gotowych agregatów (wynik compute_profile_result w app.py).
+# Każdy wykres jest niezależny od pozostałych, więc mogą powstawać równolegle
+# w puli wątków i trafiać na stronę w kolejności ukończenia. Plotly jest
+# importowany dopiero przy budowaniu pierwszego wykresu.
+
+from concurrent.futures import as_completed
+
+import pandas as pd  # type: ignore
+
+from metrics import FIGURE_SECONDS
+
+FIGURE_WORKERS = 4
+
+HISTOGRAMS = [
+    ("age", "Rozkład wieku w grupie", "Wiek"),
+    ("edu_level", "Rozkład wykształcenia w grupie", "Wykształcenie"),
+    ("fav_animals", "Rozkład ulubionych zwierząt w grupie", "Ulubione zwierzęta"),
+    ("fav_place", "Rozkład ulubionych miejsc w grupie", "Ulubione miejsce"),
+    ("gender", "Rozkład płci w grupie", "Płeć"),
+]
+
+
+def histogram(counts, title, xaxis_title):
+    import plotly.express as px  # type: ignore
+
+    fig = px.histogram(x=list(counts.keys()), y=list(counts.values()), histfunc="sum")
+    fig.update_layout(
+        title=title,
+        xaxis_title=xaxis_title,
+        yaxis_title="Liczba osób",
+    )
+    return fig
+
+
+def pie(counts, title):
+    import plotly.express as px  # type: ignore
+
+    return px.pie(
+        names=list(counts.keys()),
+        values=list(counts.values()),
+        title=title,
+        hole=0.4
+    )
+
+
+def heatmap(heatmap_df, x_col, y_col, x_label, y_label):
+    import plotly.express as px  # type: ignore
+
+    fig = px.density_heatmap(
+        heatmap_df,
+        x=x_col,
+        y=y_col,
+        z="count",
+        color_continuous_scale="Blues",
+        title=f"{x_label} vs {y_label}"
+    )
+
+    fig.update_layout(
+        xaxis_title=x_label,
+        yaxis_title=y_label
+    )
+    return fig
+
+
+def radar(profile_counts):
+    import plotly.express as px  # type: ignore
+
+    radar_df = pd.DataFrame(
+        dict(
+            r=list(profile_counts.values()),
+            theta=list(profile_counts.keys())
+        )
+    )
+
+    fig = px.line_polar(
+        radar_df,
+        r="r",
+        theta="theta",
+        line_close=True,
+        title="Profil zainteresowań grupy"
+    )
+
+    fig.update_traces(fill="toself")
+    return fig
+
+
+def top_places(top_places):
+    import plotly.express as px  # type: ignore
+
+    fav_place_top = pd.Series(top_places, dtype="int64")
+    return px.bar(
+        fav_place_top,
+        x=fav_place_top.values,
+        y=fav_place_top.index,
+        orientation="h",
+        title="Najpopularniejsze miejsca",
+        labels={"x": "Liczba osób", "y": "Miejsce"}
+    )
+
+
+def share_heatmap(matrix):
+    # strona przeglądu: grupy × (pytanie, odpowiedź), kolor = udział w grupie
+    import plotly.express as px  # type: ignore
+
+    columns = [f"{question}: {answer}" for question, answer in matrix.columns]
+    fig = px.imshow(
+        matrix.to_numpy(),
+        x=columns,
+        y=list(matrix.index),
+        color_continuous_scale="Blues",
+        zmin=0,
+        zmax=1,
+        aspect="auto",
+        text_auto=".0%",
+        title="Udział odpowiedzi w każdej grupie",
+    )
+    fig.update_layout(xaxis_title=None, yaxis_title=None, coloraxis_colorbar_tickformat=".0%")
+    return fig
+
+
+def small_multiples(shares_df, title):
+    # jeden mały wykres na grupę, wspólna oś odpowiedzi i skala udziałów
+    import plotly.express as px  # type: ignore
+
+    long_df = shares_df.rename_axis("Grupa").reset_index().melt(
+        id_vars="Grupa", var_name="Odpowiedź", value_name="Udział"
+    )
+    fig = px.bar(long_df, x="Odpowiedź", y="Udział", facet_col="Grupa", facet_col_wrap=4, title=title)
+    fig.for_each_annotation(lambda annotation: annotation.update(text=annotation.text.split("=", 1)[-1]))
+    fig.update_yaxes(tickformat=".0%", range=[0, 1], title=None)
+    fig.update_xaxes(title=None)
+    return fig
+
+
+def figure_tasks(result, heatmap_axes=None):
+    # nazwa miejsca na stronie -> (funkcja, argumenty)
+    # pytania wielokrotnego wyboru: słupek na każdą opcję (multiselect.py)
+    tasks = {
+        f"hist_{col}": (histogram, (result["multi_counts"].get(col, result["counts"][col]), title, xaxis_title))
+        for col, title, xaxis_title in HISTOGRAMS
+    }
+    tasks["pie_gender"] = (pie, (result["counts"]["gender"], "Płeć w grupie"))
+    tasks["pie_edu_level"] = (pie, (result["counts"]["edu_level"], "Wykształcenie w grupie"))
+    if heatmap_axes is not None:
+        x_col, y_col, x_label, y_label = heatmap_axes
+        tasks["heatmap"] = (heatmap, (result["pair_counts"][(x_col, y_col)], x_col, y_col, x_label, y_label))
+    tasks["radar"] = (radar, (result["radar"],))
+    tasks["top_places"] = (top_places, (result["top_places"],))
+    return tasks
+
+
+def _timed(name, fn, *args):
+    with FIGURE_SECONDS.labels(name).time():
+        return fn(*args)
+
+
+def build_figures(executor, tasks):
+    # generator (nazwa, wykres) w kolejności ukończenia, a nie zlecenia
+    futures = {executor.submit(_timed, name, fn, *args): name for name, (fn, args) in tasks.items()}
+    for future in as_completed(futures):
+        yield futures[future], future.result()
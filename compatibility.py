@@ -0,0 +1,141 @@
+# Macierz zgodności "kto pasuje do kogo" dla kohorty, liczona blokami.
+#
+# Podobieństwo dwóch osób to 1 / (1 + d), gdzie d to odległość euklidesowa
+# ich odpowiedzi zakodowanych tak samo jak w pipeline klastrowania
+# (ScoringContext.encode). Pełna macierz N×N nie powstaje w pamięci:
+# liczymy bloki BLOCK_SIZE×BLOCK_SIZE (mieszczące się w cache) i albo
+# zapisujemy je do pliku .npy otwieranego przez mmap (build_dense), albo
+# zostawiamy dla każdej osoby tylko TOP_K najlepszych dopasowań (build_top_k).
+# Bloki wierszy mogą być liczone równolegle – mnożenie macierzy w NumPy
+# zwalnia GIL.
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+BLOCK_SIZE = 1024
+TOP_K = 10
+
+
+def _similarity_block(Xa, Xb, sq_a, sq_b):
+    d2 = sq_a[:, None] - 2 * Xa @ Xb.T + sq_b[None, :]
+    np.maximum(d2, 0, out=d2)
+    np.sqrt(d2, out=d2)
+    d2 += 1
+    return np.reciprocal(d2, out=d2)
+
+
+def _row_blocks(n, block_size):
+    return [(start, min(start + block_size, n)) for start in range(0, n, block_size)]
+
+
+def _run(fn, blocks, workers):
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        for block in blocks:
+            fn(*block)
+        return
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(lambda block: fn(*block), blocks))
+
+
+def build_top_k(X, k=TOP_K, block_size=BLOCK_SIZE, workers=None):
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    n = len(X)
+    k = max(0, min(k, n - 1))
+    sq = (X ** 2).sum(axis=1)
+    indices = np.empty((n, k), dtype=np.int32)
+    scores = np.empty((n, k), dtype=np.float32)
+    if k == 0:
+        return CompatibilityIndex(indices, scores)
+
+    def rows(start, stop):
+        best_scores = np.full((stop - start, k), -np.inf, dtype=np.float32)
+        best_indices = np.full((stop - start, k), -1, dtype=np.int32)
+        row_ids = np.arange(start, stop)
+        for col_start, col_stop in _row_blocks(n, block_size):
+            S = _similarity_block(X[start:stop], X[col_start:col_stop], sq[start:stop], sq[col_start:col_stop])
+            # bez dopasowania osoby do samej siebie
+            own = (row_ids >= col_start) & (row_ids < col_stop)
+            S[np.flatnonzero(own), row_ids[own] - col_start] = -np.inf
+
+            candidate_scores = np.concatenate([best_scores, S], axis=1)
+            candidate_indices = np.concatenate([
+                best_indices,
+                np.broadcast_to(np.arange(col_start, col_stop, dtype=np.int32), S.shape),
+            ], axis=1)
+            keep = np.argpartition(-candidate_scores, k - 1, axis=1)[:, :k]
+            best_scores = np.take_along_axis(candidate_scores, keep, axis=1)
+            best_indices = np.take_along_axis(candidate_indices, keep, axis=1)
+
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        scores[start:stop] = np.take_along_axis(best_scores, order, axis=1)
+        indices[start:stop] = np.take_along_axis(best_indices, order, axis=1)
+
+    _run(rows, _row_blocks(n, block_size), workers)
+    return CompatibilityIndex(indices, scores)
+
+
+def build_dense(X, path, block_size=BLOCK_SIZE, workers=None):
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    n = len(X)
+    sq = (X ** 2).sum(axis=1)
+    out = np.lib.format.open_memmap(path, mode='w+', dtype=np.float32, shape=(n, n))
+
+    def rows(start, stop):
+        for col_start, col_stop in _row_blocks(n, block_size):
+            out[start:stop, col_start:col_stop] = _similarity_block(
+                X[start:stop], X[col_start:col_stop], sq[start:stop], sq[col_start:col_stop]
+            )
+        # podobieństwo osoby do samej siebie jest dokładnie 1 – wzór z |x|^2
+        # w float32 daje tu resztę z odejmowania, którą sqrt wzmacnia
+        own = np.arange(start, stop)
+        out[own, own] = 1.0
+
+    _run(rows, _row_blocks(n, block_size), workers)
+    out.flush()
+    del out
+    return np.load(path, mmap_mode='r')
+
+
+class CompatibilityIndex:
+    # dla każdej osoby: indeksy i wyniki TOP-k dopasowań, malejąco
+
+    def __init__(self, indices, scores):
+        self.indices = indices
+        self.scores = scores
+
+    def top_matches(self, i, k=TOP_K):
+        return self.indices[i, :k], self.scores[i, :k]
+
+    def save(self, prefix):
+        np.save(f"{prefix}_indices.npy", self.indices)
+        np.save(f"{prefix}_scores.npy", self.scores)
+
+    @classmethod
+    def load(cls, prefix):
+        return cls(
+            np.load(f"{prefix}_indices.npy", mmap_mode='r'),
+            np.load(f"{prefix}_scores.npy", mmap_mode='r'),
+        )
+
+
+if __name__ == "__main__":
+    import sys
+
+    import pandas as pd  # type: ignore
+
+    from model_registry import DEFAULT_VERSION, discover, load_context
+    from survey import COLUMNS
+
+    # python compatibility.py kohorta.csv [nr_osoby] [k]
+    cohort = pd.read_csv(sys.argv[1], sep=';')[COLUMNS]
+    person = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    k = int(sys.argv[3]) if len(sys.argv) > 3 else TOP_K
+    context = load_context(discover()[DEFAULT_VERSION])
+    index = build_top_k(context.encode(cohort), k=k)
+    matches, match_scores = index.top_matches(person, k)
+    print(cohort.iloc[[person]].to_string())
+    print(cohort.iloc[matches].assign(zgodność=match_scores.round(3)).to_string())
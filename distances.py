@@ -0,0 +1,86 @@
+# Odległości każdej osoby do każdego centroidu KMeans, liczone raz,
+# wektorowo, w float32. Dla dużych zbiorów macierz trafia do pliku .npy
+# otwieranego przez mmap, zamiast trzymać ją w pamięci procesu. Plik jest
+# zapisywany obok i podmieniany atomowo (os.replace).
+
+import hashlib
+import os
+
+import numpy as np
+
+from multiselect import legacy_frame
+
+MEMMAP_MIN_ROWS = 100_000   # od tylu wierszy macierz ląduje w pliku
+CHUNK_ROWS = 50_000         # tyle wierszy kodujemy naraz
+
+
+def cluster_labels(model):
+    # te same etykiety, które zwraca predict_model w kolumnie "Cluster"
+    return [f"Cluster {i}" for i in range(model[-1].n_clusters)]
+
+
+def centers_fingerprint(model):
+    # krótki skrót centroidów – ta sama wersja modelu w każdym procesie ma ten
+    # sam skrót, więc i ten sam plik macierzy odległości
+    return hashlib.sha1(np.ascontiguousarray(model[-1].cluster_centers_).tobytes()).hexdigest()[:12]
+
+
+def encode(model, df):
+    # wszystkie kroki pipeline'u poza samym KMeans (imputacja, kodowanie);
+    # wybory wielokrotne jako odpowiedzi łączone, na których uczono model
+    return model[:-1].transform(legacy_frame(df)).to_numpy(dtype=np.float32)
+
+
+def pairwise_distances(X, centers):
+    # |x - c|^2 = |x|^2 - 2 x·c + |c|^2, bez pętli po klastrach
+    sq = (X ** 2).sum(axis=1)[:, None] - 2 * X @ centers.T + (centers ** 2).sum(axis=1)[None, :]
+    return np.sqrt(np.maximum(sq, 0, out=sq), out=sq)
+
+
+def compute_distances(model, df, path=None):
+    centers = model[-1].cluster_centers_.astype(np.float32)
+    shape = (len(df), len(centers))
+
+    use_memmap = path is not None and len(df) >= MEMMAP_MIN_ROWS
+    if use_memmap:
+        # plik tymczasowy tego procesu, potem podmiana – inne procesy i starsze
+        # mmapy czytają dalej poprzednią zawartość, nigdy plik w połowie zapisu
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        out = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float32, shape=shape)
+    else:
+        out = np.empty(shape, dtype=np.float32)
+
+    for start in range(0, len(df), CHUNK_ROWS):
+        X = encode(model, df.iloc[start:start + CHUNK_ROWS])
+        out[start:start + len(X)] = pairwise_distances(X, centers)
+
+    if use_memmap:
+        out.flush()
+        del out
+        os.replace(tmp_path, path)
+        return np.load(path, mmap_mode='r')
+    return out
+
+
+def own_distances(distances, cluster_idx):
+    # odległość każdej osoby od środka jej własnej grupy
+    return np.asarray(distances[np.arange(len(cluster_idx)), cluster_idx])
+
+
+def share_farther(group_distances, own_distance):
+    # siła przynależności: jaki odsetek osób z grupy (group_distances – ich
+    # odległości od środka grupy) jest dalej od niego niż użytkownik
+    return float((group_distances >= own_distance).mean()) if len(group_distances) else 1.0
+
+
+def membership(strength, cluster_idx, user_distances):
+    # strength: share_farther albo to samo policzone przez źródło statystyk
+    # (group_stats.py, sketches.py); druga grupa: kolejny najbliższy centroid
+    order = np.argsort(user_distances)
+    second_idx = int(order[1]) if order[0] == cluster_idx else int(order[0])
+    return {
+        "strength": strength,
+        "own_distance": float(user_distances[cluster_idx]),
+        "second_idx": second_idx,
+        "second_distance": float(user_distances[second_idx]),
+    }
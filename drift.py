@@ -0,0 +1,190 @@
+# Monitor dryfu odpowiedzi: czy nowi respondenci wyglądają jak ci, na których
+# trenowano klastry (welcome_survey_simple_<wersja>.csv)?
+#
+# Dla każdej kolumny ankiety i dla przewidzianego klastra trzymamy liczniki
+# kategorii z ostatnich WINDOW ocenionych odpowiedzi (bufor cykliczny).
+# Aktualizacja to stała liczba operacji na odpowiedź: zdjęcie najstarszej
+# obserwacji z liczników i dodanie nowej. PSI i chi-kwadrat względem rozkładu
+# treningowego liczymy z liczników na żądanie – koszt zależy tylko od liczby
+# kategorii, nie od liczby odpowiedzi.
+#
+# Użycie offline: python drift.py nowe_odpowiedzi.csv [wersja]
+
+import threading
+
+import numpy as np
+import pandas as pd  # type: ignore
+
+from multiselect import legacy_frame
+from survey import COLUMNS, LABELS, MISSING, MULTI_OPTIONS, OPTIONS, choice_mask, legacy_answer, parse_choices
+
+WINDOW = 1000
+MIN_OBSERVATIONS = 50      # poniżej tego nie ogłaszamy alarmów
+PSI_WARNING = 0.1
+PSI_ALERT = 0.25
+P_VALUE_ALERT = 0.001
+EPSILON = 1e-4             # zamiast zera w PSI (log z 0)
+
+
+def _bins(column, labels):
+    return (list(labels) if column == "Cluster" else list(OPTIONS[column])) + [MISSING]
+
+
+def _codes(values, bins):
+    # ostatni kosz to braki i odpowiedzi spoza listy
+    codes = pd.Categorical(values, categories=bins[:-1]).codes.astype(np.int64)
+    codes[codes < 0] = len(bins) - 1
+    return codes
+
+
+def _legacy(col, value):
+    # wybory wielokrotne ("Psy|Inne") porównujemy z treningiem jako odpowiedzi łączone
+    if col in MULTI_OPTIONS and isinstance(value, str) and value != MISSING:
+        return legacy_answer(col, choice_mask(col, parse_choices(col, value)))
+    return value
+
+
+def reference_counts(df):
+    # {kolumna: {odpowiedź: liczba}} dla rozkładu treningowego (także "Cluster")
+    return {
+        col: df[col].astype(object).fillna(MISSING).value_counts().to_dict()
+        for col in COLUMNS + ["Cluster"]
+    }
+
+
+def psi(observed, expected):
+    p = np.maximum(observed / max(observed.sum(), 1), EPSILON)
+    q = np.maximum(expected, EPSILON)
+    return float(((p - q) * np.log(p / q)).sum())
+
+
+def chi_square(observed, expected):
+    from scipy.stats import chi2  # type: ignore
+
+    n = observed.sum()
+    present = expected > 0
+    expected_counts = expected[present] * n
+    statistic = float(((observed[present] - expected_counts) ** 2 / expected_counts).sum())
+    # obserwacje w koszach, których nie było w danych treningowych
+    unseen = observed[~present].sum()
+    if unseen:
+        statistic = float("inf")
+    return statistic, float(chi2.sf(statistic, max(int(present.sum()) - 1, 1)))
+
+
+class DriftMonitor:
+
+    def __init__(self, reference, labels, window=WINDOW):
+        # reference: liczności z reference_counts() albo PartitionedDataset.value_counts
+        self.columns = COLUMNS + ["Cluster"]
+        self.bins = {col: _bins(col, labels) for col in self.columns}
+        self.window = window
+        self._index = {col: {value: i for i, value in enumerate(self.bins[col][:-1])} for col in self.columns}
+        self.expected = {}
+        for col in self.columns:
+            counts = np.zeros(len(self.bins[col]))
+            for value, n in reference[col].items():
+                counts[self._index[col].get(_legacy(col, value), len(self.bins[col]) - 1)] += n
+            self.expected[col] = counts / max(counts.sum(), 1)
+
+        self._lock = threading.Lock()
+        self._buffer = np.full((window, len(self.columns)), -1, dtype=np.int64)   # -1: puste miejsce
+        self._counts = {col: np.zeros(len(self.bins[col]), dtype=np.int64) for col in self.columns}
+        self._next = 0
+        self.observed_total = 0
+
+    def observe(self, person, cluster_label):
+        # ścieżka dla pojedynczej predykcji – bez pandas, kilka odczytów ze słowników
+        values = {**person, "Cluster": cluster_label}
+        codes = [self._index[col].get(_legacy(col, values.get(col)), len(self.bins[col]) - 1) for col in self.columns]
+        with self._lock:
+            slot = self._next
+            for j, col in enumerate(self.columns):
+                evicted = self._buffer[slot, j]
+                if evicted >= 0:
+                    self._counts[col][evicted] -= 1
+                self._counts[col][codes[j]] += 1
+            self._buffer[slot] = codes
+            self._next = (slot + 1) % self.window
+            self.observed_total += 1
+
+    def observe_frame(self, df, cluster_labels):
+        frame = legacy_frame(df[COLUMNS]).astype(object).assign(Cluster=list(cluster_labels))
+        codes = np.stack([_codes(frame[col], self.bins[col]) for col in self.columns], axis=1)
+        self._push(codes[-self.window:], len(codes))
+
+    def _push(self, codes, total):
+        with self._lock:
+            slots = (self._next + (total - len(codes)) + np.arange(len(codes))) % self.window
+            old = self._buffer[slots]
+            for j, col in enumerate(self.columns):
+                evicted = old[:, j]
+                np.add.at(self._counts[col], evicted[evicted >= 0], -1)
+                np.add.at(self._counts[col], codes[:, j], 1)
+            self._buffer[slots] = codes
+            self._next = (self._next + total) % self.window
+            self.observed_total += total
+
+    def report(self):
+        with self._lock:
+            counts = {col: values.copy() for col, values in self._counts.items()}
+        rows = []
+        for col in self.columns:
+            observed = counts[col]
+            n = int(observed.sum())
+            if n:
+                value = psi(observed, self.expected[col])
+                statistic, p_value = chi_square(observed, self.expected[col])
+            else:
+                value, statistic, p_value = 0.0, 0.0, 1.0
+            if n < MIN_OBSERVATIONS:
+                status = "za mało danych"
+            elif value >= PSI_ALERT or p_value < P_VALUE_ALERT:
+                status = "alarm"
+            elif value >= PSI_WARNING:
+                status = "ostrzeżenie"
+            else:
+                status = "ok"
+            shift = observed / max(n, 1) - self.expected[col]
+            top = int(np.abs(shift).argmax())
+            rows.append({
+                "column": col,
+                "observations": n,
+                "psi": round(value, 4),
+                "chi2": round(statistic, 2),
+                "p_value": p_value,
+                "status": status,
+                "largest_shift": f"{self.bins[col][top]} ({shift[top]:+.1%})",
+            })
+        return rows
+
+    def alerts(self):
+        return [row for row in self.report() if row["status"] == "alarm"]
+
+
+def report_frame(rows):
+    return pd.DataFrame([
+        {
+            "Kolumna": LABELS.get(row["column"], "Grupa"),
+            "Odpowiedzi w oknie": row["observations"],
+            "PSI": row["psi"],
+            "Chi²": row["chi2"],
+            "p": round(row["p_value"], 4),
+            "Największa zmiana": row["largest_shift"],
+            "Stan": row["status"],
+        }
+        for row in rows
+    ])
+
+
+if __name__ == "__main__":
+    import sys
+
+    from model_registry import DEFAULT_VERSION, discover, load_context
+
+    context = load_context(discover()[sys.argv[2] if len(sys.argv) > 2 else DEFAULT_VERSION])
+    responses = pd.read_csv(sys.argv[1], sep=';')
+    monitor = DriftMonitor(reference_counts(context.all_df), context.labels, window=max(WINDOW, len(responses)))
+    predicted_labels, _ = context.predict(responses[COLUMNS])
+    monitor.observe_frame(responses, predicted_labels)
+    print(report_frame(monitor.report()).to_string(index=False))
@@ -0,0 +1,49 @@
+# Kodowanie odpowiedzi dokładnie tak, jak robi to pipeline PyCaret
+# (imputacja najczęstszą wartością, kodowanie porządkowe płci, one-hot
+# reszty), ale samym NumPy – bez ładowania PyCaret w procesie aplikacji.
+
+import numpy as np
+import pandas as pd  # type: ignore
+
+from multiselect import legacy_frame
+from survey import COLUMNS
+
+
+def encoder_spec(model, sample_df):
+    # spec jest zwykłym dict-em (JSON), żeby dało się go zapisać w paczce
+    steps = model.named_steps
+    imputer = steps['categorical_imputer']
+    fill = dict(zip(imputer.include, imputer.transformer.statistics_.tolist()))
+
+    ordinal = {}
+    for item in steps['ordinal_encoding'].transformer.mapping:
+        mapping = item['mapping']
+        ordinal[item['col']] = {
+            str(value): int(code) for value, code in mapping.items() if not pd.isna(value)
+        }
+
+    features = []
+    for name in model[:-1].transform(sample_df.head(1)).columns:
+        if name in ordinal:
+            features.append([name, None])
+            continue
+        column = max((c for c in COLUMNS if name.startswith(f"{c}_")), key=len)
+        features.append([column, name[len(column) + 1:]])
+
+    return {"columns": COLUMNS, "fill": fill, "ordinal": ordinal, "features": features}
+
+
+def encode_frame(spec, df):
+    out = np.zeros((len(df), len(spec["features"])), dtype=np.float32)
+    # wybory wielokrotne jako odpowiedzi łączone, na których uczono model
+    df = legacy_frame(df)
+    # kolumny kategoryczne (np. z paczki) jako zwykłe wartości – uzupełnienie
+    # i mapowanie nie mogą być ograniczone do istniejących kategorii
+    filled = {col: df[col].astype(object).fillna(spec["fill"][col]) for col in spec["columns"]}
+    for j, (column, value) in enumerate(spec["features"]):
+        if value is None:
+            # nieznana kategoria -> -1, tak jak w category_encoders
+            out[:, j] = filled[column].map(spec["ordinal"][column]).fillna(-1).to_numpy()
+        else:
+            out[:, j] = (filled[column] == value).to_numpy()
+    return out
@@ -0,0 +1,302 @@
+# Eksport wszystkich stron wyników do statycznego katalogu, który można
+# serwować zwykłym serwerem plików / CDN – bez Pythona w czasie zapytania.
+#
+# Wykresy zależą tylko od grupy (i motywu), więc zapisujemy je raz na klaster:
+#   site/index.html                    – formularz + render po stronie klienta
+#   site/plotly.min.js                 – Plotly.js z pakietu plotly
+#   site/profiles.json                 – profil (5 odpowiedzi) -> grupa, siła przynależności;
+#                                        pytania wielokrotnego wyboru jako zbiór
+#                                        wyborów ("Psy|Inne", survey.choices_answer)
+#   site/clusters/<motyw>/<nr>.json    – opis, liczebność, podsumowanie i wykresy (Plotly JSON)
+#
+# Użycie: python export_static.py [katalog] [wersja]
+
+import json
+import os
+import shutil
+import sys
+from itertools import combinations, product
+
+import pandas as pd  # type: ignore
+
+from charts import figure_tasks, heatmap
+from distances import membership, share_farther
+from model_registry import DEFAULT_VERSION, discover, load_context
+from results import group_result
+from survey import COLUMNS, LABELS, MULTI_OPTIONS, NO_CHOICE, OPTIONS, choices_answer
+
+SITE_DIR = 'site'
+
+THEMES = {
+    "dark": "plotly_dark",
+    "light": "plotly_white",
+}
+
+
+def profile_key(values):
+    return "|".join(values)
+
+
+def answers(col):
+    # odpowiedzi do wyboru; w pytaniach wielokrotnego wyboru każdy zbiór wyborów
+    if col not in MULTI_OPTIONS:
+        return OPTIONS[col]
+    options = MULTI_OPTIONS[col]
+    return [choices_answer(col, chosen) for size in range(len(options) + 1) for chosen in combinations(options, size)]
+
+
+def export_profiles(context):
+    # wszystkie kombinacje odpowiedzi oceniane jedną predykcją wsadową
+    profiles_df = pd.DataFrame(list(product(*(answers(col) for col in COLUMNS))), columns=COLUMNS)
+    predicted_labels, distances = context.predict(profiles_df)
+
+    group_distances = {label: context.group_members(label)[1] for label in context.labels}
+    profiles = {}
+    for i, values in enumerate(profiles_df.itertuples(index=False)):
+        cluster_idx = context.labels.index(predicted_labels[i])
+        profiles[profile_key(values)] = {
+            "cluster": cluster_idx,
+            "membership": membership(
+                share_farther(group_distances[predicted_labels[i]], distances[i][cluster_idx]), cluster_idx, distances[i]
+            ),
+        }
+    return profiles
+
+
+def export_cluster(context, cluster_idx, template):
+    label = context.labels[cluster_idx]
+    result = group_result(context.group_members(label)[0])
+
+    figures = {}
+    for name, (fn, args) in figure_tasks(result).items():
+        figures[name] = fn(*args)
+    heatmaps = {}
+    for x_col, y_col in result["pair_counts"]:
+        heatmaps[profile_key((x_col, y_col))] = heatmap(
+            result["pair_counts"][(x_col, y_col)], x_col, y_col, LABELS[x_col], LABELS[y_col]
+        )
+
+    def to_json(fig):
+        fig.update_layout(template=template)
+        return json.loads(fig.to_json())
+
+    return {
+        **context.descriptions[label],
+        "group_size": result["group_size"],
+        "summary": {col: None if pd.isna(value) else value for col, value in result["summary"].items()},
+        "figures": {name: to_json(fig) for name, fig in figures.items()},
+        "heatmaps": {name: to_json(fig) for name, fig in heatmaps.items()},
+    }
+
+
+def export_site(site_dir=SITE_DIR, version=DEFAULT_VERSION):
+    import plotly  # type: ignore
+
+    context = load_context(discover()[version])
+    profiles = export_profiles(context)
+    clusters = sorted({profile["cluster"] for profile in profiles.values()})
+
+    os.makedirs(site_dir, exist_ok=True)
+    for theme, template in THEMES.items():
+        theme_dir = os.path.join(site_dir, "clusters", theme)
+        os.makedirs(theme_dir, exist_ok=True)
+        for cluster_idx in clusters:
+            with open(os.path.join(theme_dir, f"{cluster_idx}.json"), "w", encoding="utf-8") as f:
+                json.dump(export_cluster(context, cluster_idx, template), f, ensure_ascii=False)
+
+    with open(os.path.join(site_dir, "profiles.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            "columns": COLUMNS,
+            "options": {col: MULTI_OPTIONS.get(col, OPTIONS[col]) for col in COLUMNS},
+            "multi": {col: {"no_choice": NO_CHOICE[col]} for col in MULTI_OPTIONS},
+            "labels": LABELS,
+            "clusters": {idx: context.descriptions[context.labels[idx]]["name"] for idx in clusters},
+            "profiles": profiles,
+        }, f, ensure_ascii=False)
+
+    shutil.copy(
+        os.path.join(os.path.dirname(plotly.__file__), "package_data", "plotly.min.js"),
+        os.path.join(site_dir, "plotly.min.js"),
+    )
+    with open(os.path.join(site_dir, "index.html"), "w", encoding="utf-8") as f:
+        f.write(INDEX_HTML)
+
+    return len(profiles) * len(THEMES)
+
+
+INDEX_HTML = """<!DOCTYPE html>
+<html lang="pl">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>Wyszukaj znajomych</title>
+<script src="plotly.min.js"></script>
+<style>
+body { margin: 0; display: flex; font-family: "Segoe UI", sans-serif; }
+body.dark { background: #1E1E2F; color: #E5E5E5; }
+body.dark aside { background: #2C2C3E; }
+body.light { background: #FFFFFF; color: #111111; }
+body.light aside { background: #F0F0F0; }
+aside { width: 280px; min-height: 100vh; padding: 16px; box-sizing: border-box; }
+aside label { display: block; margin-top: 12px; font-size: 14px; }
+aside select { width: 100%; margin-top: 4px; }
+aside fieldset { margin-top: 12px; border: none; padding: 0; font-size: 14px; }
+aside fieldset label { margin-top: 4px; }
+main { flex: 1; padding: 16px 32px; }
+.metrics { display: flex; gap: 48px; }
+.metric span { display: block; font-size: 14px; opacity: 0.8; }
+.metric strong { font-size: 32px; }
+.row { display: flex; gap: 16px; }
+.row > * { flex: 1; }
+table { border-collapse: collapse; }
+td, th { padding: 4px 12px; border-bottom: 1px solid rgba(128,128,128,0.3); text-align: left; }
+</style>
+</head>
+<body class="dark">
+<aside>
+  <h3>Ustawienie trybu wyświetlania</h3>
+  <label><input type="checkbox" id="dark" checked> Dark Mode</label>
+  <h3>Powiedz nam coś o sobie</h3>
+  <div id="form"></div>
+</aside>
+<main>
+  <h1>🤝 Wyszukaj znajomych – analiza danych</h1>
+  <h2 id="name"></h2>
+  <p id="description"></p>
+  <div class="metrics">
+    <div class="metric"><span>Liczba twoich znajomych</span><strong id="group_size"></strong></div>
+    <div class="metric"><span>Siła przynależności</span><strong id="strength"></strong></div>
+    <div class="metric"><span>Druga najbliższa grupa</span><strong id="second"></strong></div>
+  </div>
+  <h2>Osoby z grupy</h2>
+  <div id="hist_age"></div><div id="hist_edu_level"></div><div id="hist_fav_animals"></div>
+  <div id="hist_fav_place"></div><div id="hist_gender"></div>
+  <h2>👤 Ty na tle swojej grupy</h2>
+  <table id="comparison"></table>
+  <h2>📊 Struktura grupy (udziały %)</h2>
+  <div class="row"><div id="pie_gender"></div><div id="pie_edu_level"></div></div>
+  <h2>🔥 Heatmapa zależności (wybierz osie)</h2>
+  <div class="row"><select id="heat_x"></select><select id="heat_y"></select></div>
+  <div id="heatmap"></div>
+  <h2>🧭 Profil typowej osoby z grupy</h2>
+  <div id="radar"></div>
+  <h2>🏆 TOP cechy w Twojej grupie</h2>
+  <div id="top_places"></div>
+</main>
+<script>
+const clusterCache = {};
+let site = null;
+
+function el(id) { return document.getElementById(id); }
+
+function option(select, value, text) {
+  const o = document.createElement("option");
+  o.value = value;
+  o.textContent = text;
+  select.appendChild(o);
+}
+
+async function loadCluster(theme, idx) {
+  const url = `clusters/${theme}/${idx}.json`;
+  if (!clusterCache[url]) {
+    clusterCache[url] = fetch(url).then(r => r.json());
+  }
+  return clusterCache[url];
+}
+
+function plot(id, fig) {
+  Plotly.react(el(id), fig.data, fig.layout, {responsive: true});
+}
+
+// pytania wielokrotnego wyboru: zaznaczone opcje w kolejności z formularza,
+// "Psy|Inne" jak w profiles.json; bez zaznaczeń – site.multi[col].no_choice
+function checkedOptions(col) {
+  return site.options[col].filter((value, i) => el(`answer_${col}_${i}`).checked);
+}
+
+function answer(col) {
+  if (!site.multi[col]) return el(`answer_${col}`).value;
+  return checkedOptions(col).join("|") || site.multi[col].no_choice;
+}
+
+function answerLabel(col, value) {
+  return site.multi[col] ? value.split("|").join(", ") : value;
+}
+
+async function render() {
+  const theme = el("dark").checked ? "dark" : "light";
+  document.body.className = theme;
+
+  const answers = site.columns.map(answer);
+  const profile = site.profiles[answers.join("|")];
+  const cluster = await loadCluster(theme, profile.cluster);
+
+  el("name").textContent = `Najbliżej Ci do grupy: ${cluster.name}`;
+  el("description").textContent = cluster.description;
+  el("group_size").textContent = cluster.group_size;
+  el("strength").textContent = `${Math.round(profile.membership.strength * 100)}%`;
+  el("second").textContent = site.clusters[profile.membership.second_idx] || "–";
+
+  const rows = site.columns.map((col, i) =>
+    `<tr><th>${site.labels[col]}</th><td>${answerLabel(col, answers[i])}</td><td>${cluster.summary[col] ?? ""}</td></tr>`);
+  el("comparison").innerHTML = "<tr><th></th><th>Ty</th><th>Najczęściej w grupie</th></tr>" + rows.join("");
+
+  for (const [name, fig] of Object.entries(cluster.figures)) {
+    plot(name, fig);
+  }
+  const x = el("heat_x").value, y = el("heat_y").value;
+  if (x === y) {
+    Plotly.purge(el("heatmap"));
+    el("heatmap").textContent = "⚠️ Wybierz różne zmienne na osie X i Y";
+  } else {
+    el("heatmap").textContent = "";
+    plot("heatmap", cluster.heatmaps[`${x}|${y}`]);
+  }
+}
+
+fetch("profiles.json").then(r => r.json()).then(data => {
+  site = data;
+  for (const col of site.columns) {
+    if (site.multi[col]) {
+      const fieldset = document.createElement("fieldset");
+      fieldset.textContent = site.labels[col];
+      site.options[col].forEach((value, i) => {
+        const label = document.createElement("label");
+        const box = document.createElement("input");
+        box.type = "checkbox";
+        box.id = `answer_${col}_${i}`;
+        box.addEventListener("change", render);
+        label.append(box, ` ${value}`);
+        fieldset.appendChild(label);
+      });
+      el("form").appendChild(fieldset);
+      continue;
+    }
+    const label = document.createElement("label");
+    label.textContent = site.labels[col];
+    const select = document.createElement("select");
+    select.id = `answer_${col}`;
+    for (const value of site.options[col]) option(select, value, value);
+    select.addEventListener("change", render);
+    label.appendChild(select);
+    el("form").appendChild(label);
+  }
+  for (const col of ["fav_animals", "fav_place", "edu_level", "gender", "age"]) {
+    option(el("heat_x"), col, site.labels[col]);
+    option(el("heat_y"), col, site.labels[col]);
+  }
+  el("heat_y").selectedIndex = 1;
+  for (const id of ["dark", "heat_x", "heat_y"]) el(id).addEventListener("change", render);
+  render();
+});
+</script>
+</body>
+</html>
+"""
+
+
+if __name__ == "__main__":
+    site_dir = sys.argv[1] if len(sys.argv) > 1 else SITE_DIR
+    version = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_VERSION
+    pages = export_site(site_dir, version)
+    print(f"Wyeksportowano {pages} stron do {site_dir}/")
@@ -0,0 +1,304 @@
+# Źródła statystyk grupy dla compute_profile_result. Każde ma group_result(label)
+# zwracające to samo co results.group_result – wykresy nie wiedzą, skąd są liczby –
+# i strength(label, odległość) jak distances.share_farther:
+#   PandasGroupStats  – value_counts/groupby na członkach grupy w pamięci
+#   SQLiteGroupStats  – agregacje SQL na ocenionym zbiorze w pliku SQLite
+#                       (ModelVersion.database), zbiór nie musi
+#                       mieścić się w pamięci workera
+#   sketches.ClusterSketches – przybliżone, ze szkiców
+#
+# Indeksy (klaster, odpowiedź) dla każdej kolumny i (klaster, wszystkie
+# kolumny) są pokrywające: zapytania o jedną grupę czytają tylko jej zakres
+# indeksu, bez odwołań do tabeli i bez sortowania (GROUP BY w kolejności indeksu).
+# Każdy wiersz ma też odległość osoby od środka jej grupy (distance), a indeks
+# (klaster, distance) daje siłę przynależności jednym zakresem indeksu.
+#
+# Kilka workerów może jednocześnie zauważyć nieaktualną bazę: każdy pisze do
+# własnego pliku tymczasowego (<baza>.<pid>.tmp), a ensure_database pod blokadą
+# pliku <baza>.lock buduje bazę raz – pozostałe czekają i otwierają gotową.
+#
+# Budowanie:  python group_stats.py build [wersja]
+#             python group_stats.py build-csv odpowiedzi.csv plik.sqlite [wersja]
+# Kontrola:   python group_stats.py check [wersja]   (SQL vs pandas, wszystkie grupy)
+
+import os
+import sqlite3
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: bez blokady każdy worker buduje bazę sam, pliki tymczasowe się nie mieszają
+    fcntl = None
+
+import numpy as np
+import pandas as pd  # type: ignore
+
+from distances import own_distances, share_farther
+from multiselect import multi_counts_from_answers
+from results import group_result
+from survey import COLUMNS
+
+CHUNK_ROWS = 50_000
+
+# wersja układu tabeli members – baza w starszym układzie jest budowana od nowa
+SCHEMA = 2
+
+
+def _quoted(col):
+    return f'"{col}"'
+
+
+def _rows(df, cluster_labels, distances):
+    frame = df[COLUMNS].astype(object).assign(Cluster=list(cluster_labels))
+    frame = frame.where(frame.notna(), None).assign(distance=[float(d) for d in distances])
+    return frame[["Cluster"] + COLUMNS + ["distance"]].itertuples(index=False, name=None)
+
+
+def _create(connection, model_version):
+    columns = ", ".join(f"{_quoted(col)} TEXT" for col in COLUMNS)
+    connection.execute(f"CREATE TABLE members (cluster TEXT NOT NULL, {columns}, distance REAL NOT NULL)")
+    connection.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+    connection.execute("INSERT INTO meta VALUES ('model_version', ?)", (str(model_version),))
+    connection.execute("INSERT INTO meta VALUES ('schema', ?)", (str(SCHEMA),))
+
+
+def _insert(connection, rows):
+    placeholders = ", ".join("?" * (len(COLUMNS) + 2))
+    connection.executemany(f"INSERT INTO members VALUES ({placeholders})", rows)
+
+
+def _finish(connection, tmp_path, path):
+    # indeksy po wstawieniu wszystkich wierszy – szybciej niż aktualizacja przy każdym
+    for col in COLUMNS:
+        connection.execute(f"CREATE INDEX members_cluster_{col} ON members (cluster, {_quoted(col)})")
+    connection.execute(
+        f"CREATE INDEX members_cluster_all ON members (cluster, {', '.join(map(_quoted, COLUMNS))})"
+    )
+    connection.execute("CREATE INDEX members_cluster_distance ON members (cluster, distance)")
+    connection.execute("ANALYZE")
+    connection.commit()
+    connection.close()
+    os.replace(tmp_path, path)
+
+
+def _open_for_writing(path, model_version):
+    # plik tymczasowy tego procesu – pozostałość po nim samym można usunąć,
+    # cudzego (inny worker właśnie buduje bazę) nie
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    connection = sqlite3.connect(tmp_path)
+    connection.execute("PRAGMA journal_mode = OFF")
+    connection.execute("PRAGMA synchronous = OFF")
+    _create(connection, model_version)
+    return connection, tmp_path
+
+
+def write_database(path, all_df, cluster_labels, distances, model_version=0, chunk_rows=CHUNK_ROWS):
+    # distances: odległość każdej osoby od środka jej grupy (distances.own_distances)
+    connection, tmp_path = _open_for_writing(path, model_version)
+    cluster_labels = list(cluster_labels)
+    for start in range(0, len(all_df), chunk_rows):
+        end = start + chunk_rows
+        _insert(connection, _rows(all_df.iloc[start:end], cluster_labels[start:end], distances[start:end]))
+    _finish(connection, tmp_path, path)
+
+
+def write_database_from_context(path, context, chunk_rows=CHUNK_ROWS):
+    write_database(
+        path,
+        context.all_df,
+        context.all_df["Cluster"].astype(str),
+        own_distances(context.all_distances, context.participant_clusters),
+        context.model_version,
+        chunk_rows,
+    )
+
+
+def write_database_from_csv(path, csv_path, context, chunk_rows=CHUNK_ROWS):
+    # zbiór większy niż pamięć: CSV czytany i oceniany porcjami
+    connection, tmp_path = _open_for_writing(path, context.model_version)
+    for chunk in pd.read_csv(csv_path, sep=';', chunksize=chunk_rows):
+        predicted_labels, distances = context.predict(chunk[COLUMNS])
+        cluster_idx = [context.labels.index(label) for label in predicted_labels]
+        _insert(connection, _rows(chunk, predicted_labels, own_distances(distances, cluster_idx)))
+    _finish(connection, tmp_path, path)
+
+
+class PandasGroupStats:
+
+    def __init__(self, context):
+        self.context = context
+
+    def group_result(self, label):
+        return group_result(self.context.group_members(label)[0])
+
+    def strength(self, label, own_distance):
+        return share_farther(self.context.group_members(label)[1], own_distance)
+
+
+class SQLiteGroupStats:
+
+    def __init__(self, path):
+        self.path = path
+        # osobne połączenie dla każdego wątku (sesje Streamlit), tylko do odczytu
+        self._local = threading.local()
+        meta = dict(self._query("SELECT key, value FROM meta"))
+        self.model_version = meta["model_version"]
+        self.schema = int(meta.get("schema", 1))
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            self._local.connection = connection
+        return connection
+
+    def _query(self, sql, params=()):
+        return self._connection().execute(sql, params).fetchall()
+
+    @property
+    def sizes(self):
+        return dict(self._query("SELECT cluster, COUNT(*) FROM members GROUP BY cluster ORDER BY cluster"))
+
+    def size(self, label):
+        return self._query("SELECT COUNT(*) FROM members WHERE cluster = ?", (label,))[0][0]
+
+    def strength(self, label, own_distance):
+        # jak distances.share_farther, z indeksu (klaster, distance)
+        farther, size = self._query(
+            "SELECT SUM(distance >= ?), COUNT(*) FROM members WHERE cluster = ?",
+            (float(own_distance), label),
+        )[0]
+        return farther / size if size else 1.0
+
+    def value_counts(self, label, col):
+        # bez braków odpowiedzi, w kolejności odpowiedzi (jak Categorical w pandas)
+        return dict(self._query(
+            f"SELECT {_quoted(col)}, COUNT(*) FROM members "
+            f"WHERE cluster = ? AND {_quoted(col)} IS NOT NULL "
+            f"GROUP BY {_quoted(col)} ORDER BY {_quoted(col)}",
+            (label,),
+        ))
+
+    def pair_counts(self, label, x_col, y_col):
+        rows = self._query(
+            f"SELECT {_quoted(x_col)}, {_quoted(y_col)}, COUNT(*) FROM members "
+            f"WHERE cluster = ? AND {_quoted(x_col)} IS NOT NULL AND {_quoted(y_col)} IS NOT NULL "
+            f"GROUP BY {_quoted(x_col)}, {_quoted(y_col)} ORDER BY {_quoted(x_col)}, {_quoted(y_col)}",
+            (label,),
+        )
+        return pd.DataFrame(rows, columns=[x_col, y_col, "count"]).astype({"count": "int64"})
+
+    def group_result(self, label):
+        size = self.size(label)
+        n = max(size, 1)
+        counts = {col: self.value_counts(label, col) for col in COLUMNS}
+        places = counts["fav_place"]
+        multi_counts = multi_counts_from_answers(counts)
+        animals = multi_counts["fav_animals"]
+        return {
+            "group_size": size,
+            # dominanta jak DataFrame.mode: przy remisie najmniejsza odpowiedź
+            "summary": {
+                col: min(values, key=lambda value: (-values[value], value)) if values else None
+                for col, values in counts.items()
+            },
+            "counts": counts,
+            "multi_counts": multi_counts,
+            "pair_counts": {
+                (x_col, y_col): self.pair_counts(label, x_col, y_col)
+                for x_col in COLUMNS for y_col in COLUMNS if x_col != y_col
+            },
+            "radar": {
+                "Nad wodą": places.get("Nad wodą", 0) / n,
+                "Las": places.get("W lesie", 0) / n,
+                "Góry": places.get("W górach", 0) / n,
+                "Psy": animals.get("Psy", 0) / n,
+                "Koty": animals.get("Koty", 0) / n,
+            },
+            "top_places": dict(sorted(places.items(), key=lambda item: (-item[1], item[0]))[:5]),
+        }
+
+    def query_plan(self, label, col):
+        # do sprawdzenia, że zapytanie idzie po indeksie pokrywającym
+        return [row[-1] for row in self._query(
+            f"EXPLAIN QUERY PLAN SELECT {_quoted(col)}, COUNT(*) FROM members "
+            f"WHERE cluster = ? AND {_quoted(col)} IS NOT NULL GROUP BY {_quoted(col)}",
+            (label,),
+        )]
+
+
+def open_database(path):
+    return SQLiteGroupStats(path)
+
+
+def _is_current(path, model_version):
+    if not os.path.exists(path):
+        return False
+    database = open_database(path)
+    return database.model_version == str(model_version) and database.schema == SCHEMA
+
+
+def ensure_database(path, context):
+    # baza z wersji modelu kontekstu; brak bazy, baza z innej wersji modelu albo
+    # w starym układzie – budowana z ocenionego zbioru, raz na wszystkie workery
+    if not _is_current(path, context.model_version):
+        with open(f"{path}.lock", "w") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            # inny worker mógł ją zbudować, gdy czekaliśmy na blokadę
+            if not _is_current(path, context.model_version):
+                write_database_from_context(path, context)
+    return open_database(path)
+
+
+def differences(expected, actual):
+    # lista rozbieżności między wynikami dwóch źródeł (pusta, gdy są identyczne)
+    problems = []
+    for key in ("group_size", "summary", "counts", "multi_counts", "radar", "top_places"):
+        if expected[key] != actual[key]:
+            problems.append(key)
+    for pair, frame in expected["pair_counts"].items():
+        other = actual["pair_counts"][pair]
+        if not frame.astype(object).reset_index(drop=True).equals(other.astype(object).reset_index(drop=True)):
+            problems.append(f"pair_counts{pair}")
+    return problems
+
+
+if __name__ == "__main__":
+    import sys
+
+    from model_registry import DEFAULT_VERSION, discover, load_context
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "build"
+    if command == "build":
+        entry = discover()[sys.argv[2] if len(sys.argv) > 2 else DEFAULT_VERSION]
+        path = entry.database
+        context = load_context(entry)
+        write_database_from_context(path, context)
+    elif command == "build-csv":
+        path = sys.argv[3]
+        context = load_context(discover()[sys.argv[4] if len(sys.argv) > 4 else DEFAULT_VERSION])
+        write_database_from_csv(path, sys.argv[2], context)
+    elif command == "check":
+        entry = discover()[sys.argv[2] if len(sys.argv) > 2 else DEFAULT_VERSION]
+        context = load_context(entry)
+        pandas_stats, sql_stats = PandasGroupStats(context), open_database(entry.database)
+        failed = False
+        for label in context.labels:
+            problems = differences(pandas_stats.group_result(label), sql_stats.group_result(label))
+            group_distances = context.group_members(label)[1]
+            for own_distance in np.quantile(group_distances, [0.1, 0.5, 0.9]).astype(group_distances.dtype):
+                if pandas_stats.strength(label, own_distance) != sql_stats.strength(label, own_distance):
+                    problems.append(f"strength({own_distance:.3f})")
+            failed |= bool(problems)
+            print(f"{label}: {'OK' if not problems else ', '.join(problems)}")
+        print("\n".join(sql_stats.query_plan(context.labels[0], COLUMNS[0])))
+        raise SystemExit(1 if failed else 0)
+    else:
+        raise SystemExit(f"Nieznane polecenie: {command}")
+    print(f"Zapisano {path}: " + ", ".join(
+        f"{label} -> {size}" for label, size in open_database(path).sizes.items()
+    ))
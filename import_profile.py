@@ -0,0 +1,79 @@
+# Raport czasu importu modułów ładowanych przy starcie aplikacji
+# (python -X importtime w czystym procesie) oraz kontrola budżetu.
+#
+# Użycie:
+#   python import_profile.py                 – raport dla app.py
+#   python import_profile.py --check         – kod wyjścia 1 po przekroczeniu budżetu
+#   python import_profile.py app2.py --top 30
+#
+# Budżet (sekundy) można nadpisać zmienną FIND_FRIENDS_IMPORT_BUDGET.
+
+import argparse
+import ast
+import os
+import subprocess
+import sys
+
+IMPORT_BUDGET = float(os.environ.get('FIND_FRIENDS_IMPORT_BUDGET', '1.0'))
+
+
+def startup_imports(script):
+    # tylko importy z najwyższego poziomu skryptu – te wewnątrz funkcji
+    # wykonują się dopiero przy pierwszym użyciu i nie liczą się do startu
+    with open(script, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    statements = []
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            statements.append(ast.unparse(node))
+    return statements
+
+
+def measure(statements):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "\n".join(statements)],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr)
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def total_seconds(rows):
+    # czas modułów z najwyższego poziomu (pozostałe są w nich wliczone)
+    return sum(cumulative for _, _, cumulative, depth in rows if depth == 0) / 1e6
+
+
+def report(rows, top):
+    total = total_seconds(rows)
+    print(f"Łączny czas importu: {total:.3f} s (budżet {IMPORT_BUDGET:.3f} s)")
+    print(f"\nTOP {top} modułów (czas skumulowany):")
+    for name, self_us, cumulative_us, depth in sorted(rows, key=lambda row: -row[2])[:top]:
+        print(f"  {cumulative_us / 1e3:9.1f} ms  (własny {self_us / 1e3:7.1f} ms)  {name}")
+    return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("script", nargs="?", default="app.py")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--check", action="store_true")
+    args = parser.parse_args()
+
+    statements = startup_imports(args.script)
+    print("Importy przy starcie:", "; ".join(statements))
+    total = report(measure(statements), args.top)
+
+    if args.check and total > IMPORT_BUDGET:
+        print(f"\nPrzekroczony budżet importu: {total:.3f} s > {IMPORT_BUDGET:.3f} s")
+        sys.exit(1)
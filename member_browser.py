@@ -0,0 +1,94 @@
+# Przeglądarka osób z grupy strona po stronie. Filtry i sortowanie działają
+# na kodach kategorii (Categorical.codes) całej grupy, a w tekst zamieniana
+# jest tylko widoczna strona – do przeglądarki trafia PAGE_SIZE wierszy, nie
+# cała grupa.
+#
+# Kursor jest stabilny (keyset): "klucz sortowania.numer wiersza" ostatniej
+# osoby na stronie. Następna strona to PAGE_SIZE najmniejszych par (klucz,
+# wiersz) większych od kursora – bez sortowania całej grupy i bez OFFSET,
+# więc strona nie "przeskakuje", gdy zmienia się liczba stron przed nią.
+
+import numpy as np
+import pandas as pd  # type: ignore
+
+from multiselect import pack, selected_any
+from survey import COLUMNS, MISSING, MULTI_OPTIONS, choice_mask, parse_choices
+
+PAGE_SIZE = 25
+
+
+def _codes(series):
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype(object).astype("category")
+    return series.cat.codes.to_numpy(np.int64), list(series.cat.categories)
+
+
+def encode_cursor(key, row):
+    return f"{key}.{row}"
+
+
+def decode_cursor(cursor):
+    key, row = cursor.split(".")
+    return int(key), int(row)
+
+
+def page_members(members_df, sort_by=None, descending=False, filters=None, cursor=None, page_size=PAGE_SIZE):
+    # filters: {kolumna: lista dopuszczalnych odpowiedzi, a dla pytań wielokrotnego
+    # wyboru – opcji z MULTI_OPTIONS albo NO_CHOICE}; sort_by: kolumna albo
+    # None (kolejność zapisu); zwraca stronę, kursor następnej strony i liczbę
+    # pasujących osób
+    n = len(members_df)
+    rows = np.arange(n, dtype=np.int64)
+    mask = np.ones(n, dtype=bool)
+    for col, allowed in (filters or {}).items():
+        if allowed and col in MULTI_OPTIONS:
+            # "wybrał którąkolwiek z opcji" – maski bitowe zamiast listy odpowiedzi łączonych
+            masks, present = pack(col, members_df[col])
+            mask &= present & selected_any(col, masks, allowed)
+        elif allowed:
+            codes, categories = _codes(members_df[col])
+            allowed_codes = [i for i, value in enumerate(categories) if value in set(allowed)]
+            mask &= np.isin(codes, allowed_codes)
+
+    if sort_by is None:
+        key = np.zeros(n, dtype=np.int64)
+    else:
+        key, categories = _codes(members_df[sort_by])
+        # braki (-1) na końcu, także przy sortowaniu malejącym
+        key = np.where(key < 0, len(categories), (len(categories) - 1 - key) if descending else key)
+
+    count = int(mask.sum())
+    if cursor is not None:
+        cursor_key, cursor_row = decode_cursor(cursor)
+        mask &= (key > cursor_key) | ((key == cursor_key) & (rows > cursor_row))
+
+    candidates = np.flatnonzero(mask)
+    composite = key[candidates] * n + rows[candidates]
+    if len(candidates) > page_size:
+        # tylko page_size najmniejszych kluczy – O(n), bez pełnego sortowania
+        keep = np.argpartition(composite, page_size - 1)[:page_size]
+        candidates, composite = candidates[keep], composite[keep]
+    page = candidates[np.argsort(composite, kind="stable")]
+
+    next_cursor = None
+    if len(page) == page_size and int(mask.sum()) > page_size:
+        last = page[-1]
+        next_cursor = encode_cursor(int(key[last]), int(last))
+
+    page_df = members_df.iloc[page][COLUMNS].astype(object).reset_index(drop=True)
+    return page_df, next_cursor, count
+
+
+def estimate_rows(size, counts, filters=None):
+    # szacunek z liczności odpowiedzi (np. z manifestu partitions.py) przy
+    # założeniu niezależności kolumn – bez czytania samych osób
+    estimate = float(size)
+    for col, allowed in (filters or {}).items():
+        if allowed and size and col in MULTI_OPTIONS:
+            answers = [answer for answer in counts[col] if answer != MISSING]
+            masks = np.array([choice_mask(col, parse_choices(col, answer)) for answer in answers], dtype=np.uint64)
+            selected = selected_any(col, masks, allowed)
+            estimate *= sum(counts[col][answer] for answer, hit in zip(answers, selected) if hit) / size
+        elif allowed and size:
+            estimate *= sum(counts[col].get(value, 0) for value in allowed) / size
+    return round(estimate)
@@ -0,0 +1,371 @@
+# Metryki w formacie tekstowym Prometheusa, bez zewnętrznych zależności.
+#
+# Aktualizacja metryki nie bierze blokady: każdy wątek dopisuje do własnej
+# tablicy wartości (shard), a sumowanie shardów odbywa się dopiero przy
+# odczycie (scrape). Blokada jest potrzebna tylko przy pierwszym użyciu
+# metryki w danym wątku, przy pierwszym użyciu nowej kombinacji etykiet
+# i przy zakończeniu wątku (jego shard jest wtedy doliczany do sumy bazowej).
+# Metryki "gauge" z funkcją (pamięć procesu, trafienia cache) liczą się
+# wyłącznie przy odczycie.
+#
+# Endpoint: FIND_FRIENDS_METRICS_PORT=9464 streamlit run app.py
+#   curl localhost:9464/metrics
+# Kilka workerów na jednym hoście potrzebuje osobnych portów – worker, który
+# nie zajmie portu, działa dalej bez endpointu (ostrzeżenie w logu).
+
+import bisect
+import functools
+import logging
+import os
+import threading
+import time
+import weakref
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, v in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Shard:
+    # wartości jednego wątku; po zakończeniu wątku threading.local zwalnia
+    # ten obiekt, a weakref.finalize dolicza wartości do sumy bazowej
+    __slots__ = ("values", "__weakref__")
+
+    def __init__(self, size):
+        self.values = [0.0] * size
+
+
+class _Child:
+    # wartości jednej kombinacji etykiet; shard na żywy wątek, wartości
+    # zakończonych wątków (Streamlit startuje nowy wątek na przebieg skryptu)
+    # trafiają do _base, więc liczba shardów nie rośnie z liczbą przebiegów
+
+    def __init__(self, size):
+        self._size = size
+        self._local = threading.local()
+        self._shards = {}
+        self._base = [0.0] * size
+        self._lock = threading.Lock()
+        self._next_key = 0
+
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = _Shard(self._size)
+            with self._lock:
+                key = self._next_key
+                self._next_key += 1
+                self._shards[key] = shard.values
+            weakref.finalize(shard, self._fold, key)
+            self._local.shard = shard
+        return shard.values
+
+    def _fold(self, key):
+        with self._lock:
+            values = self._shards.pop(key)
+            for i, value in enumerate(values):
+                self._base[i] += value
+
+    def totals(self):
+        with self._lock:
+            shards = [self._base] + list(self._shards.values())
+        return [sum(shard[i] for shard in shards) for i in range(self._size)]
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def _size(self):
+        return 1
+
+    def labels(self, *values):
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._make_child())
+        return child
+
+    def _make_child(self):
+        return _Child(self._size())
+
+    def _default(self):
+        return self.labels()
+
+    def collect(self):
+        with self._lock:
+            children = list(self._children.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in children:
+            lines.extend(self._samples(values, child))
+        return lines
+
+    def _samples(self, values, child):
+        return [f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.totals()[0])}"]
+
+
+class _CounterChild(_Child):
+
+    def inc(self, amount=1.0):
+        self._shard()[0] += amount
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _make_child(self):
+        return _CounterChild(1)
+
+    def inc(self, amount=1.0):
+        self._default().inc(amount)
+
+
+class _GaugeChild:
+
+    def __init__(self):
+        self.value = 0.0
+        self.function = None
+
+    def set(self, value):
+        self.value = value
+
+    def set_function(self, function):
+        self.function = function
+
+    def totals(self):
+        return [self.function() if self.function is not None else self.value]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _make_child(self):
+        return _GaugeChild()
+
+    def set(self, value):
+        self._default().set(value)
+
+    def set_function(self, function):
+        self._default().set_function(function)
+
+
+class _HistogramChild(_Child):
+
+    def __init__(self, buckets):
+        # kolejno: liczniki kubełków (bez skumulowania), +Inf, suma
+        super().__init__(len(buckets) + 2)
+        self._buckets = buckets
+
+    def observe(self, value):
+        values = self._shard()
+        values[bisect.bisect_left(self._buckets, value)] += 1
+        values[-1] += value
+
+    def time(self):
+        return _Timer(self)
+
+
+class _Timer:
+
+    def __init__(self, child):
+        self._child = child
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._child.observe(time.perf_counter() - self._start)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _size(self):
+        return len(self.buckets) + 2
+
+    def _make_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self._default().observe(value)
+
+    def time(self):
+        return self._default().time()
+
+    def _samples(self, values, child):
+        totals = child.totals()
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), totals[:-1]):
+            cumulative += count
+            labels = _format_labels(self.labelnames, values, [("le", _format_value(bound))])
+            lines.append(f"{self.name}_bucket{labels} {int(cumulative)}")
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(totals[-1])}")
+        lines.append(f"{self.name}_count{labels} {int(cumulative)}")
+        return lines
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            # ponowne wykonanie skryptu Streamlit nie tworzy duplikatów
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help, labelnames=()):
+        return self._register(Counter(name, help, labelnames))
+
+    def gauge(self, name, help, labelnames=()):
+        return self._register(Gauge(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def exposition(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def process_memory_bytes():
+    # RSS z /proc (Linux); gdzie indziej szczytowe zużycie z getrusage
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+# metryki wspólne dla ścieżek predykcji, ładowania danych i renderowania
+PREDICTIONS = REGISTRY.counter(
+    "find_friends_predictions_total", "Profile ocenione modelem, według przewidzianej grupy", ["cluster"])
+PREDICT_SECONDS = REGISTRY.histogram(
+    "find_friends_predict_seconds", "Czas predykcji profilu wraz z jego sąsiadami")
+LOAD_SECONDS = REGISTRY.histogram(
+    "find_friends_load_seconds", "Czas ładowania danych i modeli", ["what"])
+RERUN_SECONDS = REGISTRY.histogram(
+    "find_friends_rerun_seconds", "Czas jednego przebiegu skryptu strony", ["view"])
+FIGURE_SECONDS = REGISTRY.histogram(
+    "find_friends_figure_seconds", "Czas budowania jednego wykresu", ["figure"])
+CACHE_REQUESTS = REGISTRY.counter(
+    "find_friends_cache_requests_total", "Wywołania funkcji z cache Streamlit", ["function"])
+CACHE_MISSES = REGISTRY.counter(
+    "find_friends_cache_misses_total", "Wywołania funkcji z cache Streamlit, które liczyły wynik", ["function"])
+MEMORY = REGISTRY.gauge(
+    "find_friends_process_resident_memory_bytes", "Pamięć rezydentna procesu")
+MEMORY.set_function(process_memory_bytes)
+PROFILE_CACHE = REGISTRY.gauge(
+    "find_friends_profile_cache", "Stan cache wyników profili (ProfileCache.stats)", ["stat"])
+
+
+def watch_profile_cache(cache):
+    # wartości liczone przy odczycie, bez dodatkowej pracy przy trafieniu
+    for stat in ("size", "hits", "misses", "evictions", "hit_rate"):
+        PROFILE_CACHE.labels(stat).set_function(lambda stat=stat: cache.stats()[stat])
+
+
+def cached(cache_decorator, name=None):
+    # st.cache_data / st.cache_resource z licznikami wywołań i chybień;
+    # ciało funkcji wykonuje się tylko przy chybieniu
+    def decorate(fn):
+        label = name or fn.__name__
+        requests = CACHE_REQUESTS.labels(label)
+        misses = CACHE_MISSES.labels(label)
+
+        @functools.wraps(fn)
+        def compute(*args, **kwargs):
+            misses.inc()
+            return fn(*args, **kwargs)
+
+        cached_fn = cache_decorator(compute)
+
+        @functools.wraps(fn)
+        def call(*args, **kwargs):
+            requests.inc()
+            return cached_fn(*args, **kwargs)
+
+        call.clear = cached_fn.clear
+        return call
+    return decorate
+
+
+def start_http_server(port, host="127.0.0.1", registry=REGISTRY):
+    # http.server dopiero tutaj – sam moduł jest importowany przy starcie strony
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.exposition().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+def serve_metrics(port, host="127.0.0.1", registry=REGISTRY):
+    # jak start_http_server, ale zajęty port (np. inny worker na tym samym
+    # hoście) nie przerywa strony – None i ostrzeżenie w logu
+    try:
+        return start_http_server(port, host, registry)
+    except OSError as e:
+        logging.getLogger(__name__).warning(
+            "Endpoint metryk %s:%s niedostępny w procesie %s: %s", host, port, os.getpid(), e
+        )
+        return None
+
+
+if __name__ == "__main__":
+    import sys
+
+    # samodzielny listener, np. do sprawdzenia formatu: python metrics.py [port]
+    server = start_http_server(int(sys.argv[1]) if len(sys.argv) > 1 else 9464)
+    print(f"http://{server.server_address[0]}:{server.server_address[1]}/metrics")
+    threading.Event().wait()
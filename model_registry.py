@@ -0,0 +1,212 @@
+# Rejestr wersji ankiety/modelu. Wersja to trójka plików o wspólnym sufiksie:
+#   welcome_survey_clustering_pipeline_<wersja>.pkl
+#   welcome_survey_simple_<wersja>.csv
+#   welcome_survey_cluster_names_and_descriptions_<wersja>.json
+# (opcjonalnie paczka welcome_survey_<wersja>.bundle, zob. bundle.py,
+# podgrupy welcome_survey_subclusters_<wersja>.json, zob. subclusters.py,
+# zbiór podzielony na klastry welcome_survey_<wersja>.partitions, zob. partitions.py,
+# baza do statystyk grup welcome_survey_<wersja>.sqlite, zob. group_stats.py,
+# i macierz odległości welcome_survey_<wersja>_distances.npy dla dużych zbiorów).
+# Wersje są ładowane leniwie przy pierwszym żądaniu; w pamięci trzymamy
+# najwyżej MAX_RESIDENT z nich (LRU) i nie więcej niż MAX_BYTES danych.
+#
+# Artefakty (paczka, segmenty, baza SQLite, szkice) są znaczone skrótem
+# zawartości pliku modelu (model_hash). Po ponownym treningu skrót się zmienia
+# i artefakty ze starym skrótem są pomijane (paczka, segmenty) albo budowane
+# od nowa (baza SQLite, szkice w app.py).
+
+import hashlib
+import json
+import mmap
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd  # type: ignore
+
+from metrics import LOAD_SECONDS
+
+MODEL_PATTERN = re.compile(r'^welcome_survey_clustering_pipeline_(v\d+)\.pkl$')
+
+DEFAULT_VERSION = 'v2'
+
+MAX_RESIDENT = 3
+
+MAX_BYTES = 512 * 1024 * 1024
+
+
+class ModelVersion:
+
+    def __init__(self, version, directory='.'):
+        self.version = version
+        self.model_name = os.path.join(directory, f'welcome_survey_clustering_pipeline_{version}')
+        self.model_file = f'{self.model_name}.pkl'
+        self.data = os.path.join(directory, f'welcome_survey_simple_{version}.csv')
+        self.descriptions = os.path.join(directory, f'welcome_survey_cluster_names_and_descriptions_{version}.json')
+        self.bundle = os.path.join(directory, f'welcome_survey_{version}.bundle')
+        self.subclusters = os.path.join(directory, f'welcome_survey_subclusters_{version}.json')
+        self.partitions = os.path.join(directory, f'welcome_survey_{version}.partitions')
+        self.database = os.path.join(directory, f'welcome_survey_{version}.sqlite')
+        self.distances = os.path.join(directory, f'welcome_survey_{version}_distances.npy')
+
+
+def discover(directory='.'):
+    versions = {}
+    for name in sorted(os.listdir(directory)):
+        match = MODEL_PATTERN.match(name)
+        if match is None:
+            continue
+        entry = ModelVersion(match.group(1), directory)
+        if os.path.exists(entry.data) and os.path.exists(entry.descriptions):
+            versions[entry.version] = entry
+    return versions
+
+
+def model_hash(entry):
+    # skrót zawartości pliku modelu – "wersja modelu" zapisywana w artefaktach
+    digest = hashlib.sha1()
+    with open(entry.model_file, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def load_context(entry):
+    with LOAD_SECONDS.labels("context").time():
+        context = _load_scoring_context(entry)
+    if os.path.exists(entry.subclusters):
+        from subclusters import load_subclusters
+
+        model_version, subclusters = load_subclusters(entry.subclusters)
+        # podgrupy z innej wersji modelu nie pasują do jej grup
+        if model_version == context.model_version:
+            context.attach_subclusters(subclusters)
+    if os.path.exists(entry.partitions):
+        from partitions import open_partitions
+
+        try:
+            partitions = open_partitions(entry.partitions)
+        except ValueError:
+            # plik w starym formacie (manifest obok) – do przebudowania
+            partitions = None
+        # segmenty z innej wersji modelu nie pasują do jego przypisań
+        if partitions is not None and partitions.model_version == context.model_version:
+            context.attach_partitions(partitions)
+    return context
+
+
+def _load_scoring_context(entry):
+    from bundle import open_bundle
+    from results import context_from_bundle, context_from_model
+
+    version = model_hash(entry)
+    if os.path.exists(entry.bundle):
+        bundle = open_bundle(entry.bundle)
+        # paczka z innego modelu (np. sprzed ponownego treningu) jest pomijana
+        if bundle.model_version == version:
+            # pełny zbiór (to_frame) powstaje dopiero, gdy jest potrzebny
+            return context_from_bundle(bundle)
+
+    from pycaret.clustering import load_model, predict_model  # type: ignore
+    from distances import compute_distances
+
+    model = load_model(entry.model_name, verbose=False)
+    with open(entry.descriptions, "r", encoding='utf-8') as f:
+        descriptions = json.loads(f.read())
+
+    def load_full():
+        from multiselect import legacy_frame
+        from survey import MULTI_OPTIONS
+
+        raw_df = pd.read_csv(entry.data, sep=';')
+        model_df = legacy_frame(raw_df)
+        all_df = predict_model(model, data=model_df)
+        # w zbiorze zostają pełne zbiory wyborów ("Psy|Inne"), model widzi odpowiedzi łączone
+        all_df[list(MULTI_OPTIONS)] = raw_df[list(MULTI_OPTIONS)]
+        # duże zbiory – macierz w pliku mmap zamiast w pamięci workera
+        return all_df, compute_distances(model, model_df, path=entry.distances)
+
+    return context_from_model(model, load_full, None, descriptions, model_version=version)
+
+
+def _is_mapped(array):
+    # tablice z mmap (paczka, .npy) nie zajmują prywatnej pamięci procesu
+    while array is not None:
+        if isinstance(array, (np.memmap, mmap.mmap)):
+            return True
+        array = getattr(array, "base", None)
+    return False
+
+
+def context_nbytes(context):
+    # jeszcze niezaładowany pełny zbiór nie zajmuje pamięci
+    if not context.full_loaded:
+        return 0
+    total = int(context.all_df.memory_usage(deep=True).sum())
+    if not _is_mapped(context.all_distances):
+        total += context.all_distances.nbytes
+    return total
+
+
+class ModelRegistry:
+
+    def __init__(self, directory='.', max_resident=MAX_RESIDENT, max_bytes=MAX_BYTES):
+        self.directory = directory
+        self.max_resident = max_resident
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._resident = OrderedDict()   # wersja -> kontekst
+        self.versions = discover(directory)
+        self.loads = 0
+        self.evictions = 0
+
+    def refresh(self):
+        versions = discover(self.directory)
+        with self._lock:
+            self.versions = versions
+
+    def get(self, version):
+        if version not in self.versions:
+            raise KeyError(f"Nieznana wersja modelu: {version}")
+
+        with self._lock:
+            if version in self._resident:
+                self._resident.move_to_end(version)
+                return self._resident[version]
+            load_lock = self._load_locks.setdefault(version, threading.Lock())
+
+        # osobna blokada na wersję: równoległe żądania tej samej wersji czekają
+        # na jedno ładowanie, a inne wersje są obsługiwane bez przeszkód
+        with load_lock:
+            with self._lock:
+                if version in self._resident:
+                    self._resident.move_to_end(version)
+                    return self._resident[version]
+            context = load_context(self.versions[version])
+            with self._lock:
+                self._resident[version] = context
+                self.loads += 1
+                self._evict()
+            return context
+
+    def _evict(self):
+        # zawsze zostaje co najmniej właśnie załadowana wersja; rozmiar liczony
+        # na bieżąco, bo pełny zbiór kontekstu może się doładować później
+        while len(self._resident) > 1 and (
+            len(self._resident) > self.max_resident
+            or sum(context_nbytes(context) for context in self._resident.values()) > self.max_bytes
+        ):
+            self._resident.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "versions": list(self.versions),
+                "resident": {version: context_nbytes(context) for version, context in self._resident.items()},
+                "loads": self.loads,
+                "evictions": self.evictions,
+            }
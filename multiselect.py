@@ -0,0 +1,91 @@
+# Odpowiedzi wielokrotnego wyboru jako maski bitowe: bit i = opcja
+# MULTI_OPTIONS[kolumna][i], jedna liczba (uint8 do 8 opcji, dalej szersze
+# typy) na osobę. Liczności i "czy wybrał X" to operacje bitowe na tablicy
+# masek, bez porównywania napisów. Napisy są parsowane raz na kategorię
+# (Categorical), a maski każdej osoby powstają przez indeksowanie tablicą.
+#
+# Dane i model nadal znają odpowiedzi łączone ("Koty i Psy", zob. survey.py),
+# więc odpowiedzi w nowym formacie ("Psy|Inne") są przed predykcją
+# zamieniane na odpowiedź z OPTIONS (legacy_frame).
+
+import numpy as np
+import pandas as pd  # type: ignore
+
+from survey import MULTI_OPTIONS, NO_CHOICE, OPTIONS, choice_mask, legacy_answer, parse_choices
+
+
+def mask_dtype(column):
+    width = len(MULTI_OPTIONS[column])
+    for dtype in (np.uint8, np.uint16, np.uint32, np.uint64):
+        if width <= np.iinfo(dtype).bits:
+            return dtype
+    raise ValueError(f"Za dużo opcji w {column}: {width}")
+
+
+def pack(column, values):
+    # (maski, czy jest odpowiedź) dla kolumny odpowiedzi
+    categorical = values if isinstance(values.dtype, pd.CategoricalDtype) else values.astype(object).astype("category")
+    table = np.array(
+        [choice_mask(column, parse_choices(column, value)) for value in categorical.cat.categories],
+        dtype=mask_dtype(column),
+    )
+    codes = categorical.cat.codes.to_numpy()
+    present = codes >= 0
+    masks = np.zeros(len(codes), dtype=table.dtype)
+    masks[present] = table[codes[present]]
+    return masks, present
+
+
+def option_counts(column, masks, present):
+    # ile osób wybrało każdą opcję (osoba liczy się przy każdym swoim wyborze)
+    counts = {
+        option: int(np.count_nonzero(masks & (1 << i)))
+        for i, option in enumerate(MULTI_OPTIONS[column])
+    }
+    counts[NO_CHOICE[column]] = int(np.count_nonzero(present & (masks == 0)))
+    return {option: n for option, n in counts.items() if n > 0}
+
+
+def counts_from_answers(column, answer_counts):
+    # to samo z liczności odpowiedzi łączonych (baza SQL, szkice, manifest)
+    answers = list(answer_counts)
+    table = np.array([choice_mask(column, parse_choices(column, answer)) for answer in answers], dtype=np.uint64)
+    values = np.array([answer_counts[answer] for answer in answers], dtype=np.int64)
+    counts = {
+        option: int(values[(table & (1 << i)) != 0].sum())
+        for i, option in enumerate(MULTI_OPTIONS[column])
+    }
+    counts[NO_CHOICE[column]] = int(values[table == 0].sum())
+    return {option: n for option, n in counts.items() if n > 0}
+
+
+def multi_counts_from_answers(counts):
+    return {column: counts_from_answers(column, counts[column]) for column in MULTI_OPTIONS}
+
+
+def selected_any(column, masks, choices):
+    # osoby, które wybrały którąkolwiek z opcji (NO_CHOICE: osoby bez wyboru)
+    wanted = choice_mask(column, [choice for choice in choices if choice != NO_CHOICE[column]])
+    selected = (masks & wanted) != 0
+    if NO_CHOICE[column] in choices:
+        selected |= masks == 0
+    return selected
+
+
+def legacy_frame(df):
+    # odpowiedzi wielokrotnego wyboru jako odpowiedzi z OPTIONS (wejście modelu)
+    columns = [column for column in MULTI_OPTIONS if column in df.columns]
+    if not columns:
+        return df
+    df = df.copy()
+    for column in columns:
+        values = df[column].astype(object)
+        known = values.isna() | values.isin(OPTIONS[column])
+        if known.all():
+            continue
+        masks, _ = pack(column, values[~known])
+        answers = {mask: legacy_answer(column, int(mask)) for mask in np.unique(masks)}
+        values[~known] = [answers[mask] for mask in masks]
+        df[column] = values
+    return df
+
@@ -0,0 +1,218 @@
+# Uczenie online modelu KMeans: nowe odpowiedzi są co jakiś czas dokładane
+# do centroidów (mini-batch) w wątku w tle. Nowa wersja modelu jest
+# publikowana dopiero wtedy, gdy centroidy przesuną się bardziej niż próg.
+
+import copy
+import io
+import os
+import threading
+
+import joblib  # type: ignore
+import numpy as np
+import pandas as pd  # type: ignore
+from scipy.optimize import linear_sum_assignment  # type: ignore
+
+from distances import cluster_labels, encode, own_distances, pairwise_distances
+
+BATCH_SIZE = 64
+POLL_INTERVAL = 30.0      # sekundy między kolejnymi przebiegami wątku
+DRIFT_THRESHOLD = 0.05    # maks. przesunięcie centroidu (odl. euklidesowa)
+
+
+def match_centroids(reference, candidate):
+    # permutacja, po której candidate[order[i]] jest najbliżej reference[i]
+    # – dzięki temu numery klastrów (i ich nazwy/opisy) się nie zmieniają
+    cost = ((reference[:, None, :] - candidate[None, :, :]) ** 2).sum(axis=2)
+    rows, cols = linear_sum_assignment(cost)
+    order = np.empty(len(rows), dtype=int)
+    order[rows] = cols
+    return order
+
+
+def centroid_drift(reference, candidate):
+    return float(np.linalg.norm(reference - candidate, axis=1).max())
+
+
+class ResponseTail:
+    # plik z nowymi odpowiedziami jest tylko dopisywany – każdy odczyt zaczyna
+    # się od bajtu, na którym skończył się poprzedni, zamiast parsować cały CSV;
+    # plik krótszy niż zapamiętane miejsce (albo inny plik pod tą samą nazwą)
+    # został podmieniony i jest czytany od początku
+
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+        self._header = None
+        self._inode = None
+
+    def read(self):
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            if stat.st_size < self.offset or stat.st_ino != self._inode:
+                self.offset = 0
+                self._inode = stat.st_ino
+            if self.offset == 0:
+                header = f.readline()
+                if not header.endswith(b"\n"):
+                    # nagłówek jeszcze w trakcie zapisu
+                    return None
+                self._header = header
+                self.offset = len(header)
+            f.seek(self.offset)
+            data = f.read()
+        # tylko pełne wiersze – ostatni może być właśnie dopisywany
+        end = data.rfind(b"\n") + 1
+        if end == 0:
+            return None
+        self.offset += end
+        return pd.read_csv(io.BytesIO(self._header + data[:end]), sep=';')
+
+
+class OnlineClusterUpdater:
+
+    def __init__(
+        self,
+        model,
+        model_path,
+        responses_path,
+        training_df=None,
+        batch_size=BATCH_SIZE,
+        poll_interval=POLL_INTERVAL,
+        drift_threshold=DRIFT_THRESHOLD,
+        sketches=None,
+    ):
+        self.model_path = model_path
+        self.responses_path = responses_path
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.drift_threshold = drift_threshold
+        # opcjonalne szkice statystyk grup (sketches.py), aktualizowane razem z modelem
+        self.sketches = sketches
+        self._labels = np.array(cluster_labels(model))
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._model = model
+        self._version = 0
+        self._pending = []
+        self._responses = ResponseTail(responses_path)
+
+        kmeans = model[-1]
+        self._centers = kmeans.cluster_centers_.astype(np.float64)
+        self._published_centers = self._centers.copy()
+        # liczebności klastrów = "pamięć" centroidu; bez danych treningowych
+        # każdy centroid startuje z wagą 1
+        if training_df is not None:
+            distances = kmeans.transform(self._encode(training_df))
+            labels = distances.argmin(axis=1)
+            self._counts = np.bincount(labels, minlength=len(self._centers)).astype(np.float64)
+            if sketches is not None:
+                sketches.update(training_df, self._labels[labels], own_distances(distances, labels))
+        else:
+            self._counts = np.ones(len(self._centers))
+        self.drift = 0.0
+
+    @property
+    def model(self):
+        with self._lock:
+            return self._model
+
+    @property
+    def version(self):
+        with self._lock:
+            return self._version
+
+    def stats(self):
+        # published: ile wersji opublikował ten proces; drift: przesunięcie
+        # centroidów od ostatniej publikacji (publikacja powyżej drift_threshold)
+        return {
+            "published": self.version,
+            "drift": self.drift,
+            "drift_threshold": self.drift_threshold,
+            "responses_bytes_read": self._responses.offset,
+        }
+
+    def ingest(self, df):
+        with self._lock:
+            self._pending.append(df)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="online-kmeans", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            self.step()
+
+    def _encode(self, df):
+        # wybory wielokrotne jako odpowiedzi łączone (distances.encode)
+        return encode(self._model, df).astype(np.float64)
+
+    def _read_new_responses(self):
+        new_rows = self._responses.read()
+        return new_rows if new_rows is not None and len(new_rows) else None
+
+    def step(self):
+        with self._lock:
+            batches, self._pending = self._pending, []
+        new_rows = self._read_new_responses()
+        if new_rows is not None:
+            batches.append(new_rows)
+        if not batches:
+            return False
+
+        new_df = pd.concat(batches, ignore_index=True)
+        X = self._encode(new_df)
+        if self.sketches is not None:
+            distances = pairwise_distances(X, self._centers)
+            labels = distances.argmin(axis=1)
+            self.sketches.update(new_df, self._labels[labels], own_distances(distances, labels))
+        for start in range(0, len(X), self.batch_size):
+            self._partial_fit(X[start:start + self.batch_size])
+
+        self.drift = centroid_drift(self._published_centers, self._centers)
+        if self.drift > self.drift_threshold:
+            self._publish()
+            return True
+        return False
+
+    def _partial_fit(self, X):
+        distances = ((X[:, None, :] - self._centers[None, :, :]) ** 2).sum(axis=2)
+        labels = distances.argmin(axis=1)
+        # krok mini-batch KMeans: współczynnik uczenia 1 / liczebność klastra,
+        # czyli centroid to średnia ze wszystkich przypisanych do niego punktów
+        for k in np.unique(labels):
+            members = X[labels == k]
+            self._counts[k] += len(members)
+            eta = len(members) / self._counts[k]
+            self._centers[k] += eta * (members.mean(axis=0) - self._centers[k])
+
+    def _publish(self):
+        order = match_centroids(self._published_centers, self._centers)
+        self._centers = self._centers[order]
+        self._counts = self._counts[order]
+
+        new_model = copy.deepcopy(self._model)
+        kmeans = new_model[-1]
+        kmeans.cluster_centers_ = self._centers.astype(kmeans.cluster_centers_.dtype)
+
+        # zapis atomowy: najpierw plik tymczasowy, potem podmiana
+        tmp_path = f"{self.model_path}.tmp"
+        joblib.dump(new_model, tmp_path)
+        os.replace(tmp_path, self.model_path)
+
+        with self._lock:
+            self._model = new_model
+            self._version += 1
+        self._published_centers = self._centers.copy()
+        self.drift = 0.0
@@ -0,0 +1,94 @@
+# Przegląd wszystkich grup naraz: liczność każdej grupy i liczności odpowiedzi
+# w każdej parze (grupa, odpowiedź). Cały oceniony zbiór przechodzimy raz –
+# kod grupy i kod odpowiedzi każdej kolumny składają się w jeden indeks płaskiej
+# tablicy liczników i wszystko liczy jedno np.bincount (zamiast groupby osobno
+# dla każdej grupy i kolumny). Z agregatami z paczki (bundle.py) albo
+# manifestu segmentów (partitions.py) liczności są gotowe i osób nie czytamy wcale.
+#
+# Pytania wielokrotnego wyboru (multiselect.py) mają kolumnę na każdą opcję
+# i NO_CHOICE; osoba liczy się przy każdym swoim wyborze.
+
+import numpy as np
+import pandas as pd  # type: ignore
+
+from multiselect import counts_from_answers, pack
+from survey import COLUMNS, LABELS, MISSING, MULTI_OPTIONS, NO_CHOICE, OPTIONS
+
+
+def answers(col):
+    if col in MULTI_OPTIONS:
+        return MULTI_OPTIONS[col] + [NO_CHOICE[col]]
+    return list(OPTIONS[col])
+
+
+def _offsets():
+    widths = [len(answers(col)) for col in COLUMNS]
+    return dict(zip(COLUMNS, np.cumsum([0] + widths[:-1]).tolist())), sum(widths)
+
+
+def _split(table, labels, sizes):
+    offsets, _ = _offsets()
+    return {
+        "sizes": pd.Series(sizes, index=labels, dtype="int64"),
+        "counts": {
+            col: pd.DataFrame(
+                table[:, offsets[col]:offsets[col] + len(answers(col))], index=labels, columns=answers(col)
+            )
+            for col in COLUMNS
+        },
+    }
+
+
+def overview_from_frame(all_df, labels):
+    offsets, width = _offsets()
+    clusters = pd.Categorical(all_df["Cluster"].astype(object), categories=labels).codes.astype(np.int64)
+    keys = []
+    for col in COLUMNS:
+        base = clusters * width + offsets[col]
+        if col in MULTI_OPTIONS:
+            masks, present = pack(col, all_df[col])
+            for i in range(len(MULTI_OPTIONS[col])):
+                keys.append((base + i)[(clusters >= 0) & ((masks & (1 << i)) != 0)])
+            keys.append((base + len(MULTI_OPTIONS[col]))[(clusters >= 0) & present & (masks == 0)])
+        else:
+            codes = pd.Categorical(all_df[col].astype(object), categories=OPTIONS[col]).codes.astype(np.int64)
+            keys.append((base + codes)[(clusters >= 0) & (codes >= 0)])
+    table = np.bincount(np.concatenate(keys), minlength=len(labels) * width).reshape(len(labels), width)
+    sizes = np.bincount(clusters[clusters >= 0], minlength=len(labels))
+    return _split(table, labels, sizes)
+
+
+def overview_from_aggregates(aggregates, labels):
+    offsets, width = _offsets()
+    table = np.zeros((len(labels), width), dtype=np.int64)
+    for row, label in enumerate(labels):
+        counts = aggregates.counts(label)
+        for col in COLUMNS:
+            # braki (survey.MISSING) nie są żadną z odpowiedzi, także nie "brakiem wyboru"
+            answered = {answer: n for answer, n in counts[col].items() if answer != MISSING}
+            col_counts = counts_from_answers(col, answered) if col in MULTI_OPTIONS else answered
+            for j, answer in enumerate(answers(col)):
+                table[row, offsets[col] + j] = col_counts.get(answer, 0)
+    sizes = [aggregates.sizes[label] for label in labels]
+    return _split(table, labels, sizes)
+
+
+def cluster_overview(context):
+    if context.aggregates is not None:
+        return overview_from_aggregates(context.aggregates, context.labels)
+    return overview_from_frame(context.all_df, context.labels)
+
+
+def shares(overview):
+    # udział odpowiedzi w grupie (dzielone przez liczność grupy)
+    sizes = overview["sizes"].clip(lower=1)
+    return {col: counts.div(sizes, axis=0) for col, counts in overview["counts"].items()}
+
+
+def share_matrix(overview, names):
+    # grupy × (pytanie, odpowiedź)
+    matrix = pd.concat(
+        {LABELS[col]: values for col, values in shares(overview).items()},
+        axis=1,
+    )
+    return matrix.rename(index=names)
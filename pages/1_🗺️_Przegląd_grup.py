@@ -0,0 +1,69 @@
+# Przegląd wszystkich grup obok siebie: nazwa, liczność, rozkłady odpowiedzi
+# jako małe wykresy (jeden na grupę) i macierz udziałów grupa × odpowiedź.
+# Liczności powstają jednym przebiegiem po ocenionym zbiorze (overview.py)
+# i są trzymane w cache osobno dla każdej wersji modelu.
+
+import streamlit as st
+st.set_page_config(page_title="Przegląd grup", layout="wide")
+
+if "dark_mode" not in st.session_state:
+    st.session_state.dark_mode = True  # domyślnie dark
+
+import pandas as pd  # type: ignore
+
+from assets import logo_html, theme_html
+from charts import build_figures, share_heatmap, small_multiples
+from metrics import cached
+from overview import share_matrix, shares
+from resources import get_figure_pool, get_model_registry, selected_version
+from survey import COLUMNS, LABELS
+
+
+@cached(st.cache_data)
+def get_overview(_context, survey_version, model_version=0):
+    from overview import cluster_overview
+
+    return cluster_overview(_context)
+
+
+st.markdown(theme_html(st.session_state.dark_mode) + logo_html("by: Bart"), unsafe_allow_html=True)
+
+registry = get_model_registry()
+survey_version = selected_version(registry)
+
+context = registry.get(survey_version)
+overview = get_overview(context, survey_version, context.model_version)
+names = {label: context.descriptions[label]["name"] for label in context.labels}
+sizes = overview["sizes"]
+
+st.title("🗺️ Przegląd wszystkich grup")
+st.caption(f"Wersja ankiety {survey_version} · {int(sizes.sum())} osób w {len(sizes)} grupach")
+
+st.dataframe(
+    pd.DataFrame({
+        "Grupa": [names[label] for label in sizes.index],
+        "Liczba osób": sizes.to_numpy(),
+        "Udział": (sizes / max(int(sizes.sum()), 1)).to_numpy(),
+    }),
+    column_config={"Udział": st.column_config.ProgressColumn("Udział", format="%.2f", min_value=0, max_value=1)},
+    use_container_width=True,
+    hide_index=True,
+)
+with st.expander("Opisy grup"):
+    for label in sizes.index:
+        st.markdown(f"**{names[label]}** – {context.descriptions[label]['description']}")
+
+placeholders = {}
+st.header("📊 Udziały odpowiedzi")
+placeholders["share_matrix"] = st.empty()
+
+st.header("🔎 Rozkłady odpowiedzi w grupach")
+for col in COLUMNS:
+    placeholders[f"multiples_{col}"] = st.empty()
+
+group_shares = shares(overview)
+tasks = {"share_matrix": (share_heatmap, (share_matrix(overview, names),))}
+for col in COLUMNS:
+    tasks[f"multiples_{col}"] = (small_multiples, (group_shares[col].rename(index=names), LABELS[col]))
+for name, fig in build_figures(get_figure_pool(), tasks):
+    placeholders[name].plotly_chart(fig, use_container_width=True)
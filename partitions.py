@@ -0,0 +1,180 @@
+# Oceniony zbiór ankiety podzielony na klastry: jeden segment na klaster
+# w pliku welcome_survey_<wersja>.partitions. Nagłówek pliku to mały manifest
+# z liczebnościami, przesunięciami segmentów i licznościami odpowiedzi (braki
+# pod survey.MISSING, jak w koszu braków monitora dryfu). Strona pokazuje jedną
+# grupę, więc czyta tylko jej segment; ostatnio czytane segmenty zostają
+# w pamięci (LRU).
+#
+# Układ pliku (jak bundle.py): MAGIC | u64 długość nagłówka | manifest JSON |
+# segmenty wyrównane do 64 B. Segment: kody odpowiedzi (wiersze × kolumny,
+# int8; -1 = brak) i odległość każdej osoby od środka jej klastra (float32).
+# Manifest i dane podmienia jedno os.replace, a otwarty zbiór czyta przez mmap
+# plik, z którego wczytał manifest – przebudowa nie miesza starych przesunięć
+# z nowymi danymi.
+#
+# Budowanie: python partitions.py [wersja]   (domyślnie v2)
+
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+import pandas as pd  # type: ignore
+
+from metrics import LOAD_SECONDS
+from profile_cache import ProfileCache
+from survey import COLUMNS, MISSING
+
+MAGIC = b"FFPART01"
+ALIGN = 64
+MAX_CACHED_PARTITIONS = 4
+
+
+def _align(n):
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def write_partitions(path, all_df, all_distances, labels, model_version=0):
+    categories = {col: sorted(all_df[col].dropna().astype(str).unique().tolist()) for col in COLUMNS}
+    codes = np.stack([
+        pd.Categorical(all_df[col].astype(object), categories=categories[col]).codes.astype(np.int8)
+        for col in COLUMNS
+    ], axis=1)
+    clusters = all_df["Cluster"].astype(str).map({label: i for i, label in enumerate(labels)}).to_numpy()
+    own_distances = np.asarray(all_distances, dtype=np.float32)[np.arange(len(clusters)), clusters]
+
+    # przesunięcia segmentów względem początku danych (za nagłówkiem)
+    partitions = {}
+    segments = []
+    offset = 0
+    for idx, label in enumerate(labels):
+        members = np.flatnonzero(clusters == idx)
+        segment_codes = np.ascontiguousarray(codes[members])
+        distances_offset = _align(offset + segment_codes.nbytes)
+        segments.append((offset, segment_codes, distances_offset, own_distances[members]))
+        partitions[label] = {
+            "rows": int(len(members)),
+            "offset": offset,
+            "distances_offset": distances_offset,
+            "counts": {
+                col: {
+                    value: int(n)
+                    for value, n in all_df[col].iloc[members].astype(object).fillna(MISSING).value_counts().items()
+                }
+                for col in COLUMNS
+            },
+        }
+        offset = _align(distances_offset + 4 * len(members))
+    data_bytes = offset
+
+    header = json.dumps({
+        "model_version": model_version,
+        "labels": list(labels),
+        "columns": COLUMNS,
+        "categories": categories,
+        "partitions": partitions,
+    }, ensure_ascii=False).encode("utf-8")
+
+    # plik tymczasowy tego procesu, potem jedna podmiana manifestu i danych
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        data_start = _align(f.tell())
+        for codes_offset, segment_codes, distances_offset, distances in segments:
+            f.seek(data_start + codes_offset)
+            f.write(segment_codes.tobytes())
+            f.seek(data_start + distances_offset)
+            f.write(distances.tobytes())
+        f.truncate(data_start + data_bytes)
+    os.replace(tmp_path, path)
+
+
+class PartitionedDataset:
+
+    def __init__(self, path, max_cached=MAX_CACHED_PARTITIONS):
+        self.path = path
+        # mmap trzyma otwarty ten plik, z którego pochodzi manifest – także
+        # po podmianie pliku przez ponowne write_partitions
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} nie jest plikiem segmentów")
+        (header_len,) = struct.unpack_from("<Q", self._mmap, len(MAGIC))
+        header_start = len(MAGIC) + 8
+        self.manifest = json.loads(self._mmap[header_start:header_start + header_len].decode("utf-8"))
+        self._data_start = _align(header_start + header_len)
+        self._cache = ProfileCache(max_entries=max_cached, ttl=None)
+        self.bytes_read = 0
+
+    @property
+    def labels(self):
+        return self.manifest["labels"]
+
+    @property
+    def model_version(self):
+        return self.manifest["model_version"]
+
+    @property
+    def sizes(self):
+        return {label: meta["rows"] for label, meta in self.manifest["partitions"].items()}
+
+    def counts(self, label):
+        return self.manifest["partitions"][label]["counts"]
+
+    def value_counts(self, col):
+        # liczności w całym zbiorze – z manifestu, bez czytania segmentów
+        totals = {}
+        for label, meta in self.manifest["partitions"].items():
+            if col == "Cluster":
+                totals[label] = meta["rows"]
+                continue
+            for value, n in meta["counts"][col].items():
+                totals[value] = totals.get(value, 0) + n
+        return totals
+
+    def partition(self, label):
+        # (członkowie klastra, ich odległości od środka klastra)
+        return self._cache.get_or_compute(label, lambda: self._read(label))
+
+    def _read(self, label):
+        meta = self.manifest["partitions"][label]
+        rows = meta["rows"]
+        with LOAD_SECONDS.labels("partition").time():
+            codes = np.frombuffer(
+                self._mmap, dtype=np.int8, count=rows * len(COLUMNS), offset=self._data_start + meta["offset"]
+            ).reshape(rows, len(COLUMNS))
+            distances = np.frombuffer(
+                self._mmap, dtype=np.float32, count=rows, offset=self._data_start + meta["distances_offset"]
+            )
+        self.bytes_read += codes.nbytes + distances.nbytes
+
+        categories = self.manifest["categories"]
+        df = pd.DataFrame({
+            col: pd.Categorical.from_codes(codes[:, j], categories=categories[col])
+            for j, col in enumerate(COLUMNS)
+        })
+        df["Cluster"] = label
+        return df, distances
+
+    def stats(self):
+        return {**self._cache.stats(), "bytes_read": self.bytes_read, "file_bytes": len(self._mmap)}
+
+
+def open_partitions(path, max_cached=MAX_CACHED_PARTITIONS):
+    return PartitionedDataset(path, max_cached)
+
+
+if __name__ == "__main__":
+    import sys
+
+    from model_registry import DEFAULT_VERSION, discover, load_context
+
+    entry = discover()[sys.argv[1] if len(sys.argv) > 1 else DEFAULT_VERSION]
+    context = load_context(entry)
+    write_partitions(entry.partitions, context.all_df, context.all_distances, context.labels, context.model_version)
+    print(f"Zapisano {entry.partitions}: " + ", ".join(
+        f"{label} -> {size}" for label, size in open_partitions(entry.partitions).sizes.items()
+    ))
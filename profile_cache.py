@@ -0,0 +1,74 @@
+# Ograniczony (LRU + TTL), bezpieczny wątkowo cache pełnych wyników dla profilu
+# odpowiedzi. W przeciwieństwie do st.cache_data ma limit rozmiaru, czas życia
+# wpisów i liczniki trafień/chybień/wyrzuceń.
+
+import threading
+import time
+from collections import OrderedDict
+
+MAX_ENTRIES = 256
+TTL = 600.0   # sekundy
+
+
+class ProfileCache:
+
+    def __init__(self, max_entries=MAX_ENTRIES, ttl=TTL, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # klucz -> (czas wstawienia, wynik)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            created, value = entry
+            if self.ttl is not None and self._clock() - created > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (self._clock(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        # liczenie poza blokadą – dwa równoległe chybienia policzą wynik dwa razy,
+        # ale nie blokują się nawzajem ani innych kluczy
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
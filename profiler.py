@@ -0,0 +1,254 @@
+# Profil pojedynczego przebiegu skryptu – włączany dla jednej sesji
+# (?profiler=1&profiler_token=… w app.py, tylko gdy ustawiono
+# FIND_FRIENDS_PROFILER_TOKEN) albo dla wszystkich (FIND_FRIENDS_PROFILER=1).
+# Pozostałe sesje nie płacą nic: próbnik działa tylko w profilowanej sesji.
+#
+# Zadania w pulach wątków (resources.py) są oznaczone sesją, która je zleciła
+# (for_session), więc do profilu trafia praca tylko tej sesji, także gdy
+# pule są zajęte wykresami i ładowaniem dla innych.
+#
+# Tryby:
+#   sampling (domyślny) – co INTERVAL zapisujemy stos wątku skryptu i wątków
+#     pul wykonujących w tej chwili zadania profilowanej sesji; niski narzut,
+#     widać też czas w pandas, Plotly i transformatorach PyCaret
+#   cprofile – każde wywołanie w wątku skryptu (cProfile); dokładne liczby
+#     wywołań, ale wyraźnie spowalnia przebieg
+#
+# Po każdym przebiegu w PROFILE_DIR powstają pliki <nazwa>.*:
+#   .collapsed – stosy "wątek;moduł:funkcja;… liczba" (flamegraph.pl, speedscope)
+#   .prof      – statystyki pstats (tryb cprofile; snakeviz, python -m pstats)
+#   .txt       – TOP funkcji (próbki/czas własny i skumulowany)
+
+import hmac
+import io
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+PROFILE_DIR = os.environ.get('FIND_FRIENDS_PROFILE_DIR', 'profiles')
+
+# sekret dla ?profiler= (porównanie stałoczasowe); bez niego parametr jest ignorowany
+PROFILER_TOKEN = os.environ.get('FIND_FRIENDS_PROFILER_TOKEN', '')
+
+INTERVAL = 0.005   # sekundy między próbkami
+
+MAX_SECONDS = 120.0   # próbnik kończy sam, gdy przebieg nie dobiegł końca
+
+TOP = 30
+
+MODES = ("sampling", "cprofile")
+
+
+
+def profiler_mode(value):
+    # wartość parametru/zmiennej -> tryb albo None (profil wyłączony)
+    if value in (None, "", "0"):
+        return None
+    if value in MODES:
+        return value
+    return "sampling"
+
+
+def requested_mode(query_value, query_token, default=None):
+    # ?profiler= tylko z poprawnym ?profiler_token=; inaczej tryb z konfiguracji
+    if query_value is not None and PROFILER_TOKEN and query_token is not None:
+        if hmac.compare_digest(query_token.encode(), PROFILER_TOKEN.encode()):
+            return profiler_mode(query_value)
+    return profiler_mode(default)
+
+
+# wątek puli -> (sesja, pula) zadania, które właśnie wykonuje
+_running = {}
+
+
+def for_session(session, fn):
+    # fn oznaczona sesją na czas wykonania w wątku puli
+    def run(*args, **kwargs):
+        thread = threading.current_thread()
+        # nazwy wątków ThreadPoolExecutor: <thread_name_prefix>_<numer>
+        _running[thread.ident] = (session, thread.name.rsplit("_", 1)[0])
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _running.pop(thread.ident, None)
+
+    return run
+
+
+_locations = {}
+
+
+def _location(filename):
+    # ścieżka względem site-packages albo katalogu aplikacji – krótka, ale
+    # rozróżnia np. pandas/core/frame.py od plotly/basedatatypes.py
+    location = _locations.get(filename)
+    if location is None:
+        if filename.startswith("<"):
+            # <frozen importlib._bootstrap>, <string>
+            location = filename
+        else:
+            location = filename.replace(os.sep, "/")
+            for marker in ("/site-packages/", "/dist-packages/"):
+                if marker in location:
+                    location = location.split(marker, 1)[1]
+                    break
+            else:
+                relative = os.path.relpath(filename)
+                # biblioteka standardowa i inne pliki spoza aplikacji – sama nazwa
+                location = os.path.basename(filename) if relative.startswith("..") else relative
+            location = os.path.splitext(location)[0].replace("/", ".").replace(os.sep, ".")
+        _locations[filename] = location
+    return location
+
+
+def frame_stack(frame):
+    # od najbardziej zewnętrznej ramki do bieżącej
+    stack = []
+    while frame is not None:
+        stack.append(f"{_location(frame.f_code.co_filename)}:{frame.f_code.co_name}")
+        frame = frame.f_back
+    stack.reverse()
+    return tuple(stack)
+
+
+class SamplingProfiler:
+
+    def __init__(self, session=None, interval=INTERVAL, max_seconds=MAX_SECONDS):
+        # session: zadania pul z tym oznaczeniem (for_session) są próbkowane
+        # razem z wątkiem skryptu; None – sam wątek skryptu
+        self.session = session
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.stacks = Counter()
+        self.samples = 0
+        self._target = None
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        # próbkujemy wątek, który uruchomił profil (wątek skryptu)
+        self._target = threading.get_ident()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def _threads(self):
+        # (wątek, etykieta): wątek skryptu i wątki pul z zadaniami tej sesji
+        threads = [(self._target, "script")]
+        if self.session is not None:
+            threads += [(ident, pool) for ident, (session, pool) in list(_running.items()) if session == self.session]
+        return threads
+
+    def _run(self):
+        deadline = time.monotonic() + self.max_seconds
+        while not self._stopped.wait(self.interval):
+            # _current_frames to tylko najgłębsze ramki wątków – stos
+            # rozwijamy wyłącznie dla wątków tej sesji
+            frames = sys._current_frames()
+            for ident, label in self._threads():
+                frame = frames.get(ident)
+                if frame is not None:
+                    self.stacks[(label,) + frame_stack(frame)] += 1
+            self.samples += 1
+            if time.monotonic() > deadline:
+                break
+
+    def collapsed(self):
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.most_common())
+
+    def summary(self, elapsed, top=TOP):
+        own = Counter()
+        total = Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            for name in set(stack[1:]):
+                total[name] += count
+        # udział w próbkach wszystkich wątków (wątek skryptu i wątki pul z zadaniami sesji)
+        stacks = max(sum(self.stacks.values()), 1)
+        lines = [
+            f"Przebieg: {elapsed:.3f} s, {self.samples} próbek co {self.interval * 1000:.0f} ms, "
+            f"stosów: {sum(self.stacks.values())} (wątek skryptu i wątki pul z zadaniami sesji)"
+        ]
+        for title, counts in (("własne", own), ("skumulowane", total)):
+            lines.append(f"\nTOP {top} funkcji (próbki {title}):")
+            for name, count in counts.most_common(top):
+                lines.append(f"  {count:7d}  {count / stacks:6.1%}  {name}")
+        return "\n".join(lines) + "\n"
+
+
+class DeterministicProfiler:
+
+    def __init__(self):
+        import cProfile
+
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        self.profile.enable()
+        return self
+
+    def stop(self):
+        self.profile.disable()
+
+    def summary(self, elapsed, top=TOP):
+        import pstats
+
+        out = io.StringIO()
+        out.write(f"Przebieg: {elapsed:.3f} s (cProfile, tylko wątek skryptu)\n")
+        stats = pstats.Stats(self.profile, stream=out)
+        for key in ("tottime", "cumulative"):
+            stats.sort_stats(key).print_stats(top)
+        return out.getvalue()
+
+
+class RunProfile:
+    # profil jednego przebiegu; stop() zapisuje pliki i zwraca ich ścieżki
+    # (drugie wywołanie nic nie robi – przerwany przebieg może zostać
+    # zamknięty przez następny)
+
+    def __init__(self, name, mode="sampling", directory=PROFILE_DIR, session=None):
+        self.name = name
+        self.mode = mode
+        self.directory = directory
+        self.profiler = SamplingProfiler(session) if mode == "sampling" else DeterministicProfiler()
+        self._lock = threading.Lock()
+        self._started = None
+        self.paths = None
+
+    def start(self):
+        self._started = time.perf_counter()
+        self.profiler.start()
+        return self
+
+    def stop(self, interrupted=False):
+        with self._lock:
+            if self.paths is not None:
+                return self.paths
+            self.profiler.stop()
+            elapsed = time.perf_counter() - self._started
+            os.makedirs(self.directory, exist_ok=True)
+            base = os.path.join(self.directory, self.name)
+            self.paths = []
+            if self.mode == "sampling":
+                self.paths.append(_write(f"{base}.collapsed", self.profiler.collapsed()))
+            else:
+                self.profiler.profile.dump_stats(f"{base}.prof")
+                self.paths.append(f"{base}.prof")
+            summary = self.profiler.summary(elapsed)
+            if interrupted:
+                summary = "Przebieg przerwany (nowa interakcja) – profil do chwili przerwania\n" + summary
+            self.paths.append(_write(f"{base}.txt", summary))
+            return self.paths
+
+
+def _write(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return path
@@ -0,0 +1,127 @@
+# Zasoby współdzielone przez wszystkie strony aplikacji (app.py, pages/
+# i warianty strony app1.py–app3.py): jeden rejestr modeli, pule
+# wątków (wykresy i ładowanie w tle) i jeden cache wyników profili na proces.
+# Funkcje z st.cache_resource zdefiniowane w zwykłym module mają ten sam klucz
+# cache niezależnie od strony, która je wywołała – warianty działają w tym
+# samym serwerze (streamlit run app.py, przydział w app.py), więc to jedno
+# ładowanie modelu, jedna ocena zbioru i wspólne wyniki profili (profile_key). Warianty są tylko
+# warstwą prezentacji nad profile_result i wykresami z charts.py.
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+# rejestr wersji modelu (?version=v2): najwyżej tyle wersji naraz w pamięci workera
+MAX_RESIDENT_MODELS = int(os.environ.get('FIND_FRIENDS_MAX_RESIDENT_MODELS', '3'))
+
+MAX_RESIDENT_MODELS_MB = int(os.environ.get('FIND_FRIENDS_MAX_RESIDENT_MODELS_MB', '512'))
+
+# cache pełnych wyników dla profilu (LRU + TTL)
+PROFILE_CACHE_MAX_ENTRIES = 256
+
+PROFILE_CACHE_TTL = 600
+
+# ładowanie modelu i liczenie wyniku w tle (app.in_background) – osobna pula,
+# żeby długie ładowanie nie zajmowało wątków wykresów innych sesji
+LOAD_WORKERS = 4
+
+
+@st.cache_resource
+def get_model_registry():
+    from model_registry import ModelRegistry
+
+    return ModelRegistry(
+        max_resident=MAX_RESIDENT_MODELS,
+        max_bytes=MAX_RESIDENT_MODELS_MB * 1024 * 1024,
+    )
+
+
+class SessionThreadPool(ThreadPoolExecutor):
+    # pula wspólna dla sesji; każde zadanie jest oznaczone sesją, która je
+    # zleciła (submit wołany w wątku skryptu), żeby profil sesji brał tylko jej pracę
+
+    def submit(self, fn, /, *args, **kwargs):
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+        from profiler import for_session
+
+        ctx = get_script_run_ctx(suppress_warning=True)
+        return super().submit(for_session(ctx.session_id if ctx is not None else None, fn), *args, **kwargs)
+
+
+@st.cache_resource
+def get_figure_pool():
+    from charts import FIGURE_WORKERS
+
+    return SessionThreadPool(max_workers=FIGURE_WORKERS, thread_name_prefix="figures")
+
+
+@st.cache_resource
+def get_load_pool():
+    return SessionThreadPool(max_workers=LOAD_WORKERS, thread_name_prefix="loads")
+
+
+@st.cache_resource
+def get_profile_cache():
+    from metrics import watch_profile_cache
+    from profile_cache import ProfileCache
+
+    cache = ProfileCache(max_entries=PROFILE_CACHE_MAX_ENTRIES, ttl=PROFILE_CACHE_TTL)
+    watch_profile_cache(cache)
+    return cache
+
+
+def selected_version(registry):
+    # ?version=v2; nieznana wersja – domyślna, z ostrzeżeniem na stronie
+    from model_registry import DEFAULT_VERSION
+
+    survey_version = st.query_params.get("version", DEFAULT_VERSION)
+    if survey_version not in registry.versions:
+        st.warning(f"Nieznana wersja ankiety: {survey_version} – pokazuję {DEFAULT_VERSION}")
+        survey_version = DEFAULT_VERSION
+    return survey_version
+
+
+def profile_key(person, survey_version, model_version, sketches=None):
+    # jeden kształt klucza cache wyników dla app.py i wariantów; wynik zależy
+    # od profilu, wersji ankiety i modelu, a w trybie przybliżonym także od
+    # stanu szkiców (baza SQL daje te same liczby co pandas – wspólny klucz)
+    from survey import COLUMNS
+
+    return (
+        tuple(person[col] for col in COLUMNS),
+        survey_version,
+        model_version,
+        None if sketches is None else sketches.updates,
+    )
+
+
+def profile_result(person):
+    # (kontekst, wynik) dla odpowiedzi z sidebaru – dokładne statystyki grupy,
+    # wynik wspólny dla wszystkich wariantów strony
+    import pandas as pd  # type: ignore
+
+    from results import compute_profile_result
+
+    registry = get_model_registry()
+    survey_version = selected_version(registry)
+    context = registry.get(survey_version)
+    return context, get_profile_cache().get_or_compute(
+        profile_key(person, survey_version, context.model_version),
+        lambda: compute_profile_result(context, pd.DataFrame([person])),
+    )
+
+
+def draw_figures(placeholders, tasks, template=None):
+    # placeholders: nazwa -> (st.empty(), use_container_width); budujemy tylko
+    # wykresy, dla których jest miejsce na stronie, każdy trafia na nie zaraz
+    # po zbudowaniu
+    from charts import build_figures
+
+    tasks = {name: task for name, task in tasks.items() if name in placeholders}
+    for name, fig in build_figures(get_figure_pool(), tasks):
+        if template is not None:
+            fig.update_layout(template=template)
+        placeholder, use_container_width = placeholders[name]
+        placeholder.plotly_chart(fig, use_container_width=use_container_width)
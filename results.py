@@ -0,0 +1,255 @@
+# Wynik strony dla profilu odpowiedzi: przewidziana grupa, siła przynależności
+# i agregaty grupy, z których budowane są wykresy. Wspólne dla app.py
+# i eksportu statycznej strony (export_static.py).
+
+import threading
+
+import numpy as np
+import pandas as pd  # type: ignore
+
+from distances import cluster_labels, compute_distances, encode, membership, share_farther
+from metrics import PREDICT_SECONDS, PREDICTIONS
+from multiselect import legacy_frame, option_counts, pack
+from subclusters import nearest_subcluster
+from survey import COLUMNS, MULTI_OPTIONS, OPTIONS, choice_mask, choices_answer, parse_choices
+
+
+class ScoringContext:
+    # wszystko, czego potrzeba do policzenia wyniku: oceniony zbiór,
+    # macierz odległości, etykiety/opisy klastrów i funkcja predykcji
+    # predict(person_df) -> (lista etykiet, macierz odległości do centroidów)
+    # encode(df) -> macierz cech (float32) w przestrzeni, w której liczy KMeans
+    # all_df może być funkcją zwracającą (all_df, all_distances) – wtedy pełny
+    # zbiór powstaje dopiero przy pierwszym użyciu, a widok jednej grupy czyta
+    # tylko jej segment z partitions (partitions.py)
+
+    def __init__(self, all_df, all_distances, labels, descriptions, predict, encode, model_version=0):
+        self._load_full = all_df if callable(all_df) else None
+        self._full = None if callable(all_df) else (all_df, all_distances)
+        self._full_lock = threading.Lock()
+        self._participant_clusters = None
+        self.labels = labels
+        self.descriptions = descriptions
+        self.predict = predict
+        self.encode = encode
+        self.model_version = model_version
+        self.subclusters = None
+        self.partitions = None
+        # agregaty policzone wcześniej (paczka albo manifest segmentów):
+        # sizes, counts(etykieta), value_counts(kolumna)
+        self.aggregates = None
+
+    def _full_data(self):
+        with self._full_lock:
+            if self._full is None:
+                self._full = self._load_full()
+            return self._full
+
+    @property
+    def full_loaded(self):
+        return self._full is not None
+
+    @property
+    def all_df(self):
+        return self._full_data()[0]
+
+    @property
+    def all_distances(self):
+        return self._full_data()[1]
+
+    @property
+    def participant_clusters(self):
+        if self._participant_clusters is None:
+            self._participant_clusters = (
+                self.all_df["Cluster"].astype(str).map({label: i for i, label in enumerate(self.labels)}).to_numpy()
+            )
+        return self._participant_clusters
+
+    def attach_subclusters(self, subclusters):
+        # drugi poziom (subclusters.py)
+        self.subclusters = subclusters
+
+    def attach_partitions(self, partitions):
+        self.partitions = partitions
+        self.aggregates = partitions
+
+    def group_members(self, label):
+        # (członkowie grupy, ich odległości od środka grupy)
+        if self.partitions is not None:
+            return self.partitions.partition(label)
+        cluster_idx = self.labels.index(label)
+        members = self.participant_clusters == cluster_idx
+        return self.all_df[members], self.all_distances[members, cluster_idx]
+
+    def member_subclusters(self, label):
+        # podgrupa każdego członka grupy (kolejność group_members), policzona przy
+        # trenowaniu podgrup; None, gdy grupa nie ma podziału
+        if self.subclusters is None or label not in self.subclusters:
+            return None
+        return self.subclusters[label]["members"]
+
+
+def context_from_bundle(bundle, all_df=None):
+    context = ScoringContext(
+        all_df if all_df is not None else lambda: (bundle.to_frame(), bundle.distances),
+        bundle.distances,
+        bundle.labels,
+        bundle.descriptions,
+        bundle.predict,
+        bundle.encode,
+        model_version=bundle.model_version,
+    )
+    context.aggregates = bundle
+    return context
+
+
+def context_from_model(model, all_df, all_distances, descriptions, model_version=0):
+    def predict(person_df):
+        from pycaret.clustering import predict_model  # type: ignore
+
+        person_df = legacy_frame(person_df)
+        return (
+            predict_model(model, data=person_df)["Cluster"].tolist(),
+            compute_distances(model, person_df),
+        )
+
+    return ScoringContext(
+        all_df,
+        all_distances,
+        cluster_labels(model),
+        descriptions,
+        predict,
+        lambda df: encode(model, df),
+        model_version=model_version,
+    )
+
+
+def group_result(same_cluster_df):
+    # agregaty grupy – zależą tylko od klastra, nie od profilu użytkownika
+    counts = {
+        "age": same_cluster_df["age"].sort_values().value_counts(sort=False),
+    }
+    for col in ["edu_level", "fav_animals", "fav_place", "gender"]:
+        counts[col] = same_cluster_df[col].value_counts(sort=False)
+    counts = {col: values[values > 0].to_dict() for col, values in counts.items()}
+
+    pair_counts = {}
+    for x_col in COLUMNS:
+        for y_col in COLUMNS:
+            if x_col != y_col:
+                pair_counts[(x_col, y_col)] = (
+                    same_cluster_df
+                    .groupby([x_col, y_col], observed=True)
+                    .size()
+                    .reset_index(name="count")
+                )
+
+    fav_place_top = same_cluster_df["fav_place"].value_counts()
+    # wybory wielokrotne jako maski bitowe (multiselect.py)
+    animals, animals_present = pack("fav_animals", same_cluster_df["fav_animals"])
+
+    return {
+        "group_size": len(same_cluster_df),
+        "summary": same_cluster_df.drop(columns=["Cluster"]).mode().iloc[0].to_dict(),
+        "counts": counts,
+        "multi_counts": {"fav_animals": option_counts("fav_animals", animals, animals_present)},
+        "pair_counts": pair_counts,
+        "radar": {
+            "Nad wodą": (same_cluster_df["fav_place"] == "Nad wodą").mean(),
+            "Las": (same_cluster_df["fav_place"] == "W lesie").mean(),
+            "Góry": (same_cluster_df["fav_place"] == "W górach").mean(),
+            "Psy": np.count_nonzero(animals & choice_mask("fav_animals", ["Psy"])) / max(len(animals), 1),
+            "Koty": np.count_nonzero(animals & choice_mask("fav_animals", ["Koty"])) / max(len(animals), 1),
+        },
+        "top_places": fav_place_top[fav_place_top > 0].head(5).to_dict(),
+    }
+
+
+def one_edit_neighbours(person):
+    # wszystkie profile różniące się od podanego dokładnie jedną odpowiedzią;
+    # w pytaniach wielokrotnego wyboru zmiana to zaznaczenie albo odznaczenie
+    # jednej opcji
+    rows = []
+    changes = []
+    for col in COLUMNS:
+        if col in MULTI_OPTIONS:
+            choices = parse_choices(col, person[col])
+            for option in MULTI_OPTIONS[col]:
+                if option in choices:
+                    toggled, change = [choice for choice in choices if choice != option], f"odznacz: {option}"
+                else:
+                    toggled, change = choices + [option], f"zaznacz: {option}"
+                rows.append({**person, col: choices_answer(col, toggled)})
+                changes.append((col, change))
+            continue
+        for value in OPTIONS[col]:
+            if value != person[col]:
+                rows.append({**person, col: value})
+                changes.append((col, value))
+    return pd.DataFrame(rows, columns=COLUMNS), changes
+
+
+def predict_profile(context, person_df):
+    # sama predykcja: przewidziana grupa i "co by było, gdyby"; profil i wszyscy
+    # jego "sąsiedzi" (jedna zmieniona odpowiedź) są oceniani jedną predykcją –
+    # strona pokazuje grupę, zanim policzy się reszta wyniku
+    neighbours_df, changes = one_edit_neighbours(person_df.iloc[0][COLUMNS].to_dict())
+    with PREDICT_SECONDS.time():
+        predicted_labels, person_distances = context.predict(
+            pd.concat([person_df[COLUMNS], neighbours_df], ignore_index=True)
+        )
+    predicted_cluster_id = predicted_labels[0]
+    PREDICTIONS.labels(predicted_cluster_id).inc()
+    return {
+        "cluster_id": predicted_cluster_id,
+        "cluster": context.descriptions[predicted_cluster_id],
+        "distances": person_distances[0],
+        "what_if": [
+            {"column": col, "value": value, "cluster_id": label, "name": context.descriptions[label]["name"]}
+            for (col, value), label in zip(changes, predicted_labels[1:])
+            if label != predicted_cluster_id
+        ],
+    }
+
+
+def complete_profile_result(context, person_df, prediction, group_stats=None):
+    # reszta wyniku dla przewidzianej grupy (siła przynależności, podgrupa, agregaty);
+    # group_stats (group_stats.py, np. baza SQLite albo szkice z sketches.py)
+    # zastępuje agregaty i siłę przynależności liczone w pandas z członków
+    # grupy – wtedy członkowie grupy nie są w ogóle wczytywani
+    predicted_cluster_id = prediction["cluster_id"]
+    cluster_idx = context.labels.index(predicted_cluster_id)
+    own_distance = prediction["distances"][cluster_idx]
+
+    if group_stats is not None:
+        strength = group_stats.strength(predicted_cluster_id, own_distance)
+        group = group_stats.group_result(predicted_cluster_id)
+    else:
+        same_cluster_df, group_distances = context.group_members(predicted_cluster_id)
+        strength = share_farther(group_distances, own_distance)
+        group = group_result(same_cluster_df)
+    user_membership = membership(strength, cluster_idx, prediction["distances"])
+
+    subcluster = None
+    if context.subclusters is not None and predicted_cluster_id in context.subclusters:
+        entry = context.subclusters[predicted_cluster_id]
+        subcluster = {
+            "index": int(nearest_subcluster(entry, context.encode(person_df[COLUMNS]))[0]),
+            "sizes": entry["sizes"],
+            "summaries": entry["summaries"],
+        }
+
+    return {
+        "cluster_id": predicted_cluster_id,
+        "cluster": prediction["cluster"],
+        "membership": user_membership,
+        "second_cluster": context.descriptions[context.labels[user_membership["second_idx"]]],
+        "subcluster": subcluster,
+        "what_if": prediction["what_if"],
+        **group,
+    }
+
+
+def compute_profile_result(context, person_df, group_stats=None):
+    # wszystko, co strona pokazuje dla danego profilu
+    return complete_profile_result(context, person_df, predict_profile(context, person_df), group_stats)
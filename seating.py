@@ -0,0 +1,157 @@
+# Podział uczestników wydarzenia na stoliki (grupy zadanej wielkości) tak,
+# żeby przy jednym stoliku siedziały możliwie podobne osoby.
+#
+# Start: uczestnicy posortowani po przewidzianym klastrze (i odpowiedziach),
+# pocięci na równe kawałki. Potem lokalne przeszukiwanie: osoby, którym
+# bliżej do środka innego stolika, zamieniają się miejscami parami – liczba
+# osób przy stolikach się nie zmienia. Wszystko na macierzach NumPy.
+#
+# Użycie: python seating.py uczestnicy.csv [wielkość_stolika] [wynik.csv]
+
+import numpy as np
+import pandas as pd  # type: ignore
+
+from survey import COLUMNS, LABELS
+
+GROUP_SIZE = 8
+MAX_ITERATIONS = 50
+
+
+def _group_means(X, groups, n_groups):
+    counts = np.bincount(groups, minlength=n_groups)
+    sums = np.stack([np.bincount(groups, weights=X[:, f], minlength=n_groups) for f in range(X.shape[1])], axis=1)
+    return sums / np.maximum(counts, 1)[:, None]
+
+
+def _sq_distances(X, M):
+    return np.maximum((X ** 2).sum(axis=1)[:, None] - 2 * X @ M.T + (M ** 2).sum(axis=1)[None, :], 0)
+
+
+def within_group_cost(X, groups, n_groups):
+    # suma kwadratów odległości od środka własnego stolika
+    M = _group_means(X, groups, n_groups)
+    return float(((X - M[groups]) ** 2).sum())
+
+
+def initial_groups(X, seed_labels, group_size):
+    n = len(X)
+    n_groups = max(1, -(-n // group_size))
+    # klaster jako klucz główny, potem odpowiedzi – identyczne profile obok siebie
+    order = np.lexsort(np.vstack([X.T[::-1], seed_labels]))
+    sizes = np.full(n_groups, n // n_groups)
+    sizes[:n % n_groups] += 1
+    groups = np.empty(n, dtype=np.int64)
+    groups[order] = np.repeat(np.arange(n_groups), sizes)
+    return groups, n_groups
+
+
+def _swap_pass(X, groups, n_groups):
+    n = len(X)
+    rows = np.arange(n)
+    D = _sq_distances(X, _group_means(X, groups, n_groups))
+    own = D[rows, groups]
+    D_other = D.copy()
+    D_other[rows, groups] = np.inf
+    target = D_other.argmin(axis=1)
+    gain = own - D_other[rows, target]
+
+    movers = np.flatnonzero(gain > 0)
+    if not len(movers):
+        return groups, False
+
+    # chętni do przejścia a->b pogrupowani po parze stolików, od największego zysku
+    movers = movers[np.lexsort((-gain[movers], target[movers], groups[movers]))]
+    pair_keys = groups[movers] * n_groups + target[movers]
+    keys, starts = np.unique(pair_keys, return_index=True)
+    stops = np.append(starts[1:], len(movers))
+
+    by_group = np.argsort(groups, kind="stable")
+    group_starts = np.searchsorted(groups[by_group], np.arange(n_groups + 1))
+
+    new_groups = groups.copy()
+    used = np.zeros(n, dtype=bool)
+    for key, start, stop in zip(keys.tolist(), starts.tolist(), stops.tolist()):
+        a, b = divmod(key, n_groups)
+        ab = movers[start:stop]
+        ab = ab[~used[ab]]
+        # partner z b: ten, kto najmniej traci (albo zyskuje) na przejściu do a
+        ba = by_group[group_starts[b]:group_starts[b + 1]]
+        ba = ba[~used[ba]]
+        back = own[ba] - D[ba, a]
+        ba_order = np.argsort(-back)
+        ba, back = ba[ba_order], back[ba_order]
+
+        k = min(len(ab), len(ba))
+        # obie listy malejące, więc suma też – bierzemy wszystkie dodatnie pary
+        k = int((gain[ab[:k]] + back[:k] > 0).sum())
+        if k:
+            new_groups[ab[:k]] = b
+            new_groups[ba[:k]] = a
+            used[ab[:k]] = True
+            used[ba[:k]] = True
+    return new_groups, bool(used.any())
+
+
+def partition(X, seed_labels, group_size=GROUP_SIZE, max_iterations=MAX_ITERATIONS):
+    X = np.asarray(X, dtype=np.float64)
+    groups, n_groups = initial_groups(X, np.asarray(seed_labels), group_size)
+    cost = within_group_cost(X, groups, n_groups)
+
+    for _ in range(max_iterations):
+        candidate, swapped = _swap_pass(X, groups, n_groups)
+        if not swapped:
+            break
+        candidate_cost = within_group_cost(X, candidate, n_groups)
+        # zysk liczony względem starych środków jest przybliżony –
+        # zostawiamy tylko zamiany, które naprawdę poprawiają wynik
+        if candidate_cost >= cost - 1e-9:
+            break
+        groups, cost = candidate, candidate_cost
+    return groups, cost
+
+
+def partition_attendees(context, attendees_df, group_size=GROUP_SIZE):
+    missing = [col for col in COLUMNS if col not in attendees_df.columns]
+    if missing:
+        raise ValueError(f"Brak kolumn w pliku uczestników: {', '.join(missing)}")
+
+    attendees_df = attendees_df[COLUMNS].reset_index(drop=True)
+    predicted_labels, _ = context.predict(attendees_df)
+    seed = np.array([context.labels.index(label) for label in predicted_labels])
+    X = context.encode(attendees_df).astype(np.float64)
+
+    groups, _ = partition(X, seed, group_size)
+    n_groups = int(groups.max()) + 1
+    M = _group_means(X, groups, n_groups)
+
+    assignments = attendees_df.copy()
+    assignments["Grupa"] = [context.descriptions[label]["name"] for label in predicted_labels]
+    assignments["Stolik"] = groups + 1
+    assignments["Odległość od środka stolika"] = np.sqrt(((X - M[groups]) ** 2).sum(axis=1)).round(3)
+
+    by_table = assignments.groupby("Stolik")
+    summary = pd.DataFrame({
+        "Liczba osób": by_table.size(),
+        "Średnia odległość od środka": by_table["Odległość od środka stolika"].mean().round(3),
+        "Najczęstsza grupa": by_table["Grupa"].agg(lambda s: s.mode().iloc[0]),
+    })
+    for col in COLUMNS:
+        shares = by_table[col].value_counts(normalize=True, dropna=False)
+        top = shares.groupby(level=0).head(1)
+        summary[LABELS[col]] = [
+            f"{value} ({share:.0%})" for (_, value), share in top.items()
+        ]
+    return assignments.sort_values(["Stolik", "Grupa"]), summary.reset_index()
+
+
+if __name__ == "__main__":
+    import sys
+
+    from model_registry import DEFAULT_VERSION, discover, load_context
+
+    attendees = pd.read_csv(sys.argv[1], sep=';')
+    group_size = int(sys.argv[2]) if len(sys.argv) > 2 else GROUP_SIZE
+    assignments, summary = partition_attendees(load_context(discover()[DEFAULT_VERSION]), attendees, group_size)
+    if len(sys.argv) > 3:
+        assignments.to_csv(sys.argv[3], sep=';', index=False)
+    print(summary.to_string(index=False))
@@ -0,0 +1,485 @@
+# Przybliżone statystyki grup dla bardzo dużej liczby odpowiedzi.
+#
+# Dla każdego klastra trzymamy szkice o stałym rozmiarze, aktualizowane
+# przyrostowo (paczka odpowiedzi po paczce) i łączone między shardami:
+#   - count-min: liczności odpowiedzi i par odpowiedzi (histogramy, kołowe,
+#     heatmapy, radar). Oszacowanie nigdy nie jest mniejsze od prawdziwej
+#     liczby, a z prawdopodobieństwem >= 1 - exp(-DEPTH) zawyża ją najwyżej
+#     o e / WIDTH * n, gdzie n to liczba osób w klastrze (tu ~0.07% n, 99.3%);
+#   - HyperLogLog: liczba różnych profili odpowiedzi, błąd względny
+#     (odchylenie standardowe) ~ 1.04 / sqrt(2 ** HLL_BITS), tu ~1.6%;
+#   - reservoir: jednostajna próbka RESERVOIR_SIZE przykładowych osób;
+#   - histogram odległości od środka grupy (stałe, logarytmiczne przedziały,
+#     DISTANCE_BINS między DISTANCE_MIN a DISTANCE_MAX): siła przynależności
+#     bez czytania członków grupy; kolejne granice różnią się o ~0.34%.
+# Liczone są odpowiedzi z survey.OPTIONS (te same, które widać na wykresach;
+# wybory wielokrotne jako odpowiedź łączona, multiselect.legacy_frame) oraz
+# osobno każda opcja wyboru wielokrotnego (bit maski, multiselect.pack).
+#
+# Budowa i łączenie:
+#   python sketches.py build [wersja] [wynik.npz]
+#   python sketches.py build-csv odpowiedzi.csv wynik.npz [wersja]
+#   python sketches.py merge wynik.npz shard1.npz shard2.npz ...
+
+import json
+import math
+import threading
+
+import numpy as np
+import pandas as pd  # type: ignore
+
+from distances import own_distances
+from multiselect import legacy_frame, option_counts, pack
+from survey import COLUMNS, LABELS, MULTI_OPTIONS, NO_CHOICE, OPTIONS
+
+WIDTH = 4096          # potęga dwójki
+DEPTH = 5
+HLL_BITS = 12
+RESERVOIR_SIZE = 20
+CHUNK_ROWS = 100_000
+SEED = 1
+DISTANCE_BINS = 4096
+DISTANCE_MIN = 1e-3
+DISTANCE_MAX = 1e3
+
+PAIRS = [(x_col, y_col) for i, x_col in enumerate(COLUMNS) for y_col in COLUMNS[i + 1:]]
+
+
+def _hash_keys(keys):
+    return pd.util.hash_array(np.asarray(keys, dtype=object))
+
+
+def _codes(df):
+    df = legacy_frame(df[COLUMNS])
+    return {col: pd.Categorical(df[col], categories=OPTIONS[col]).codes.astype(np.int64) for col in COLUMNS}
+
+
+def _masks(df):
+    return {col: pack(col, df[col]) for col in MULTI_OPTIONS}
+
+
+def _row_hashes(df):
+    return pd.util.hash_pandas_object(df[COLUMNS].astype(object), index=False).to_numpy()
+
+
+def _value_key(col, value):
+    return f"{col}={value}"
+
+
+def _pair_key(x_col, x, y_col, y):
+    return f"{x_col}={x}|{y_col}={y}"
+
+
+def _option_key(col, option):
+    return f"{col}~{option}"
+
+
+class CountMinSketch:
+
+    def __init__(self, width=WIDTH, depth=DEPTH, seed=SEED, table=None):
+        self.width = width
+        self.depth = depth
+        self.seed = seed
+        self.shift = np.uint64(64 - int(math.log2(width)))
+        # hashowanie multiply-shift: stałe a (nieparzyste) i b z ziarna
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, 2 ** 63, size=depth, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.b = rng.integers(0, 2 ** 63, size=depth, dtype=np.uint64)
+        self.table = np.zeros((depth, width), dtype=np.int64) if table is None else table
+
+    def _indices(self, hashes):
+        return ((self.a[:, None] * hashes[None, :] + self.b[:, None]) >> self.shift).astype(np.intp)
+
+    def add(self, keys, counts):
+        indices = self._indices(_hash_keys(keys))
+        counts = np.asarray(counts, dtype=np.int64)
+        for row in range(self.depth):
+            np.add.at(self.table[row], indices[row], counts)
+
+    def estimate(self, keys):
+        indices = self._indices(_hash_keys(keys))
+        return self.table[np.arange(self.depth)[:, None], indices].min(axis=0)
+
+    def merge(self, other):
+        if (self.width, self.depth, self.seed) != (other.width, other.depth, other.seed):
+            raise ValueError("Szkice count-min mają różne parametry")
+        self.table += other.table
+
+
+class HyperLogLog:
+
+    def __init__(self, bits=HLL_BITS, registers=None):
+        self.bits = bits
+        self.m = 1 << bits
+        self.registers = np.zeros(self.m, dtype=np.uint8) if registers is None else registers
+
+    def add_hashes(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        idx = (hashes >> np.uint64(64 - self.bits)).astype(np.intp)
+        rest = hashes & np.uint64((1 << (64 - self.bits)) - 1)
+        rank = (64 - self.bits) - _bit_length(rest) + 1
+        np.maximum.at(self.registers, idx, rank.astype(np.uint8))
+
+    def estimate(self):
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        raw = alpha * self.m ** 2 / np.ldexp(1.0, -self.registers.astype(np.int64)).sum()
+        zeros = int((self.registers == 0).sum())
+        if raw <= 2.5 * self.m and zeros:
+            # mały zakres: zliczanie liniowe
+            return self.m * math.log(self.m / zeros)
+        return float(raw)
+
+    def merge(self, other):
+        if self.bits != other.bits:
+            raise ValueError("Szkice HyperLogLog mają różne parametry")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+
+class DistanceHistogram:
+    # counts[0]: odległości poniżej DISTANCE_MIN, counts[-1]: od DISTANCE_MAX
+    # w górę; te same granice w każdym szkicu, więc łączenie to suma
+
+    edges = np.geomspace(DISTANCE_MIN, DISTANCE_MAX, DISTANCE_BINS + 1)
+
+    def __init__(self, counts=None):
+        self.counts = np.zeros(len(self.edges) + 1, dtype=np.int64) if counts is None else counts
+
+    def add(self, distances):
+        bins = np.searchsorted(self.edges, np.asarray(distances, dtype=np.float64), side="right")
+        self.counts += np.bincount(bins, minlength=len(self.counts))
+
+    @property
+    def total(self):
+        return int(self.counts.sum())
+
+    def share_farther(self, own_distance):
+        # jak distances.share_farther: odsetek odległości >= own_distance;
+        # przedział użytkownika liczy się w całości (odległości są w praktyce
+        # dyskretne – te same profile odpowiedzi), więc wynik jest dokładny,
+        # gdy w jego przedziale nie ma odległości mniejszych od own_distance
+        total = self.total
+        if not total:
+            return 1.0
+        k = int(np.searchsorted(self.edges, own_distance, side="right"))
+        return float(self.counts[k:].sum() / total)
+
+    def merge(self, other):
+        self.counts += other.counts
+
+
+def _bit_length(x):
+    x = x.copy()
+    length = np.zeros(len(x), dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        big = x >= np.uint64(1 << shift)
+        length[big] += shift
+        x[big] >>= np.uint64(shift)
+    return length + (x > 0)
+
+
+def _row(series):
+    return {col: (None if pd.isna(value) else value) for col, value in series.items()}
+
+
+class Reservoir:
+
+    def __init__(self, size=RESERVOIR_SIZE, seed=SEED, rows=None, seen=0):
+        self.size = size
+        self.rows = [] if rows is None else rows
+        self.seen = seen
+        self._rng = np.random.default_rng(seed)
+
+    def add(self, df):
+        # algorytm R: element nr t (od 0) trafia do próbki z prawd. size / (t + 1);
+        # losujemy sloty dla całej paczki naraz, słowniki powstają tylko dla trafień
+        positions = np.arange(self.seen, self.seen + len(df))
+        fill = max(0, min(self.size - len(self.rows), len(df)))
+        slots = np.full(len(df), -1, dtype=np.int64)
+        slots[:fill] = np.arange(len(self.rows), len(self.rows) + fill)
+        slots[fill:] = self._rng.integers(0, positions[fill:] + 1)
+        self.rows.extend([None] * fill)
+        for i in np.flatnonzero(slots < self.size).tolist():
+            self.rows[slots[i]] = _row(df.iloc[i])
+        self.seen += len(df)
+
+    def merge(self, other):
+        # obie próbki są jednostajne – liczba elementów z każdej ma rozkład
+        # hipergeometryczny względem liczby widzianych elementów
+        total = self.seen + other.seen
+        take = min(self.size, len(self.rows) + len(other.rows))
+        if not take:
+            return
+        if self.seen and other.seen:
+            from_self = int(self._rng.hypergeometric(self.seen, other.seen, take))
+        else:
+            from_self = take if self.seen else 0
+        from_self = min(from_self, len(self.rows))
+        from_other = min(take - from_self, len(other.rows))
+        picked_self = self._rng.choice(len(self.rows), from_self, replace=False)
+        picked_other = self._rng.choice(len(other.rows), from_other, replace=False)
+        self.rows = [self.rows[i] for i in picked_self] + [other.rows[i] for i in picked_other]
+        self.seen = total
+
+
+class ClusterSketch:
+
+    def __init__(self, width=WIDTH, depth=DEPTH, hll_bits=HLL_BITS, reservoir_size=RESERVOIR_SIZE, seed=SEED):
+        self.n = 0
+        self.counts = CountMinSketch(width, depth, seed)
+        self.profiles = HyperLogLog(hll_bits)
+        self.examples = Reservoir(reservoir_size, seed)
+        self.distances = DistanceHistogram()
+
+    def update(self, df, codes=None, hashes=None, masks=None, distances=None):
+        # codes: odpowiedzi jako numery w OPTIONS (-1 gdy brak), hashes: hash
+        # całego wiersza, masks: (maski, czy jest odpowiedź) wyborów
+        # wielokrotnych – ClusterSketches liczy je raz dla całej paczki;
+        # distances: odległości osób od środka grupy
+        df = df[COLUMNS]
+        codes = _codes(df) if codes is None else codes
+        hashes = _row_hashes(df) if hashes is None else hashes
+        masks = _masks(df) if masks is None else masks
+        self.n += len(df)
+
+        keys, counts = [], []
+        for col in COLUMNS:
+            values = codes[col]
+            found = np.bincount(values[values >= 0], minlength=len(OPTIONS[col]))
+            for i in np.flatnonzero(found).tolist():
+                keys.append(_value_key(col, OPTIONS[col][i]))
+                counts.append(found[i])
+        for x_col, y_col in PAIRS:
+            x, y = codes[x_col], codes[y_col]
+            both = (x >= 0) & (y >= 0)
+            n_y = len(OPTIONS[y_col])
+            found = np.bincount(x[both] * n_y + y[both], minlength=len(OPTIONS[x_col]) * n_y)
+            for i in np.flatnonzero(found).tolist():
+                keys.append(_pair_key(x_col, OPTIONS[x_col][i // n_y], y_col, OPTIONS[y_col][i % n_y]))
+                counts.append(found[i])
+        for col, (values, present) in masks.items():
+            for option, count in option_counts(col, values, present).items():
+                keys.append(_option_key(col, option))
+                counts.append(count)
+        if keys:
+            self.counts.add(keys, counts)
+
+        self.profiles.add_hashes(hashes)
+        self.examples.add(df)
+        if distances is not None:
+            self.distances.add(distances)
+
+    def merge(self, other):
+        self.n += other.n
+        self.counts.merge(other.counts)
+        self.profiles.merge(other.profiles)
+        self.examples.merge(other.examples)
+        self.distances.merge(other.distances)
+
+    def value_counts(self, col):
+        estimates = self.counts.estimate([_value_key(col, value) for value in OPTIONS[col]])
+        return {value: int(min(count, self.n)) for value, count in zip(OPTIONS[col], estimates) if count > 0}
+
+    def option_counts(self, col):
+        # jak multiselect.option_counts: osoba liczy się przy każdym swoim wyborze
+        options = MULTI_OPTIONS[col] + [NO_CHOICE[col]]
+        estimates = self.counts.estimate([_option_key(col, option) for option in options])
+        return {option: int(min(count, self.n)) for option, count in zip(options, estimates) if count > 0}
+
+    def pair_counts(self, x_col, y_col):
+        if COLUMNS.index(x_col) > COLUMNS.index(y_col):
+            df = self.pair_counts(y_col, x_col)
+            return df[[x_col, y_col, "count"]]
+        pairs = [(x, y) for x in OPTIONS[x_col] for y in OPTIONS[y_col]]
+        estimates = self.counts.estimate([_pair_key(x_col, x, y_col, y) for x, y in pairs])
+        return pd.DataFrame(
+            [(x, y, int(min(count, self.n))) for (x, y), count in zip(pairs, estimates) if count > 0],
+            columns=[x_col, y_col, "count"],
+        )
+
+
+class ClusterSketches:
+    # szkice wszystkich klastrów jednej wersji modelu; bezpieczne dla wątków
+    # (aktualizuje je wątek uczenia online, czyta strona)
+
+    def __init__(self, labels, model_version=None, **params):
+        # model_version: skrót modelu, z którego przypisań powstały szkice
+        self.model_version = model_version
+        self.params = params
+        self.sketches = {label: ClusterSketch(**params) for label in labels}
+        self.updates = 0
+        self._lock = threading.Lock()
+
+    def __getitem__(self, label):
+        return self.sketches[label]
+
+    @property
+    def has_distances(self):
+        # szkice zapisane bez histogramu odległości (starszy plik) są liczone od nowa
+        return all(sketch.distances.total == sketch.n for sketch in self.sketches.values())
+
+    def update(self, df, labels, distances=None):
+        # distances: odległość każdej osoby od środka jej grupy (distances.own_distances)
+        labels = np.asarray(labels)
+        codes = _codes(df)
+        hashes = _row_hashes(df)
+        masks = _masks(df)
+        with self._lock:
+            for label in np.unique(labels):
+                mask = labels == label
+                self.sketches[label].update(
+                    df[mask],
+                    {col: values[mask] for col, values in codes.items()},
+                    hashes[mask],
+                    {col: (values[mask], present[mask]) for col, (values, present) in masks.items()},
+                    None if distances is None else distances[mask],
+                )
+            self.updates += 1
+
+    def merge(self, other):
+        if other.model_version != self.model_version:
+            raise ValueError("Szkice z różnych wersji modelu")
+        with self._lock:
+            for label, sketch in other.sketches.items():
+                if label not in self.sketches:
+                    self.sketches[label] = ClusterSketch(**self.params)
+                self.sketches[label].merge(sketch)
+            self.updates += 1
+
+    def group_result(self, label):
+        with self._lock:
+            return group_result_from_sketch(self.sketches[label])
+
+    def strength(self, label, own_distance):
+        with self._lock:
+            return self.sketches[label].distances.share_farther(own_distance)
+
+    def save(self, path):
+        header = {"params": self.params, "model_version": self.model_version, "clusters": {}}
+        arrays = {}
+        with self._lock:
+            for i, (label, sketch) in enumerate(self.sketches.items()):
+                header["clusters"][label] = {
+                    "n": sketch.n,
+                    "examples": sketch.examples.rows,
+                    "seen": sketch.examples.seen,
+                }
+                arrays[f"counts_{i}"] = sketch.counts.table
+                arrays[f"profiles_{i}"] = sketch.profiles.registers
+                arrays[f"distances_{i}"] = sketch.distances.counts
+        with open(path, "wb") as f:
+            np.savez(f, header=np.array(json.dumps(header, ensure_ascii=False)), **arrays)
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        header = json.loads(str(data["header"]))
+        sketches = cls(list(header["clusters"]), header.get("model_version"), **header["params"])
+        for i, (label, meta) in enumerate(header["clusters"].items()):
+            sketch = sketches.sketches[label]
+            sketch.n = meta["n"]
+            sketch.counts.table = data[f"counts_{i}"].copy()
+            sketch.profiles.registers = data[f"profiles_{i}"].copy()
+            if f"distances_{i}" in data.files:
+                sketch.distances.counts = data[f"distances_{i}"].copy()
+            sketch.examples.rows = meta["examples"]
+            sketch.examples.seen = meta["seen"]
+        return sketches
+
+
+def group_result_from_sketch(sketch):
+    # ten sam kształt co results.group_result – wykresy nie wiedzą, skąd są liczby
+    counts = {col: sketch.value_counts(col) for col in COLUMNS}
+    pair_counts = {
+        (x_col, y_col): sketch.pair_counts(x_col, y_col)
+        for x_col in COLUMNS for y_col in COLUMNS if x_col != y_col
+    }
+    n = max(sketch.n, 1)
+    places = counts["fav_place"]
+    multi_counts = {col: sketch.option_counts(col) for col in MULTI_OPTIONS}
+    animals = multi_counts["fav_animals"]
+    return {
+        "group_size": sketch.n,
+        "summary": {col: max(values, key=values.get) if values else None for col, values in counts.items()},
+        "counts": counts,
+        "multi_counts": multi_counts,
+        "pair_counts": pair_counts,
+        "radar": {
+            "Nad wodą": places.get("Nad wodą", 0) / n,
+            "Las": places.get("W lesie", 0) / n,
+            "Góry": places.get("W górach", 0) / n,
+            "Psy": animals.get("Psy", 0) / n,
+            "Koty": animals.get("Koty", 0) / n,
+        },
+        "top_places": dict(sorted(places.items(), key=lambda item: -item[1])[:5]),
+        "distinct_profiles": round(sketch.profiles.estimate()),
+        "examples": list(sketch.examples.rows),
+    }
+
+
+def compare_with_exact(approx, exact):
+    # tabela dla trybu porównania: liczności ze szkicu obok dokładnych
+    rows = []
+    for col in COLUMNS:
+        for value in OPTIONS[col]:
+            exact_count = int(exact["counts"][col].get(value, 0))
+            approx_count = int(approx["counts"][col].get(value, 0))
+            if exact_count or approx_count:
+                rows.append({
+                    "Pytanie": LABELS[col],
+                    "Odpowiedź": value,
+                    "Dokładnie": exact_count,
+                    "Szkic": approx_count,
+                    "Różnica": approx_count - exact_count,
+                })
+    return pd.DataFrame(rows)
+
+
+def sketches_from_frame(labels, df, cluster_labels, distances, chunk_rows=CHUNK_ROWS, sketches=None, model_version=None):
+    sketches = ClusterSketches(labels, model_version) if sketches is None else sketches
+    cluster_labels = np.asarray(cluster_labels)
+    for start in range(0, len(df), chunk_rows):
+        end = start + chunk_rows
+        sketches.update(df.iloc[start:end], cluster_labels[start:end], np.asarray(distances[start:end]))
+    return sketches
+
+
+def sketches_from_context(context, chunk_rows=CHUNK_ROWS):
+    return sketches_from_frame(
+        context.labels,
+        context.all_df,
+        context.all_df["Cluster"].astype(str),
+        own_distances(context.all_distances, context.participant_clusters),
+        chunk_rows,
+        model_version=str(context.model_version),
+    )
+
+
+if __name__ == "__main__":
+    import sys
+
+    from model_registry import DEFAULT_VERSION, discover, load_context
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "build"
+    if command == "build":
+        entry = discover()[sys.argv[2] if len(sys.argv) > 2 else DEFAULT_VERSION]
+        path = sys.argv[3] if len(sys.argv) > 3 else f"welcome_survey_sketches_{entry.version}.npz"
+        sketches = sketches_from_context(load_context(entry))
+    elif command == "build-csv":
+        path = sys.argv[3]
+        context = load_context(discover()[sys.argv[4] if len(sys.argv) > 4 else DEFAULT_VERSION])
+        sketches = ClusterSketches(context.labels, str(context.model_version))
+        for chunk in pd.read_csv(sys.argv[2], sep=';', chunksize=CHUNK_ROWS):
+            predicted_labels, distances = context.predict(chunk[COLUMNS])
+            cluster_idx = [context.labels.index(label) for label in predicted_labels]
+            sketches.update(chunk, predicted_labels, own_distances(distances, cluster_idx))
+    elif command == "merge":
+        path = sys.argv[2]
+        sketches = ClusterSketches.load(sys.argv[3])
+        for shard in sys.argv[4:]:
+            sketches.merge(ClusterSketches.load(shard))
+    else:
+        raise SystemExit(f"Nieznane polecenie: {command}")
+    sketches.save(path)
+    print(f"Zapisano {path}: " + ", ".join(
+        f"{label} -> {sketch.n}" for label, sketch in sketches.sketches.items()
+    ))
@@ -0,0 +1,81 @@
+# Drugi poziom klastrowania: każda grupa KMeans z modelu jest dzielona na
+# podgrupy już przy trenowaniu. Centroidy, liczebności, typowe odpowiedzi
+# podgrup i podgrupa każdego członka grupy (w kolejności
+# ScoringContext.group_members) trafiają do welcome_survey_subclusters_<wersja>.json
+# razem ze skrótem modelu, więc strona tylko wybiera najbliższą podgrupę,
+# a przeglądarka osób filtruje podgrupę bez ponownego przypisywania.
+#
+# Trenowanie: python subclusters.py [wersja]
+
+import json
+
+import numpy as np
+
+from survey import COLUMNS
+
+SUBCLUSTER_SIZE = 10    # docelowa liczebność podgrupy
+MAX_SUBCLUSTERS = 5
+
+
+def _summary(df):
+    mode = df[COLUMNS].mode()
+    return {col: (None if mode.empty or mode[col].isna().iloc[0] else mode[col].iloc[0]) for col in COLUMNS}
+
+
+def train_subclusters(context, random_state=1):
+    from sklearn.cluster import KMeans  # type: ignore
+
+    X = context.encode(context.all_df[COLUMNS])
+    subclusters = {}
+    for cluster_idx, label in enumerate(context.labels):
+        members = np.flatnonzero(context.participant_clusters == cluster_idx)
+        if not len(members):
+            continue
+        member_X = X[members]
+        k = int(np.clip(round(len(members) / SUBCLUSTER_SIZE), 1, MAX_SUBCLUSTERS))
+        k = min(k, len(np.unique(member_X, axis=0)))
+        kmeans = KMeans(n_clusters=k, random_state=random_state, n_init=10).fit(member_X)
+
+        member_df = context.all_df.iloc[members]
+        subclusters[label] = {
+            "centroids": kmeans.cluster_centers_.tolist(),
+            "sizes": np.bincount(kmeans.labels_, minlength=k).tolist(),
+            "summaries": [_summary(member_df[kmeans.labels_ == j]) for j in range(k)],
+            "members": kmeans.labels_.tolist(),
+        }
+    return subclusters
+
+
+def load_subclusters(path):
+    # (skrót modelu, podgrupy)
+    with open(path, "r", encoding='utf-8') as f:
+        data = json.loads(f.read())
+    if "clusters" not in data:
+        # plik sprzed zapisu skrótu modelu – jak podgrupy innej wersji modelu
+        return None, {}
+    subclusters = data["clusters"]
+    for entry in subclusters.values():
+        entry["centroids"] = np.asarray(entry["centroids"], dtype=np.float32)
+        entry["members"] = np.asarray(entry["members"], dtype=np.int16)
+    return data["model_version"], subclusters
+
+
+def nearest_subcluster(entry, X):
+    centroids = entry["centroids"]
+    d2 = ((X[:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2)
+    return d2.argmin(axis=1)
+
+
+if __name__ == "__main__":
+    import sys
+
+    from model_registry import DEFAULT_VERSION, discover, load_context
+
+    entry = discover()[sys.argv[1] if len(sys.argv) > 1 else DEFAULT_VERSION]
+    context = load_context(entry)
+    subclusters = train_subclusters(context)
+    with open(entry.subclusters, "w", encoding='utf-8') as f:
+        json.dump({"model_version": context.model_version, "clusters": subclusters}, f, ensure_ascii=False)
+    print(f"Zapisano {entry.subclusters}: " + ", ".join(
+        f"{label} -> {len(sub['sizes'])}" for label, sub in subclusters.items()
+    ))
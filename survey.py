@@ -0,0 +1,87 @@
+# Schemat ankiety: kolumny i dopuszczalne odpowiedzi (w kolejności z sidebaru).
+# Bez ciężkich importów – używany jeszcze przed załadowaniem pandas.
+
+COLUMNS = ['age', 'edu_level', 'fav_animals', 'fav_place', 'gender']
+
+OPTIONS = {
+    'age': ['<18', '18-24', '25-34', '35-44', '45-54', '55-64', '>=65', 'unknown'],
+    'edu_level': ['Podstawowe', 'Średnie', 'Wyższe'],
+    'fav_animals': ['Brak ulubionych', 'Psy', 'Koty', 'Koty i Psy', 'Inne'],
+    'fav_place': ['Nad wodą', 'W lesie', 'W górach', 'Inne'],
+    'gender': ['Kobieta', 'Mężczyzna'],
+}
+
+# klucz braków odpowiedzi w agregatach (manifest segmentów, paczka, monitor dryfu)
+MISSING = 'brak odpowiedzi'
+
+LABELS = {
+    'age': 'Wiek',
+    'edu_level': 'Wykształcenie',
+    'fav_animals': 'Ulubione zwierzęta',
+    'fav_place': 'Ulubione miejsce',
+    'gender': 'Płeć',
+}
+
+# Pytania wielokrotnego wyboru: opcje w kolejności bitów maski (multiselect.py).
+# Model był uczony na odpowiedziach łączonych ("Koty i Psy"), więc każdy zbiór
+# wyborów ma też odpowiedź z OPTIONS, na której liczy pipeline.
+MULTI_OPTIONS = {
+    'fav_animals': ['Psy', 'Koty', 'Inne'],
+}
+
+NO_CHOICE = {
+    'fav_animals': 'Brak ulubionych',
+}
+
+LEGACY_CHOICES = {
+    'fav_animals': {
+        'Brak ulubionych': [],
+        'Psy': ['Psy'],
+        'Koty': ['Koty'],
+        'Koty i Psy': ['Psy', 'Koty'],
+        'Inne': ['Inne'],
+    },
+}
+
+# w pliku CSV kilka wyborów w jednej komórce: "Psy|Inne"
+CHOICE_SEPARATOR = '|'
+
+
+def choice_mask(column, choices):
+    mask = 0
+    for choice in choices:
+        mask |= 1 << MULTI_OPTIONS[column].index(choice)
+    return mask
+
+
+def parse_choices(column, value):
+    # odpowiedź łączona z OPTIONS albo lista wyborów rozdzielona CHOICE_SEPARATOR
+    if value in LEGACY_CHOICES[column]:
+        return LEGACY_CHOICES[column][value]
+    return [choice for choice in value.split(CHOICE_SEPARATOR) if choice in MULTI_OPTIONS[column]]
+
+
+def choices_answer(column, choices):
+    # zbiór wyborów jako jedna odpowiedź, jak w pliku CSV: "Psy|Inne", a bez
+    # wyborów NO_CHOICE; opcje zawsze w kolejności MULTI_OPTIONS
+    return CHOICE_SEPARATOR.join(option for option in MULTI_OPTIONS[column] if option in choices) or NO_CHOICE[column]
+
+
+def choices_label(column, value):
+    # odpowiedź do wyświetlenia: wybrane opcje po przecinku ("Psy, Koty"
+    # także dla odpowiedzi łączonej "Koty i Psy")
+    return ", ".join(parse_choices(column, value)) or NO_CHOICE[column]
+
+
+def legacy_answer(column, mask):
+    # odpowiedź z OPTIONS dla modelu: dokładnie ten zbiór wyborów, a gdy takiej
+    # nie ma – największy zawarty w nim zbiór (przy remisie wcześniejszy w OPTIONS)
+    best, best_size = None, -1
+    for answer in OPTIONS[column]:
+        answer_mask = choice_mask(column, LEGACY_CHOICES[column][answer])
+        if answer_mask == mask:
+            return answer
+        size = bin(answer_mask).count("1")
+        if answer_mask & ~mask == 0 and size > best_size:
+            best, best_size = answer, size
+    return best
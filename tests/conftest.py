@@ -0,0 +1,7 @@
+# Testy importują moduły aplikacji z katalogu głównego repozytorium
+# (tak jak streamlit run app.py).
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
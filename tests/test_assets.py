@@ -0,0 +1,26 @@
+from assets import minify_css, theme_css
+
+CSS = """/* komentarz */
+.stApp:has(.ff-theme-dark) {
+    --ff-bg: #1E1E2F;   /* tło */
+}
+
+.stApp:has(.ff-app2) .app-logo span,
+.stApp:has(.ff-app2) label {
+    font-size: 16px;
+}
+"""
+
+
+def test_minify_drops_comments_and_other_pages_rules():
+    assert minify_css(CSS) == ".stApp:has(.ff-theme-dark){--ff-bg:#1E1E2F}"
+    assert minify_css(CSS, "app2") == (
+        ".stApp:has(.ff-theme-dark){--ff-bg:#1E1E2F}"
+        ".stApp:has(.ff-app2) .app-logo span,.stApp:has(.ff-app2) label{font-size:16px}"
+    )
+
+
+def test_theme_sheet_has_no_comments_or_app2_rules():
+    css = theme_css()
+    assert "/*" not in css and "ff-app2" not in css
+    assert "ff-app2" in theme_css("app2")
@@ -0,0 +1,35 @@
+import numpy as np
+
+from compatibility import build_dense, build_top_k
+
+
+def brute_force(X):
+    d = np.sqrt(((X[:, None, :] - X[None, :, :]) ** 2).sum(axis=2))
+    S = 1 / (1 + d)
+    np.fill_diagonal(S, -np.inf)
+    return S
+
+
+def test_top_k_matches_brute_force_across_blocks():
+    # kilka bloków wierszy i kolumn, w tym niepełny ostatni
+    X = np.random.default_rng(0).normal(size=(70, 5)).astype(np.float32)
+    index = build_top_k(X, k=4, block_size=16, workers=2)
+    S = brute_force(X.astype(np.float64))
+    expected = -np.sort(-S, axis=1)[:, :4]
+    assert np.allclose(index.scores, expected, atol=1e-5)
+    assert np.allclose(np.take_along_axis(S, index.indices.astype(np.int64), axis=1), expected, atol=1e-5)
+    assert not (index.indices == np.arange(70)[:, None]).any()
+
+
+def test_top_k_is_capped_by_cohort_size():
+    X = np.eye(3, dtype=np.float32)
+    assert build_top_k(X, k=10).indices.shape == (3, 2)
+    assert build_top_k(X[:1], k=10).indices.shape == (1, 0)
+
+
+def test_dense_matrix_matches_brute_force(tmp_path):
+    X = np.random.default_rng(1).normal(size=(40, 3)).astype(np.float32)
+    dense = build_dense(X, str(tmp_path / "dense.npy"), block_size=16)
+    expected = brute_force(X.astype(np.float64))
+    np.fill_diagonal(expected, 1.0)
+    assert np.allclose(dense, expected, atol=1e-5)
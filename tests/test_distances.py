@@ -0,0 +1,57 @@
+import os
+
+import numpy as np
+import pandas as pd  # type: ignore
+import pytest
+
+from distances import compute_distances, membership, own_distances, pairwise_distances, share_farther
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_pairwise_distances_match_naive():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(50, 7)).astype(np.float32)
+    centers = rng.normal(size=(4, 7)).astype(np.float32)
+    naive = np.sqrt(((X[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2))
+    assert np.allclose(pairwise_distances(X, centers), naive, atol=1e-5)
+
+
+def test_own_distances_pick_each_rows_cluster():
+    distances = np.arange(12, dtype=np.float32).reshape(4, 3)
+    assert own_distances(distances, [0, 2, 1, 2]).tolist() == [0, 5, 7, 11]
+
+
+def test_share_farther_counts_ties_as_farther():
+    group = np.array([1.0, 2.0, 2.0, 3.0])
+    assert share_farther(group, 2.0) == 0.75
+    assert share_farther(group, 5.0) == 0.0
+    assert share_farther(np.array([]), 1.0) == 1.0
+
+
+def test_membership_second_cluster_is_next_nearest():
+    user = np.array([0.5, 3.0, 1.5])
+    result = membership(0.4, 0, user)
+    assert result == {"strength": 0.4, "own_distance": 0.5, "second_idx": 2, "second_distance": 1.5}
+    # przypisanie inne niż najbliższy centroid (np. model online)
+    assert membership(0.4, 2, user)["second_idx"] == 0
+
+
+def test_large_sets_are_memory_mapped(tmp_path, monkeypatch):
+    pytest.importorskip("pycaret")
+    import distances
+    from model_registry import DEFAULT_VERSION, discover
+    from pycaret.clustering import load_model  # type: ignore
+
+    entry = discover(ROOT)[DEFAULT_VERSION]
+    model = load_model(entry.model_name, verbose=False)
+    df = pd.read_csv(entry.data, sep=';')
+    in_memory = compute_distances(model, df)
+
+    monkeypatch.setattr(distances, "MEMMAP_MIN_ROWS", 1)
+    monkeypatch.setattr(distances, "CHUNK_ROWS", 64)
+    path = str(tmp_path / "distances.npy")
+    mapped = compute_distances(model, df, path=path)
+    assert isinstance(mapped, np.memmap)
+    assert np.allclose(mapped, in_memory, atol=1e-5)
+    assert os.listdir(tmp_path) == ["distances.npy"]
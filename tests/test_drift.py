@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd  # type: ignore
+from scipy.stats import chisquare  # type: ignore
+
+from drift import DriftMonitor, chi_square, psi, reference_counts
+from survey import COLUMNS, OPTIONS
+
+LABELS = ["Cluster 0", "Cluster 1"]
+
+
+def responses(n, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({col: rng.choice(OPTIONS[col], size=n) for col in COLUMNS}).astype(object)
+    df["Cluster"] = rng.choice(LABELS, size=n)
+    return df
+
+
+def test_psi_matches_formula():
+    observed = np.array([30.0, 50.0, 20.0])
+    expected = np.array([0.2, 0.5, 0.3])
+    p = observed / observed.sum()
+    assert np.isclose(psi(observed, expected), ((p - expected) * np.log(p / expected)).sum())
+    assert psi(expected * 100, expected) == 0.0
+
+
+def test_chi_square_matches_scipy():
+    observed = np.array([30.0, 50.0, 20.0, 0.0])
+    expected = np.array([0.2, 0.5, 0.3, 0.0])
+    statistic, p_value = chi_square(observed, expected)
+    reference = chisquare(observed[:3], expected[:3] * observed.sum())
+    assert np.isclose(statistic, reference.statistic) and np.isclose(p_value, reference.pvalue)
+    # odpowiedzi spoza rozkładu treningowego
+    assert chi_square(np.array([1.0, 0.0, 0.0, 5.0]), expected) == (float("inf"), 0.0)
+
+
+def test_ring_buffer_keeps_only_last_window():
+    train = responses(500)
+    window = 40
+    one_by_one = DriftMonitor(reference_counts(train), LABELS, window=window)
+    new = responses(130, seed=1)
+    for _, row in new.iterrows():
+        one_by_one.observe({col: row[col] for col in COLUMNS}, row["Cluster"])
+
+    last = new.iloc[-window:]
+    for col in COLUMNS + ["Cluster"]:
+        counts = one_by_one._counts[col]
+        assert counts.sum() == window
+        for value, n in last[col].value_counts().items():
+            assert counts[one_by_one._index[col][value]] == n
+    assert one_by_one.observed_total == 130
+
+
+def test_frames_and_single_observations_agree():
+    train = responses(500)
+    single = DriftMonitor(reference_counts(train), LABELS, window=40)
+    batched = DriftMonitor(reference_counts(train), LABELS, window=40)
+    new = responses(130, seed=2)
+    for _, row in new.iterrows():
+        single.observe({col: row[col] for col in COLUMNS}, row["Cluster"])
+    # porcja większa niż okno, potem mniejsze
+    batched.observe_frame(new.iloc[:70], new["Cluster"].iloc[:70])
+    batched.observe_frame(new.iloc[70:100], new["Cluster"].iloc[70:100])
+    batched.observe_frame(new.iloc[100:], new["Cluster"].iloc[100:])
+    for col in COLUMNS + ["Cluster"]:
+        assert np.array_equal(single._counts[col], batched._counts[col])
+    assert single.report() == batched.report()
+
+
+def test_multi_select_answers_count_as_legacy_answers():
+    train = responses(200).assign(fav_animals="Psy|Inne")
+    monitor = DriftMonitor(reference_counts(train), LABELS, window=10)
+    person = {col: OPTIONS[col][0] for col in COLUMNS}
+    monitor.observe({**person, "fav_animals": "Psy|Inne"}, LABELS[0])
+    psy = monitor._index["fav_animals"]["Psy"]
+    assert monitor._counts["fav_animals"][psy] == 1
+    assert monitor.expected["fav_animals"][psy] == 1.0
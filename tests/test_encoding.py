@@ -0,0 +1,32 @@
+import os
+
+import numpy as np
+import pandas as pd  # type: ignore
+import pytest
+
+from distances import encode
+from encoding import encode_frame, encoder_spec
+from survey import COLUMNS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def model():
+    pytest.importorskip("pycaret")
+    from model_registry import DEFAULT_VERSION, discover
+    from pycaret.clustering import load_model  # type: ignore
+
+    return load_model(discover(ROOT)[DEFAULT_VERSION].model_name, verbose=False)
+
+
+def test_encode_frame_matches_pycaret_transform(model):
+    from model_registry import DEFAULT_VERSION, discover
+
+    df = pd.read_csv(discover(ROOT)[DEFAULT_VERSION].data, sep=';')[COLUMNS].head(200).astype(object)
+    # braki (imputacja), wybory wielokrotne i płeć spoza listy (kodowanie porządkowe -> -1)
+    df.loc[::7, "edu_level"] = np.nan
+    df.loc[::5, "fav_animals"] = "Psy|Inne"
+    df.loc[::11, "gender"] = "Inna"
+    spec = encoder_spec(model, df)
+    assert np.array_equal(encode_frame(spec, df), encode(model, df))
@@ -0,0 +1,44 @@
+import os
+
+import numpy as np
+import pandas as pd  # type: ignore
+
+from group_stats import PandasGroupStats, differences, ensure_database, open_database
+from results import ScoringContext
+from survey import COLUMNS, OPTIONS
+
+LABELS = ["Cluster 0", "Cluster 1", "Cluster 2"]
+
+
+def scored_context(n=300, seed=0, model_version="m1"):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({col: rng.choice(OPTIONS[col], size=n) for col in COLUMNS}).astype(object)
+    df.loc[rng.random(n) < 0.2, "fav_animals"] = "Psy|Inne"
+    df.loc[rng.random(n) < 0.1, "fav_place"] = None
+    df["Cluster"] = rng.choice(LABELS, size=n)
+    # odległości z kilku wartości – remisy jak przy powtarzających się profilach
+    distances = rng.choice([0.5, 1.0, 1.5, 2.0], size=(n, len(LABELS))).astype(np.float32)
+    return ScoringContext(df, distances, LABELS, {}, None, None, model_version=model_version)
+
+
+def test_sql_matches_pandas(tmp_path):
+    context = scored_context()
+    sql_stats = ensure_database(str(tmp_path / "survey.sqlite"), context)
+    pandas_stats = PandasGroupStats(context)
+    for label in LABELS:
+        assert differences(pandas_stats.group_result(label), sql_stats.group_result(label)) == []
+        for own_distance in np.float32([0.1, 0.5, 1.0, 1.7, 2.0, 3.0]):
+            assert sql_stats.strength(label, own_distance) == pandas_stats.strength(label, own_distance)
+
+
+def test_ensure_database_rebuilds_only_other_model_versions(tmp_path):
+    path = str(tmp_path / "survey.sqlite")
+    ensure_database(path, scored_context())
+    built = os.stat(path).st_mtime_ns
+    assert ensure_database(path, scored_context()).model_version == "m1"
+    assert os.stat(path).st_mtime_ns == built
+
+    assert ensure_database(path, scored_context(model_version="m2")).model_version == "m2"
+    assert open_database(path).model_version == "m2"
+    # żadnych porzuconych plików tymczasowych
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
@@ -0,0 +1,35 @@
+# Budżet czasu importu przy starcie (import_profile.py) dla app.py, wariantów
+# app1.py–app3.py i stron z pages/ – każdy to osobny skrypt uruchamiany w tym
+# samym serwerze.
+
+import glob
+import os
+
+import pytest
+
+from import_profile import IMPORT_BUDGET, measure, startup_imports, total_seconds
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPTS = ["app.py", "app1.py", "app2.py", "app3.py"] + sorted(os.path.relpath(path, ROOT) for path in glob.glob(os.path.join(ROOT, "pages", "*.py")))
+
+# ładowane leniwie, dopiero przy pierwszym użyciu
+LAZY_MODULES = ("pycaret", "sklearn")
+
+
+@pytest.mark.parametrize("script", SCRIPTS)
+def test_startup_imports_within_budget(script):
+    rows = measure(startup_imports(os.path.join(ROOT, script)))
+    assert total_seconds(rows) <= IMPORT_BUDGET
+
+
+@pytest.mark.parametrize("script", SCRIPTS)
+def test_heavy_modules_are_not_imported_at_startup(script):
+    names = {name for name, _, _, _ in measure(startup_imports(os.path.join(ROOT, script)))}
+    assert not [module for module in LAZY_MODULES if module in names]
+
+
+def test_startup_imports_skip_function_level_imports(tmp_path):
+    script = tmp_path / "page.py"
+    script.write_text("import os\n\ndef load():\n    import json\n", encoding="utf-8")
+    assert startup_imports(str(script)) == ["import os"]
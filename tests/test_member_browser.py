@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd  # type: ignore
+
+from member_browser import estimate_rows, page_members
+from survey import COLUMNS, MISSING, OPTIONS
+
+
+def members_frame(n=103, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({col: rng.choice(OPTIONS[col], size=n) for col in COLUMNS})
+    df.loc[rng.random(n) < 0.1, "fav_place"] = None
+    return df
+
+
+def all_pages(df, **kwargs):
+    rows, cursor = [], None
+    while True:
+        page_df, cursor, count = page_members(df, cursor=cursor, page_size=10, **kwargs)
+        rows.append(page_df)
+        if cursor is None:
+            return pd.concat(rows, ignore_index=True), count
+
+
+def test_pages_cover_every_row_once_in_order():
+    df = members_frame()
+    pages, count = all_pages(df)
+    assert count == len(df)
+    assert pages.equals(df[COLUMNS].astype(object).reset_index(drop=True))
+
+
+def test_sorted_pages_put_missing_answers_last():
+    df = members_frame()
+    pages, _ = all_pages(df, sort_by="fav_place", descending=True)
+    order = {value: i for i, value in enumerate(reversed(sorted(df["fav_place"].dropna().unique())))}
+    keys = [order.get(value, len(order)) for value in pages["fav_place"]]
+    assert keys == sorted(keys)
+    assert len(pages) == len(df)
+
+
+def test_filters_match_pandas():
+    df = members_frame()
+    filters = {"gender": ["Kobieta"], "fav_animals": ["Koty"]}
+    pages, count = all_pages(df, filters=filters)
+    expected = df[(df["gender"] == "Kobieta") & df["fav_animals"].isin(["Koty", "Koty i Psy"])]
+    assert count == len(expected) == len(pages)
+
+
+def test_estimate_rows_ignores_missing_answers():
+    counts = {
+        "fav_animals": {"Psy|Inne": 10, "Koty": 5, MISSING: 5},
+        "gender": {"Kobieta": 12, "Mężczyzna": 6, MISSING: 2},
+    }
+    assert estimate_rows(20, counts, {"fav_animals": ["Psy"]}) == 10
+    assert estimate_rows(20, counts, {"fav_animals": ["Brak ulubionych"]}) == 0
+    assert estimate_rows(20, counts, {"gender": ["Kobieta"]}) == 12
+
+
+def test_categorical_segments_page_like_plain_columns():
+    # segmenty z partitions.py mają kolumny Categorical
+    df = members_frame()
+    categorical = df.astype("category")
+    for kwargs in ({}, {"sort_by": "age"}, {"sort_by": "fav_place", "descending": True}):
+        plain_pages, plain_count = all_pages(df, **kwargs)
+        pages, count = all_pages(categorical, **kwargs)
+        assert count == plain_count
+        assert pages.equals(plain_pages)
+
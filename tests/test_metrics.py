@@ -0,0 +1,63 @@
+import gc
+import logging
+import threading
+
+from metrics import Counter, Histogram, serve_metrics
+from profile_cache import ProfileCache
+
+
+def test_finished_threads_fold_into_base():
+    counter = Counter("test_total", "test")
+
+    def work():
+        for _ in range(10):
+            counter.inc()
+
+    for _ in range(5):
+        threads = [threading.Thread(target=work) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    gc.collect()
+
+    child = counter.labels()
+    assert child.totals() == [1000.0]
+    assert len(child._shards) <= 1
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("test_seconds", "test", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value)
+    lines = histogram.collect()
+    assert 'test_seconds_bucket{le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{le="1.0"} 3' in lines
+    assert 'test_seconds_bucket{le="+Inf"} 4' in lines
+    assert "test_seconds_count 4" in lines
+    assert "test_seconds_sum 6.05" in lines
+
+
+def test_profile_cache_evicts_least_recent_and_expires():
+    now = [0.0]
+    cache = ProfileCache(max_entries=2, ttl=10, clock=lambda: now[0])
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("b") is None and cache.get("a") == 1
+    now[0] = 11.0
+    assert cache.get("c") is None
+    assert cache.stats()["evictions"] == 1 and cache.stats()["expirations"] == 1
+
+
+def test_second_listener_on_busy_port_logs_instead_of_raising(caplog):
+    first = serve_metrics(0)
+    try:
+        port = first.server_address[1]
+        with caplog.at_level(logging.WARNING, logger="metrics"):
+            assert serve_metrics(port) is None
+        assert str(port) in caplog.text
+    finally:
+        first.shutdown()
+        first.server_close()
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd  # type: ignore
+
+from multiselect import counts_from_answers, legacy_frame, option_counts, pack, selected_any
+from results import one_edit_neighbours
+from survey import OPTIONS, choice_mask, choices_answer, choices_label, legacy_answer, parse_choices
+
+ANSWERS = pd.Series(["Psy|Inne", "Psy", "Koty i Psy", "Brak ulubionych", None, "Inne", "Psy|Inne"])
+
+
+def test_pack_sets_one_bit_per_choice():
+    masks, present = pack("fav_animals", ANSWERS)
+    assert masks.dtype == np.uint8
+    assert present.tolist() == [True, True, True, True, False, True, True]
+    assert masks.tolist() == [
+        choice_mask("fav_animals", ["Psy", "Inne"]),
+        choice_mask("fav_animals", ["Psy"]),
+        choice_mask("fav_animals", ["Psy", "Koty"]),
+        0,
+        0,
+        choice_mask("fav_animals", ["Inne"]),
+        choice_mask("fav_animals", ["Psy", "Inne"]),
+    ]
+
+
+def test_option_counts_count_every_choice():
+    masks, present = pack("fav_animals", ANSWERS)
+    assert option_counts("fav_animals", masks, present) == {"Psy": 4, "Koty": 1, "Inne": 3, "Brak ulubionych": 1}
+
+
+def test_counts_from_answers_match_option_counts():
+    masks, present = pack("fav_animals", ANSWERS)
+    answer_counts = ANSWERS.value_counts().to_dict()
+    assert counts_from_answers("fav_animals", answer_counts) == option_counts("fav_animals", masks, present)
+
+
+def test_selected_any():
+    masks, _ = pack("fav_animals", ANSWERS)
+    assert selected_any("fav_animals", masks, ["Koty", "Inne"]).tolist() == [True, False, True, False, False, True, True]
+    assert selected_any("fav_animals", masks, ["Brak ulubionych"]).tolist() == [
+        False, False, False, True, True, False, False
+    ]
+
+
+def test_legacy_answer_is_exact_or_largest_subset():
+    for answer in OPTIONS["fav_animals"]:
+        assert legacy_answer("fav_animals", choice_mask("fav_animals", parse_choices("fav_animals", answer))) == answer
+    assert legacy_answer("fav_animals", choice_mask("fav_animals", ["Psy", "Koty", "Inne"])) == "Koty i Psy"
+    assert legacy_answer("fav_animals", choice_mask("fav_animals", ["Psy", "Inne"])) == "Psy"
+
+
+def test_legacy_frame_maps_only_new_answers():
+    df = pd.DataFrame({"fav_animals": ANSWERS, "age": "25-34"})
+    legacy = legacy_frame(df)
+    assert legacy["fav_animals"].tolist()[:4] == ["Psy", "Psy", "Koty i Psy", "Brak ulubionych"]
+    assert pd.isna(legacy["fav_animals"].iloc[4])
+    assert set(legacy["fav_animals"].dropna()) <= set(OPTIONS["fav_animals"])
+    # wejście bez zmian
+    assert df["fav_animals"].iloc[0] == "Psy|Inne"
+
+
+def test_choices_answer_and_label():
+    assert choices_answer("fav_animals", ["Inne", "Psy"]) == "Psy|Inne"
+    assert choices_answer("fav_animals", []) == "Brak ulubionych"
+    assert choices_label("fav_animals", "Psy|Inne") == "Psy, Inne"
+    assert choices_label("fav_animals", "Koty i Psy") == "Psy, Koty"
+    assert choices_label("fav_animals", "Brak ulubionych") == "Brak ulubionych"
+
+
+def test_what_if_toggles_single_options():
+    person = {"age": "25-34", "edu_level": "Wyższe", "fav_animals": "Psy|Inne", "fav_place": "W lesie", "gender": "Kobieta"}
+    neighbours_df, changes = one_edit_neighbours(person)
+    animal_changes = {change: value for (col, change), value in zip(changes, neighbours_df["fav_animals"]) if col == "fav_animals"}
+    assert animal_changes == {"odznacz: Psy": "Inne", "zaznacz: Koty": "Psy|Koty|Inne", "odznacz: Inne": "Psy"}
+    assert "Koty i Psy" not in neighbours_df["fav_animals"].tolist()
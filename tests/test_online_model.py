@@ -0,0 +1,29 @@
+from online_model import ResponseTail
+
+HEADER = "age;gender\n"
+
+
+def test_tail_reads_only_complete_new_rows(tmp_path):
+    path = tmp_path / "responses.csv"
+    path.write_text(HEADER + "25-34;Kobieta\n", encoding="utf-8")
+    tail = ResponseTail(str(path))
+    assert tail.read()["age"].tolist() == ["25-34"]
+    assert tail.read() is None
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("35-44;Mężczyzna\n45-54;Kob")
+    assert tail.read()["age"].tolist() == ["35-44"]
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("ieta\n")
+    assert tail.read()["gender"].tolist() == ["Kobieta"]
+
+
+def test_tail_starts_over_when_file_shrinks(tmp_path):
+    path = tmp_path / "responses.csv"
+    path.write_text(HEADER + "25-34;Kobieta\n35-44;Mężczyzna\n", encoding="utf-8")
+    tail = ResponseTail(str(path))
+    assert len(tail.read()) == 2
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(HEADER + "18-24;Kobieta\n")
+    assert tail.read()["age"].tolist() == ["18-24"]
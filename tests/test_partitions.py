@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd  # type: ignore
+
+from partitions import open_partitions, write_partitions
+from survey import COLUMNS, MISSING, OPTIONS
+
+LABELS = ["Cluster 0", "Cluster 1", "Cluster 2"]
+
+
+def scored_frame(n, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({col: rng.choice(OPTIONS[col], size=n) for col in COLUMNS}).astype(object)
+    df.loc[rng.random(n) < 0.1, "edu_level"] = None
+    df["Cluster"] = rng.choice(LABELS, size=n)
+    distances = rng.uniform(0.1, 3.0, size=(n, len(LABELS))).astype(np.float32)
+    return df, distances
+
+
+def test_round_trip_returns_each_clusters_members(tmp_path):
+    df, distances = scored_frame(200)
+    path = str(tmp_path / "survey.partitions")
+    write_partitions(path, df, distances, LABELS, model_version="m1")
+
+    partitions = open_partitions(path)
+    assert partitions.model_version == "m1"
+    assert partitions.sizes == df["Cluster"].value_counts().to_dict()
+    for idx, label in enumerate(LABELS):
+        members = df[df["Cluster"] == label]
+        part_df, part_distances = partitions.partition(label)
+        assert part_df[COLUMNS].astype(object).where(part_df[COLUMNS].notna(), None).values.tolist() == \
+            members[COLUMNS].values.tolist()
+        assert np.array_equal(part_distances, distances[members.index, idx])
+        counts = partitions.counts(label)["edu_level"]
+        assert counts.get(MISSING, 0) == members["edu_level"].isna().sum()
+
+
+def test_open_dataset_keeps_reading_its_own_file_after_rewrite(tmp_path):
+    df, distances = scored_frame(200)
+    path = str(tmp_path / "survey.partitions")
+    write_partitions(path, df, distances, LABELS, model_version="m1")
+    partitions = open_partitions(path, max_cached=0)
+    before = partitions.partition("Cluster 1")[1].copy()
+
+    other_df, other_distances = scored_frame(50, seed=1)
+    write_partitions(path, other_df, other_distances, LABELS, model_version="m2")
+
+    assert partitions.model_version == "m1"
+    assert np.array_equal(partitions.partition("Cluster 1")[1], before)
+    assert open_partitions(path).model_version == "m2"
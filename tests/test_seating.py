@@ -0,0 +1,29 @@
+import numpy as np
+
+from seating import initial_groups, partition, within_group_cost
+
+
+def cohort(n=203, seed=0):
+    rng = np.random.default_rng(seed)
+    # trzy skupiska odpowiedzi, przewidziany klaster celowo zaszumiony
+    centers = rng.normal(scale=3.0, size=(3, 6))
+    truth = rng.integers(0, 3, size=n)
+    X = centers[truth] + rng.normal(size=(n, 6))
+    seed_labels = np.where(rng.random(n) < 0.3, rng.integers(0, 3, size=n), truth)
+    return X, seed_labels
+
+
+def test_swaps_keep_table_sizes():
+    X, seed_labels = cohort()
+    start, n_groups = initial_groups(X, seed_labels, 8)
+    groups, _ = partition(X, seed_labels, 8)
+    assert np.array_equal(np.bincount(groups, minlength=n_groups), np.bincount(start, minlength=n_groups))
+    assert np.bincount(groups).max() - np.bincount(groups).min() <= 1
+
+
+def test_swaps_reduce_within_table_cost():
+    X, seed_labels = cohort()
+    start, n_groups = initial_groups(X, seed_labels, 8)
+    groups, cost = partition(X, seed_labels, 8)
+    assert cost == within_group_cost(X, groups, n_groups)
+    assert cost < within_group_cost(X, start, n_groups)
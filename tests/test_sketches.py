@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd  # type: ignore
+import pytest
+
+from distances import share_farther
+from results import group_result
+from sketches import ClusterSketches, CountMinSketch, DistanceHistogram, HyperLogLog
+from survey import COLUMNS, OPTIONS
+
+LABELS = ["Cluster 0", "Cluster 1"]
+
+
+def survey_frame(n, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({col: rng.choice(OPTIONS[col], size=n) for col in COLUMNS})
+    df.loc[rng.random(n) < 0.2, "fav_animals"] = "Psy|Inne"
+    return df
+
+
+def test_count_min_never_underestimates():
+    sketch = CountMinSketch(width=64, depth=3)
+    keys = [f"k{i}" for i in range(500)]
+    counts = np.arange(1, 501)
+    sketch.add(keys, counts)
+    assert (sketch.estimate(keys) >= counts).all()
+
+
+def test_hyperloglog_estimate_within_error():
+    hll = HyperLogLog(bits=12)
+    hll.add_hashes(pd.util.hash_array(np.arange(20_000).astype(object)))
+    assert abs(hll.estimate() - 20_000) / 20_000 < 0.05
+
+
+def test_multi_select_answers_count_every_option():
+    rows = [{"age": "25-34", "edu_level": "Wyższe", "fav_place": "W lesie", "gender": "Kobieta"}]
+    df = pd.DataFrame(rows * 15).assign(fav_animals=["Psy|Inne"] * 10 + ["Psy"] * 5)
+    sketches = ClusterSketches(LABELS)
+    sketches.update(df, ["Cluster 0"] * 15, np.ones(15))
+    result = sketches.group_result("Cluster 0")
+    assert result["multi_counts"]["fav_animals"] == {"Psy": 15, "Inne": 10}
+    assert result["radar"]["Psy"] == 1.0
+
+
+def test_small_group_matches_exact_counts():
+    df = survey_frame(300)
+    labels = np.where(np.arange(300) % 3 == 0, "Cluster 0", "Cluster 1")
+    sketches = ClusterSketches(LABELS)
+    sketches.update(df, labels, np.ones(300))
+    exact = group_result(df[labels == "Cluster 1"].assign(Cluster="Cluster 1"))
+    approx = sketches.group_result("Cluster 1")
+    assert approx["group_size"] == exact["group_size"]
+    assert approx["multi_counts"] == exact["multi_counts"]
+    for col in COLUMNS:
+        if col != "fav_animals":
+            assert approx["counts"][col] == exact["counts"][col]
+
+
+def test_merged_shards_equal_one_pass(tmp_path):
+    df = survey_frame(400, seed=1)
+    labels = np.where(np.arange(400) % 2 == 0, "Cluster 0", "Cluster 1")
+    distances = np.random.default_rng(2).uniform(0.5, 2.0, size=400)
+
+    whole = ClusterSketches(LABELS, "m1")
+    whole.update(df, labels, distances)
+    first, second = ClusterSketches(LABELS, "m1"), ClusterSketches(LABELS, "m1")
+    first.update(df.iloc[:150], labels[:150], distances[:150])
+    second.update(df.iloc[150:], labels[150:], distances[150:])
+    second.save(tmp_path / "shard.npz")
+    first.merge(ClusterSketches.load(tmp_path / "shard.npz"))
+
+    for label in LABELS:
+        assert first[label].n == whole[label].n
+        assert (first[label].counts.table == whole[label].counts.table).all()
+        assert (first[label].distances.counts == whole[label].distances.counts).all()
+
+
+def test_merge_rejects_other_model_version():
+    with pytest.raises(ValueError):
+        ClusterSketches(LABELS, "m1").merge(ClusterSketches(LABELS, "m2"))
+
+
+def test_distance_histogram_strength_on_discrete_distances():
+    # odległości w praktyce powtarzają się (te same profile odpowiedzi)
+    distances = np.repeat([0.4, 0.9, 1.3, 2.2], [5, 10, 20, 15]).astype(np.float32)
+    histogram = DistanceHistogram()
+    histogram.add(distances)
+    for own in [0.1, 0.4, 0.9, 1.0, 1.3, 2.2, 3.0]:
+        assert histogram.share_farther(own) == share_farther(distances, np.float32(own))
+    assert DistanceHistogram().share_farther(1.0) == 1.0